@@ -0,0 +1,384 @@
+import importlib
+import importlib.util
+import os
+import numpy as np
+from functools import lru_cache
+from conversion_functions import rgb_to_cmyk
+
+# Two-character upper-case hex strings for every 8-bit channel value
+HEX_TABLE = np.array(['{:02X}'.format(i) for i in range(256)])
+
+# Kernel backends. Numba is optional: when it is installed its compiled kernels (jit_kernels.py)
+# are used, otherwise everything runs on the NumPy implementations below.
+BACKENDS = ("numba", "numpy")
+BACKEND_ENV = "COLOUR_BACKEND"  # Set to "numpy" to turn the Numba kernels off
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+_backend = "numba" if NUMBA_AVAILABLE and os.environ.get(BACKEND_ENV, "numba").lower() != "numpy" else "numpy"
+
+def get_backend():
+    """Return the name of the active kernel backend, "numba" or "numpy"."""
+    return _backend
+
+def set_backend(name):
+    """
+    Select the kernel backend used by the batch conversions, the colour wheel and palette assignment.
+
+    Parameters:
+    name (str): "numba" or "numpy".
+
+    Raises:
+    ValueError: If the backend is unknown, or is "numba" and Numba is not installed.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Invalid backend: {name}. Must be one of {', '.join(BACKENDS)}.")
+    if name == "numba" and not NUMBA_AVAILABLE:
+        raise ValueError("The numba backend needs the numba package to be installed.")
+    _backend = name
+
+def jit_kernels():
+    """
+    Return the compiled kernels module when the Numba backend is active, otherwise None.
+    Numba is only imported on first use, so it does not slow down startup.
+    """
+    if _backend != "numba":
+        return None
+    return importlib.import_module("jit_kernels")
+
+def run_kernel(kernel, values, *args):
+    """Run a compiled kernel over the last axis of an array of any shape."""
+    flat = np.ascontiguousarray(values).reshape(-1, values.shape[-1])
+    result = kernel(flat, *args)
+    return result.reshape(values.shape[:-1] + result.shape[-1:])
+
+# Helper Functions for Validation
+def validate_rgb_array(rgb):
+    """
+    Validate an array of RGB values to ensure it holds integers between 0 and 255.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding red, green and blue values.
+
+    Returns:
+    numpy.ndarray: The validated RGB values as an integer array.
+
+    Raises:
+    ValueError: If the array has the wrong shape, is not integral or is out of range.
+    """
+    rgb = np.asarray(rgb)
+    if rgb.ndim == 0 or rgb.shape[-1] != 3:
+        raise ValueError(f"Invalid RGB array shape: {rgb.shape}. The last axis must hold 3 values.")
+    if rgb.size and not np.issubdtype(rgb.dtype, np.integer):
+        raise ValueError("Invalid RGB array: values must be integers.")
+    if rgb.size and (rgb.min() < 0 or rgb.max() > 255):
+        raise ValueError("Invalid RGB array: each value must be between 0 and 255.")
+    return rgb
+
+def validate_hue_array(h, second, third, names):
+    """
+    Validate arrays of HSL or HSV values to ensure hue is between 0 and 360 and the other
+    two components are between 0 and 100.
+
+    Parameters:
+    h, second, third (numpy.ndarray): Hue and the two percentage components.
+    names (tuple): Names of the two percentage components, used in error messages.
+
+    Raises:
+    ValueError: If any of the values are out of range.
+    """
+    # Negated range tests, so NaN (which fails every comparison) is rejected too
+    if not np.all((h >= 0) & (h < 360)):
+        raise ValueError("Invalid hue array: values must be in the range [0, 360).")
+    for name, values in zip(names, (second, third)):
+        if not np.all((values >= 0) & (values <= 100)):
+            raise ValueError(f"Invalid {name} array: values must be in the range [0, 100].")
+
+def validate_cmyk_array(cmyk):
+    """
+    Validate an array of CMYK values to ensure all values are between 0 and 1.
+
+    Parameters:
+    cmyk (array-like): Array of shape (..., 4) holding cyan, magenta, yellow and black values.
+
+    Returns:
+    numpy.ndarray: The validated CMYK values as a float array.
+
+    Raises:
+    ValueError: If the array has the wrong shape or is out of range.
+    """
+    cmyk = np.asarray(cmyk, dtype=np.float64)
+    if cmyk.ndim == 0 or cmyk.shape[-1] != 4:
+        raise ValueError(f"Invalid CMYK array shape: {cmyk.shape}. The last axis must hold 4 values.")
+    if not np.all((cmyk >= 0) & (cmyk <= 1)):  # Also rejects NaN
+        raise ValueError("Invalid CMYK array: each value must be between 0 and 1.")
+    return cmyk
+
+def iter_rgb_cube(chunk_size=1 << 20, start=0, stop=1 << 24):
+    """
+    Yield every 8-bit RGB value in chunks, ordered by their packed 0xRRGGBB value.
+
+    Parameters:
+    chunk_size (int): Number of colours per chunk.
+    start, stop (int): Range of packed colour values to cover.
+
+    Yields:
+    numpy.ndarray: uint8 array of shape (n, 3) holding RGB values.
+    """
+    for first in range(start, stop, chunk_size):
+        packed = np.arange(first, min(first + chunk_size, stop), dtype=np.uint32)
+        yield np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1).astype(np.uint8)
+
+def _split(values, dtype=np.float64):
+    """Split the last axis of an array into separate float channels."""
+    values = np.asarray(values, dtype=dtype)
+    return [values[..., i] for i in range(values.shape[-1])]
+
+def _hue_sextants(h, c, x):
+    """
+    Select the (r, g, b) offsets for each hue sextant, mirroring the branch order of the
+    scalar HSL/HSV to RGB conversions.
+    """
+    zero = np.zeros_like(c)
+    conditions = [h < 60, h < 120, h < 180, h < 240, h < 300]
+    r = np.select(conditions, [c, x, zero, zero, x], c)
+    g = np.select(conditions, [x, c, c, x, zero], zero)
+    b = np.select(conditions, [zero, zero, x, c, c], x)
+    return r, g, b
+
+def _hue(r_prime, g_prime, b_prime, max_val, delta):
+    """Compute the hue fraction (0-1) using the same float operations as the scalar code."""
+    safe_delta = np.where(delta == 0, 1.0, delta)
+    h_r = (g_prime - b_prime) / safe_delta + np.where(g_prime < b_prime, 6, 0)
+    h_g = (b_prime - r_prime) / safe_delta + 2
+    h_b = (r_prime - g_prime) / safe_delta + 4
+    h = np.where(max_val == r_prime, h_r, np.where(max_val == g_prime, h_g, h_b))
+    return np.where(delta == 0, 0.0, h / 6)
+
+def _stack_rounded(*channels):
+    """Round each channel half-to-even, like Python's round, and stack them as integers."""
+    return np.stack([np.rint(channel) for channel in channels], axis=-1).astype(np.int64)
+
+# RGB to HEX
+def rgb_to_hex_batch(rgb):
+    """
+    Convert an array of RGB values to hex.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: Array of shape (...) holding hexadecimal strings in the format #RRGGBB.
+    """
+    rgb = validate_rgb_array(rgb)
+    channels = [HEX_TABLE[rgb[..., i]] for i in range(3)]
+    return np.char.add(np.char.add(np.char.add('#', channels[0]), channels[1]), channels[2])
+
+# HEX to RGB
+def hex_to_rgb_batch(hex_values):
+    """
+    Convert a sequence of hex strings to RGB.
+
+    Parameters:
+    hex_values (iterable): Hexadecimal strings (#RRGGBB).
+
+    Returns:
+    numpy.ndarray: Array of shape (n, 3) holding the RGB values (0-255).
+    """
+    stripped = [str(value).lstrip('#') for value in hex_values]
+    for value in stripped:
+        if len(value) != 6:
+            raise ValueError(f"Invalid hex color: {value}. Must be 6 characters long.")
+    try:
+        raw = bytes.fromhex(''.join(stripped))
+    except ValueError:
+        raise ValueError("Invalid hex color in batch. Contains non-hexadecimal characters.")
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int64)
+
+# CMYK to RGB
+def cmyk_to_rgb_batch(cmyk):
+    """
+    Convert an array of CMYK values to RGB.
+
+    Parameters:
+    cmyk (array-like): Array of shape (..., 4) holding CMYK values (0-1).
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 3) holding the RGB values (0-255).
+    """
+    cmyk = validate_cmyk_array(cmyk)
+    kernels = jit_kernels()
+    if kernels is not None:
+        return run_kernel(kernels.cmyk_to_rgb, cmyk)
+    c, m, y, k = _split(cmyk)
+    r = 255 * (1 - c) * (1 - k)
+    g = 255 * (1 - m) * (1 - k)
+    b = 255 * (1 - y) * (1 - k)
+    return _stack_rounded(r, g, b)
+
+# HSL to unrounded RGB
+def hsl_to_rgb_float_batch(hsl):
+    """
+    Convert an array of HSL values to RGB without rounding.
+
+    Parameters:
+    hsl (array-like): Array of shape (..., 3) holding hue (0-360), saturation and lightness (0-100).
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding the RGB values (0-255) before rounding.
+    """
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, l = _split(hsl)
+    validate_hue_array(h, s, l, ("saturation", "lightness"))
+    kernels = jit_kernels()
+    if kernels is not None:
+        return run_kernel(kernels.hsl_to_rgb_float, hsl)
+    s = s / 100
+    l = l / 100
+    c = (1 - np.abs(2 * l - 1)) * s
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+    m = l - c / 2
+    r, g, b = _hue_sextants(h, c, x)
+    return np.stack([(r + m) * 255, (g + m) * 255, (b + m) * 255], axis=-1)
+
+# HSL to RGB
+def hsl_to_rgb_batch(hsl):
+    """
+    Convert an array of HSL values to RGB.
+
+    Parameters:
+    hsl (array-like): Array of shape (..., 3) holding hue (0-360), saturation and lightness (0-100).
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 3) holding the RGB values (0-255).
+    """
+    return np.rint(hsl_to_rgb_float_batch(hsl)).astype(np.int64)
+
+# HSV to unrounded RGB
+def hsv_to_rgb_float_batch(hsv):
+    """
+    Convert an array of HSV values to RGB without rounding.
+
+    Every channel is proportional to the value component, so scaling the result of a full-value
+    conversion gives the colours at any other value without converting again.
+
+    Parameters:
+    hsv (array-like): Array of shape (..., 3) holding hue (0-360), saturation and value (0-100).
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding the RGB values (0-255) before rounding.
+    """
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h, s, v = _split(hsv)
+    validate_hue_array(h, s, v, ("saturation", "value"))
+    kernels = jit_kernels()
+    if kernels is not None:
+        return run_kernel(kernels.hsv_to_rgb_float, hsv)
+    s = s / 100
+    v = v / 100
+    c = v * s
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+    m = v - c
+    r, g, b = _hue_sextants(h, c, x)
+    return np.stack([(r + m) * 255, (g + m) * 255, (b + m) * 255], axis=-1)
+
+# HSV to RGB
+def hsv_to_rgb_batch(hsv):
+    """
+    Convert an array of HSV values to RGB.
+
+    Parameters:
+    hsv (array-like): Array of shape (..., 3) holding hue (0-360), saturation and value (0-100).
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 3) holding the RGB values (0-255).
+    """
+    return np.rint(hsv_to_rgb_float_batch(hsv)).astype(np.int64)
+
+@lru_cache(maxsize=None)
+def _cmyk_tables():
+    """
+    Build lookup tables for RGB to CMYK.
+
+    Each of C, M and Y only depends on its own channel and the largest channel, and K only
+    depends on the largest channel, so the scalar conversion is evaluated once for every
+    (channel, max) pair. This keeps the batch output identical to rgb_to_cmyk, including
+    Python's decimal rounding.
+    """
+    channel_table = np.zeros((256, 256), dtype=np.float64)
+    key_table = np.ones(256, dtype=np.float64)
+    for max_val in range(1, 256):
+        for value in range(max_val + 1):
+            channel_table[max_val, value] = rgb_to_cmyk(value, max_val, 0)[0]
+        key_table[max_val] = rgb_to_cmyk(max_val, 0, 0)[3]
+    return channel_table, key_table
+
+# RGB to CMYK
+def rgb_to_cmyk_batch(rgb):
+    """
+    Convert an array of RGB values to CMYK.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 4) holding the CMYK values (0-1).
+    """
+    rgb = validate_rgb_array(rgb)
+    channel_table, key_table = _cmyk_tables()
+    kernels = jit_kernels()
+    if kernels is not None:
+        return run_kernel(kernels.rgb_to_cmyk, rgb, channel_table, key_table)
+    max_val = rgb.max(axis=-1)
+    cmy = channel_table[max_val[..., None], rgb]
+    return np.concatenate([cmy, key_table[max_val][..., None]], axis=-1)
+
+# RGB to HSL
+def rgb_to_hsl_batch(rgb):
+    """
+    Convert an array of RGB values to HSL.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 3) holding HSL values (0-360, 0-100, 0-100).
+    """
+    rgb = validate_rgb_array(rgb)
+    kernels = jit_kernels()
+    if kernels is not None:
+        return run_kernel(kernels.rgb_to_hsl, rgb)
+    r_prime, g_prime, b_prime = _split(rgb)
+    r_prime, g_prime, b_prime = r_prime / 255.0, g_prime / 255.0, b_prime / 255.0
+    max_val = np.maximum(np.maximum(r_prime, g_prime), b_prime)
+    min_val = np.minimum(np.minimum(r_prime, g_prime), b_prime)
+    l = (max_val + min_val) / 2
+    delta = max_val - min_val
+
+    denominator = np.where(l > 0.5, 2 - max_val - min_val, max_val + min_val)
+    s = np.where(delta == 0, 0.0, delta / np.where(delta == 0, 1.0, denominator))
+    h = _hue(r_prime, g_prime, b_prime, max_val, delta)
+    return _stack_rounded(h * 360, s * 100, l * 100)
+
+# RGB to HSV
+def rgb_to_hsv_batch(rgb):
+    """
+    Convert an array of RGB values to HSV.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 3) holding HSV values (0-360, 0-100, 0-100).
+    """
+    rgb = validate_rgb_array(rgb)
+    kernels = jit_kernels()
+    if kernels is not None:
+        return run_kernel(kernels.rgb_to_hsv, rgb)
+    r_prime, g_prime, b_prime = _split(rgb)
+    r_prime, g_prime, b_prime = r_prime / 255.0, g_prime / 255.0, b_prime / 255.0
+    max_val = np.maximum(np.maximum(r_prime, g_prime), b_prime)
+    min_val = np.minimum(np.minimum(r_prime, g_prime), b_prime)
+    delta = max_val - min_val
+    s = np.where(max_val == 0, 0.0, delta / np.where(max_val == 0, 1.0, max_val))
+    h = _hue(r_prime, g_prime, b_prime, max_val, delta)
+    return _stack_rounded(h * 360, s * 100, max_val * 100)
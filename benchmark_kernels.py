@@ -0,0 +1,102 @@
+import argparse
+import time
+import numpy as np
+import batch_conversions
+from batch_conversions import (rgb_to_hsl_batch, rgb_to_hsv_batch, rgb_to_cmyk_batch, cmyk_to_rgb_batch,
+                               hsl_to_rgb_batch, hsv_to_rgb_batch)
+from colour_gear import wheel_base, apply_wheel_value, _wheel_bases, _wheel_bases_lock
+from palette_functions import nearest_centroid
+
+WHEEL_SIZE = 800  # Size of the colour wheel rendered by the wheel benchmarks
+
+def _inputs(n, seed=0):
+    """Random inputs for every benchmark, shared by both backends."""
+    rng = np.random.default_rng(seed)
+    hue_values = np.column_stack([rng.uniform(0, 360, n), rng.uniform(0, 100, (n, 2))])
+    return {
+        "rgb": rng.integers(0, 256, (n, 3), dtype=np.uint8),
+        "hue": hue_values,
+        "cmyk": rng.uniform(0, 1, (n, 4)),
+        "centres": rng.integers(0, 256, (8, 3)).astype(np.float64),
+    }
+
+def _render_wheel():
+    """Render the wheel after dropping it from the cache, so every run computes every pixel."""
+    with _wheel_bases_lock:
+        _wheel_bases.pop(WHEEL_SIZE, None)
+    return wheel_base(WHEEL_SIZE)
+
+# Benchmarks, each mapping the shared inputs to a callable that runs the kernel once
+BENCHMARKS = {
+    "rgb_to_hsl": lambda data: lambda: rgb_to_hsl_batch(data["rgb"]),
+    "rgb_to_hsv": lambda data: lambda: rgb_to_hsv_batch(data["rgb"]),
+    "rgb_to_cmyk": lambda data: lambda: rgb_to_cmyk_batch(data["rgb"]),
+    "cmyk_to_rgb": lambda data: lambda: cmyk_to_rgb_batch(data["cmyk"]),
+    "hsl_to_rgb": lambda data: lambda: hsl_to_rgb_batch(data["hue"]),
+    "hsv_to_rgb": lambda data: lambda: hsv_to_rgb_batch(data["hue"]),
+    "wheel_render": lambda data: _render_wheel,
+    "wheel_value": lambda data: lambda: apply_wheel_value(wheel_base(WHEEL_SIZE), 50),
+    "nearest_centroid": lambda data: lambda: nearest_centroid(data["rgb"], data["centres"]),
+}
+
+def time_call(function, repeat):
+    """Return the time of the first call and the best time of repeat further calls, in seconds."""
+    start = time.perf_counter()
+    function()
+    first = time.perf_counter() - start
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return first, best
+
+def run_benchmarks(n=1_000_000, repeat=5, backends=None, names=None):
+    """
+    Time every kernel on each available backend.
+
+    The first call is reported separately: for the Numba backend it includes loading the compiled
+    kernel from the on-disk cache (or compiling it, the very first time).
+
+    Parameters:
+    n (int): Number of colours per conversion benchmark.
+    repeat (int): Timed calls per kernel after the first; the best is reported.
+    backends (iterable): Backends to compare; every installed backend by default.
+    names (iterable): Benchmarks to run; all of BENCHMARKS by default.
+
+    Returns:
+    dict: For each benchmark, a dict of backend to (first call, best call) times in seconds.
+    """
+    if backends is None:
+        backends = [backend for backend in batch_conversions.BACKENDS
+                    if backend != "numba" or batch_conversions.NUMBA_AVAILABLE]
+    data = _inputs(n)
+    previous = batch_conversions.get_backend()
+    results = {}
+    try:
+        for name in names or BENCHMARKS:
+            function = BENCHMARKS[name](data)
+            results[name] = {}
+            for backend in backends:
+                batch_conversions.set_backend(backend)
+                results[name][backend] = time_call(function, repeat)
+    finally:
+        batch_conversions.set_backend(previous)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the NumPy and Numba kernel backends.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Colours per conversion benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per kernel")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run")
+    args = parser.parse_args()
+    report = run_benchmarks(args.size, args.repeat, names=args.only)
+    backends = list(next(iter(report.values())))
+    print(f"{'kernel':<18}" + "".join(f"{backend + ' first':>14}{backend + ' best':>14}" for backend in backends)
+          + ("   speedup" if len(backends) > 1 else ""))
+    for name, timings in report.items():
+        line = f"{name:<18}" + "".join(f"{first * 1000:>12.1f}ms{best * 1000:>12.1f}ms"
+                                       for first, best in timings.values())
+        if len(backends) > 1:
+            line += f"{timings['numpy'][1] / timings['numba'][1]:>9.1f}x"
+        print(line)
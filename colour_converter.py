@@ -1,8 +1,36 @@
 from conversion_functions import *
+from colour_parser import parse_colour
+from icc_conversions import RENDERING_INTENTS, get_cmyk_profile, get_rendering_intent, set_cmyk_profile, rgb_to_cmyk_icc
+import os
+import time
 import tkinter as tk
-from tkinter import ttk
+from functools import lru_cache
+from tkinter import ttk, filedialog
 import ttkbootstrap as ttkb
 
+CONVERT_DEBOUNCE_MS = 150  # Typing pause after which the input is converted
+
+@lru_cache(maxsize=4096)
+def format_representations(rgb, cmyk_profile=None, intent=None):
+    """
+    Format every representation of an RGB colour for display, memoised per colour and CMYK profile.
+
+    @param rgb: (r, g, b) tuple.
+    @param cmyk_profile: Path of the CMYK ICC profile, or None for the naive formula.
+    @param intent: Rendering intent used with the profile.
+    @return: Tuple of (name, text) pairs for rgb, hsl, hsv, cmyk and hex.
+    """
+    hsl = rgb_to_hsl(*rgb)
+    hsv = rgb_to_hsv(*rgb)
+    cmyk = rgb_to_cmyk_icc(*rgb, profile=cmyk_profile, intent=intent) if cmyk_profile else rgb_to_cmyk(*rgb)
+    return (
+        ("rgb", f"{rgb[0]}, {rgb[1]}, {rgb[2]}"),
+        ("hsl", f"{hsl[0]}, {hsl[1]}, {hsl[2]}"),
+        ("hsv", f"{hsv[0]}, {hsv[1]}, {hsv[2]}"),
+        ("cmyk", f"{cmyk[0]}, {cmyk[1]}, {cmyk[2]}, {cmyk[3]}"),
+        ("hex", rgb_to_hex(*rgb)),
+    )
+
 class ColourConverterPage(ttkb.Frame):  # Inherit from ttkbootstrap's Frame
     def __init__(self, parent, controller):
         super().__init__(parent)
@@ -20,6 +48,13 @@ class ColourConverterPage(ttkb.Frame):  # Inherit from ttkbootstrap's Frame
         self.hsv_value = tk.StringVar()
         self.cmyk_value = tk.StringVar()
         self.hex_value_var = tk.StringVar()
+        self.rendering_intent = tk.StringVar(value=get_rendering_intent())
+
+        # State of the live conversion
+        self.displayed = {}  # Text last pushed to each output, so unchanged ones are not set again
+        self.last_parsed = None  # (format, input, rgb) of the last successfully parsed input
+        self.pending_conversion = None  # after() id of the scheduled live conversion
+        self.last_input_time = 0.0  # When the input last changed
 
         # Configure the theme (choose from themes like 'darkly', 'flatly', 'journal', etc.)
         style = ttkb.Style("darkly")  # Apply a theme
@@ -39,6 +74,9 @@ class ColourConverterPage(ttkb.Frame):  # Inherit from ttkbootstrap's Frame
         color_input_entry = ttkb.Entry(self.container, textvariable=self.color_input, width=25, bootstyle="info")
         color_input_entry.grid(column=0, row=1, columnspan=2, sticky=(tk.W, tk.E))
 
+        # Convert as the user types, once typing pauses
+        self.color_input.trace_add('write', self.schedule_conversion)
+
         # Convert button
         convert_button = ttkb.Button(self.container, text="Convert", command=self.convert_color, bootstyle="primary")
         convert_button.grid(column=2, row=1, sticky=(tk.W, tk.E))
@@ -61,6 +99,23 @@ class ColourConverterPage(ttkb.Frame):  # Inherit from ttkbootstrap's Frame
         self.error_label = ttkb.Label(self.container, text="", bootstyle="danger")
         self.error_label.grid(column=0, row=7, columnspan=3, sticky=tk.W)
 
+        # CMYK profile selection; without a profile CMYK uses the naive formula
+        profile_title = ttkb.Label(self.container, text="CMYK Profile:", bootstyle="info")
+        profile_title.grid(column=0, row=8, sticky=tk.W)
+        self.profile_label = ttkb.Label(self.container, text="", bootstyle="info")
+        self.profile_label.grid(column=1, row=8, sticky=tk.W)
+        load_profile_button = ttkb.Button(self.container, text="Load ICC...", command=self.load_cmyk_profile,
+                                          bootstyle="secondary")
+        load_profile_button.grid(column=2, row=8, sticky=(tk.W, tk.E))
+        intent_selector = ttkb.Combobox(self.container, textvariable=self.rendering_intent,
+                                        values=list(RENDERING_INTENTS), state="readonly", bootstyle="info")
+        intent_selector.grid(column=1, row=9, sticky=(tk.W, tk.E))
+        intent_selector.bind("<<ComboboxSelected>>", lambda event: self.apply_cmyk_profile(get_cmyk_profile()))
+        clear_profile_button = ttkb.Button(self.container, text="Naive CMYK",
+                                           command=lambda: self.apply_cmyk_profile(None), bootstyle="secondary")
+        clear_profile_button.grid(column=2, row=9, sticky=(tk.W, tk.E))
+        self.update_profile_label()
+
         # Configure padding for all widgets
         for child in self.container.winfo_children():
             child.grid_configure(padx=5, pady=5)
@@ -81,69 +136,103 @@ class ColourConverterPage(ttkb.Frame):  # Inherit from ttkbootstrap's Frame
         elif input_format == 'HSV':
             self.color_input.set("360, 100, 100")  # Example for HSV
 
-    def convert_color(self):
+    def update_profile_label(self):
+        """Show the name of the configured CMYK profile."""
+        profile = get_cmyk_profile()
+        self.profile_label.config(text=os.path.basename(profile) if profile else "None (naive)")
+
+    def load_cmyk_profile(self):
+        """Ask for a CMYK ICC profile and use it for the conversions."""
+        path = filedialog.askopenfilename(filetypes=[("ICC profiles", "*.icc *.icm"), ("All files", "*.*")])
+        if path:
+            self.apply_cmyk_profile(path)
+
+    def apply_cmyk_profile(self, path):
+        """Configure the CMYK profile and selected intent, then convert the current input again."""
+        try:
+            set_cmyk_profile(path, self.rendering_intent.get())
+        except ValueError as e:
+            self.error_label.config(text=str(e))
+            return
+        self.update_profile_label()
+        self.last_parsed = None  # CMYK input parses differently under another profile
+        if self.color_input.get().strip():
+            self.convert_color(live=True)
+
+    def schedule_conversion(self, *args):
+        """
+        Convert the input once it has not changed for CONVERT_DEBOUNCE_MS. Each change only records
+        the time; a single timer is rescheduled when it fires early, so rapid input costs no extra
+        timer calls.
+        """
+        self.last_input_time = time.monotonic()
+        if self.pending_conversion is None:
+            self.pending_conversion = self.after(CONVERT_DEBOUNCE_MS, self.run_scheduled_conversion)
+
+    def run_scheduled_conversion(self):
+        """Runs the live conversion if typing has paused, otherwise waits for the rest of the pause."""
+        remaining = CONVERT_DEBOUNCE_MS - (time.monotonic() - self.last_input_time) * 1000
+        if remaining > 0:
+            self.pending_conversion = self.after(int(remaining) + 1, self.run_scheduled_conversion)
+            return
+        self.pending_conversion = None
+        self.convert_color(live=True)
+
+    def parse_input(self, input_value, input_format):
+        """
+        Parse the input to RGB. CSS syntaxes (#abc, rgb(), hsl(), named colours, ...) are detected
+        automatically; bare lists of values are read in the selected format.
+
+        @param input_value: Stripped input text.
+        @param input_format: One of RGB, HEX, CMYK, HSL or HSV.
+        @return: (r, g, b) tuple.
+        @raise ValueError: If the input is not valid in the format.
+        """
+        return parse_colour(input_value, hint=input_format).rgb
+
+    def convert_color(self, live=False):
+        """
+        Convert the input and show every representation. Input that is unchanged since the last
+        conversion is not parsed again, and only outputs whose text changed are pushed to Tk.
+
+        @param live: True when triggered by typing rather than the Convert button; empty input is
+        then ignored instead of reported.
+        """
+        if self.pending_conversion is not None and not live:
+            self.after_cancel(self.pending_conversion)  # The button converts now, so drop the pending run
+            self.pending_conversion = None
         input_value = self.color_input.get().strip()
         input_format = self.color_format.get()
 
         if not input_value:
-            self.error_label.config(text="Please provide a valid input value")
+            if not live:
+                self.error_label.config(text="Please provide a valid input value")
             return
 
         try:
-            if input_format == 'HEX':
-                if not input_value.startswith("#"):
-                    input_value = "#" + input_value  # Add missing '#' if necessary
-                rgb = hex_to_rgb(input_value)
-
-            elif input_format == 'RGB':
-                values = [x.strip() for x in input_value.split(',')]
-                if len(values) != 3:
-                    raise ValueError("RGB input must have 3 values (e.g., 255, 255, 255)")
-                rgb = tuple(map(int, values))
-
-            elif input_format == 'CMYK':
-                values = [x.strip() for x in input_value.split(',')]
-                if len(values) != 4:
-                    raise ValueError("CMYK input must have 4 values (e.g., 0.0, 0.0, 0.0, 0.0)")
-                cmyk = tuple(map(float, values))
-                rgb = cmyk_to_rgb(*cmyk)
-
-            elif input_format == 'HSL':
-                values = [x.strip() for x in input_value.split(',')]
-                if len(values) != 3:
-                    raise ValueError("HSL input must have 3 values (e.g., 360, 100, 50)")
-                hsl = tuple(map(float, values))
-                rgb = hsl_to_rgb(*hsl)
-
-            elif input_format == 'HSV':
-                values = [x.strip() for x in input_value.split(',')]
-                if len(values) != 3:
-                    raise ValueError("HSV input must have 3 values (e.g., 360, 100, 100)")
-                hsv = tuple(map(float, values))
-                rgb = hsv_to_rgb(*hsv)
-
+            if self.last_parsed and self.last_parsed[:2] == (input_format, input_value):
+                rgb = self.last_parsed[2]
             else:
-                raise ValueError("Invalid input format")
-
-            # Convert RGB to other formats
-            hex_value = rgb_to_hex(*rgb)
-            cmyk = rgb_to_cmyk(*rgb)
-            hsl = rgb_to_hsl(*rgb)
-            hsv = rgb_to_hsv(*rgb)
-
-            # Update UI with converted values
-            self.color_display.config(bg=hex_value)
-            self.rgb_value.set(f"{rgb[0]}, {rgb[1]}, {rgb[2]}")
-            self.hsl_value.set(f"{hsl[0]}, {hsl[1]}, {hsl[2]}")
-            self.hsv_value.set(f"{hsv[0]}, {hsv[1]}, {hsv[2]}")
-            self.cmyk_value.set(f"{cmyk[0]}, {cmyk[1]}, {cmyk[2]}, {cmyk[3]}")
-            self.hex_value_var.set(hex_value)
-
-            self.error_label.config(text="")  # Clear error message on success
+                rgb = tuple(self.parse_input(input_value, input_format))
+                self.last_parsed = (input_format, input_value, rgb)
+            self.show_colour(rgb)
+            if self.error_label.cget("text"):
+                self.error_label.config(text="")  # Clear error message on success
 
         except ValueError as e:
             self.error_label.config(text=str(e))  # Display specific error messages
 
+    def show_colour(self, rgb):
+        """Pushes the representations of a colour to the outputs, skipping any whose text is unchanged."""
+        outputs = {"rgb": self.rgb_value, "hsl": self.hsl_value, "hsv": self.hsv_value, "cmyk": self.cmyk_value,
+                   "hex": self.hex_value_var}
+        for name, text in format_representations(rgb, get_cmyk_profile(), get_rendering_intent()):
+            if self.displayed.get(name) != text:
+                outputs[name].set(text)
+                self.displayed[name] = text
+                if name == "hex":
+                    self.color_display.config(bg=text)
+
 # Example usage:
 if __name__ == "__main__":
     root = ttkb.Window(themename="darkly")  # Create a themed window
@@ -0,0 +1,159 @@
+import argparse
+from collections import namedtuple
+import cv2
+import numpy as np
+from PIL import Image
+from colour_spaces import RGB_TO_XYZ, to_rgb8, srgb_to_linear, linear_to_srgb
+
+# White balance and exposure normalisation applied before palette extraction, so palettes do not
+# drift with the lighting. Statistics come from a pixel sample in linear RGB, and the correction is
+# a per-channel lookup table applied to the frame in place.
+WHITE_BALANCE_METHODS = ("gray-world", "white-patch")
+SAMPLE_PIXELS = 1 << 14  # Pixels sampled for the statistics
+WHITE_PATCH_PERCENTILE = 99  # Brightness percentile taken as the white patch, ignoring specular highlights
+EXPOSURE_TARGET = 0.18  # Mean linear luminance after normalisation (18% grey)
+EXPOSURE_LIMITS = (0.25, 4.0)  # Smallest and largest exposure gain applied
+TEMPERATURE_LIMITS = (1000, 25000)  # Kelvin range reported by the temperature estimate
+LUMINANCE = RGB_TO_XYZ[1]
+
+# Linear-RGB gain per channel from white balance, the exposure gain on top of it, and the estimated
+# colour temperature of the light in kelvin (None for a black frame)
+Correction = namedtuple("Correction", ["gains", "exposure", "temperature"])
+
+def validate_method(method):
+    """
+    Validate that a white balance method is supported.
+
+    Parameters:
+    method (str): Name of the method, or None for no white balance.
+
+    Raises:
+    ValueError: If the method is not None or one of WHITE_BALANCE_METHODS.
+    """
+    if method is not None and method not in WHITE_BALANCE_METHODS:
+        raise ValueError(f"Invalid white balance method: {method}. "
+                         f"Must be one of {', '.join(WHITE_BALANCE_METHODS)}.")
+
+def colour_temperature(rgb):
+    """
+    Estimate the correlated colour temperature of a light from its linear RGB colour, using
+    McCamy's approximation from CIE xy chromaticity.
+
+    Parameters:
+    rgb (array-like): Linear RGB values (0-1) of the light, e.g. the average of a frame.
+
+    Returns:
+    int: Temperature in kelvin, clipped to TEMPERATURE_LIMITS, or None for black.
+    """
+    xyz = np.asarray(rgb, dtype=np.float64) @ RGB_TO_XYZ.T
+    total = xyz.sum()
+    if total <= 1e-6:
+        return None
+    x, y = xyz[0] / total, xyz[1] / total
+    n = (x - 0.3320) / (0.1858 - y)
+    cct = 449 * n ** 3 + 3525 * n ** 2 + 6823.3 * n + 5520.33
+    return int(round(np.clip(cct, *TEMPERATURE_LIMITS)))
+
+def estimate_correction(image, method="gray-world", exposure=True, sample_pixels=SAMPLE_PIXELS):
+    """
+    Estimate the white balance and exposure correction of an RGB image from a sample of its pixels.
+
+    Gray world assumes the scene averages to grey, so each channel is scaled to the mean of the
+    channel averages. White patch assumes the brightest pixels are white, so each channel is scaled
+    to bring its WHITE_PATCH_PERCENTILE up to that of the brightest channel. Exposure then scales
+    all channels so the mean luminance reaches EXPOSURE_TARGET.
+
+    Parameters:
+    image (numpy.ndarray): uint8 RGB array of shape (h, w, 3).
+    method (str): One of WHITE_BALANCE_METHODS, or None for no white balance.
+    exposure (bool): Normalise the exposure too.
+    sample_pixels (int): Approximate number of pixels the statistics are computed from.
+
+    Returns:
+    Correction: The gains and the estimated colour temperature.
+    """
+    validate_method(method)
+    # Sample a grid of the 2-D image, so only the sampled pixels are copied, even from strided views
+    height, width = image.shape[:2]
+    step = max(1, int((height * width / sample_pixels) ** 0.5))
+    sample = srgb_to_linear(image[::step, ::step].reshape(-1, 3))
+    means = sample.mean(axis=0)
+    if method == "white-patch":
+        illuminant = np.percentile(sample, WHITE_PATCH_PERCENTILE, axis=0)
+        target = illuminant.max()
+    else:
+        illuminant = means
+        target = means.mean()
+    temperature = colour_temperature(illuminant)
+    gains = np.ones(3)
+    if method is not None and temperature is not None:
+        gains = target / np.maximum(illuminant, 1e-6)
+    gain = 1.0
+    if exposure:
+        luminance = float((means * gains) @ LUMINANCE)
+        gain = float(np.clip(EXPOSURE_TARGET / max(luminance, 1e-6), *EXPOSURE_LIMITS))
+    return Correction(gains, gain, temperature)
+
+def correction_lut(correction):
+    """
+    Build the per-channel lookup table of a correction, scaling in linear RGB.
+
+    Parameters:
+    correction (Correction): Gains returned by estimate_correction.
+
+    Returns:
+    numpy.ndarray: uint8 array of shape (256, 1, 3), the layout cv2.LUT takes for 3-channel images.
+    """
+    linear = srgb_to_linear(np.repeat(np.arange(256)[:, None], 3, axis=1))
+    corrected = np.clip(linear * (np.asarray(correction.gains) * correction.exposure), 0, 1)
+    return to_rgb8(linear_to_srgb(corrected)).reshape(256, 1, 3)
+
+def apply_correction(image, correction):
+    """
+    Apply a correction to an RGB image in place, in a single pass over the pixels.
+
+    Contiguous arrays go through cv2.LUT; OpenCV cannot write into strided views such as
+    image[::2, ::2], so those are indexed channel by channel with NumPy instead.
+
+    Parameters:
+    image (numpy.ndarray): uint8 RGB array of shape (h, w, 3); overwritten.
+    correction (Correction): Gains returned by estimate_correction.
+
+    Returns:
+    numpy.ndarray: The same array.
+    """
+    lut = correction_lut(correction)
+    if image.flags.c_contiguous:
+        return cv2.LUT(image, lut, dst=image)
+    for channel in range(3):
+        image[..., channel] = lut[image[..., channel], 0, channel]
+    return image
+
+def normalise_colours(image, method="gray-world", exposure=True):
+    """
+    White-balance and normalise the exposure of an RGB image in place.
+
+    Parameters:
+    image (numpy.ndarray): uint8 RGB array of shape (h, w, 3); overwritten.
+    method (str): One of WHITE_BALANCE_METHODS, or None for no white balance.
+    exposure (bool): Normalise the exposure too.
+
+    Returns:
+    Correction: The applied correction, including the estimated colour temperature.
+    """
+    correction = estimate_correction(image, method, exposure)
+    apply_correction(image, correction)
+    return correction
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="White-balance and normalise the exposure of an image.")
+    parser.add_argument("image")
+    parser.add_argument("output")
+    parser.add_argument("--method", default="gray-world", choices=list(WHITE_BALANCE_METHODS))
+    parser.add_argument("--no-exposure", action="store_true", help="Keep the exposure as it is")
+    args = parser.parse_args()
+    with Image.open(args.image) as source:
+        array = np.array(source.convert("RGB"))
+    correction = normalise_colours(array, args.method, not args.no_exposure)
+    Image.fromarray(array).save(args.output)
+    print(f"Saved {args.output} (estimated light {correction.temperature} K, exposure x{correction.exposure:.2f})")
@@ -0,0 +1,113 @@
+import math
+import os
+from functools import lru_cache
+import cv2
+import numpy as np
+from PIL import Image
+from gradient_functions import make_gradient
+from image_transform import CHUNK_PIXELS
+
+# Hue/saturation density of an image, drawn over the Colour Gear wheel. OpenCV's 8-bit HSV has 256
+# hue and saturation levels, so bin counts that divide 256 give every bin the same width.
+HUE_BINS = 128  # 2.8 degrees each
+SATURATION_BINS = 32
+OVERLAY_ALPHA = 0.8  # Opacity of the densest bin
+MIN_ALPHA = 24  # Opacity (0-255) of the sparsest non-empty bin, so every colour present shows
+DENSITY_STOPS = ("#2b83ba", "#abdda4", "#ffffbf", "#fdae61", "#d7191c")  # Sparse to dense
+
+def hue_saturation_histogram(image, hue_bins=HUE_BINS, saturation_bins=SATURATION_BINS,
+                             chunk_pixels=CHUNK_PIXELS):
+    """
+    Count the pixels of an image per hue and saturation bin, a band of rows at a time.
+
+    Parameters:
+    image (numpy.ndarray): uint8 RGB array of shape (h, w, 3).
+    hue_bins (int): Number of hue bins over 0-360 degrees.
+    saturation_bins (int): Number of saturation bins over 0-100%.
+    chunk_pixels (int): Pixels binned per chunk, bounding the temporary arrays.
+
+    Returns:
+    numpy.ndarray: int64 array of shape (hue_bins, saturation_bins) holding pixel counts.
+    """
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError(f"Invalid image shape: {image.shape}. Must be (height, width, 3).")
+    counts = np.zeros(hue_bins * saturation_bins, dtype=np.int64)
+    rows = max(1, chunk_pixels // max(1, image.shape[1]))
+    for top in range(0, image.shape[0], rows):
+        hsv = cv2.cvtColor(np.ascontiguousarray(image[top:top + rows]), cv2.COLOR_RGB2HSV_FULL)
+        hue = hsv[..., 0].astype(np.intp) * hue_bins >> 8
+        saturation = hsv[..., 1].astype(np.intp) * saturation_bins >> 8
+        counts += np.bincount((hue * saturation_bins + saturation).ravel(), minlength=len(counts))
+    return counts.reshape(hue_bins, saturation_bins)
+
+@lru_cache(maxsize=8)
+def file_histogram(path, modified, hue_bins=HUE_BINS, saturation_bins=SATURATION_BINS):
+    """
+    Histogram of an image file, cached per path and modification time.
+
+    Parameters:
+    path (str): Path of the image.
+    modified (float): Modification time of the file, so edited files are binned again.
+    hue_bins, saturation_bins (int): Number of bins, as for hue_saturation_histogram.
+
+    Returns:
+    numpy.ndarray: Read-only int64 array of shape (hue_bins, saturation_bins).
+    """
+    with Image.open(path) as image:
+        histogram = hue_saturation_histogram(np.asarray(image.convert("RGB")), hue_bins, saturation_bins)
+    histogram.flags.writeable = False
+    return histogram
+
+def image_histogram(path):
+    """Return the cached histogram of an image file, binning it again only if the file changed."""
+    return file_histogram(path, os.path.getmtime(path))
+
+@lru_cache(maxsize=4)
+def wheel_bins(size, hue_bins=HUE_BINS, saturation_bins=SATURATION_BINS):
+    """
+    Map every pixel of a Colour Gear wheel to its hue/saturation bin, with the wheel's geometry.
+
+    Parameters:
+    size (int): Width and height of the wheel in pixels.
+    hue_bins, saturation_bins (int): Number of bins.
+
+    Returns:
+    numpy.ndarray: Read-only intp array of shape (size, size) holding flat bin indices, -1 outside the wheel.
+    """
+    center = size // 2
+    radius = max(1, size // 2)
+    dx = np.arange(size, dtype=np.float64) - center
+    dy = dx[:, None]
+    distance = np.sqrt(dx * dx + dy * dy)
+    hue = ((np.arctan2(dy, dx) + math.pi) / (2 * math.pi) * 360) % 360
+    hue_index = np.minimum((hue * hue_bins / 360).astype(np.intp), hue_bins - 1)
+    saturation_index = np.minimum((distance / radius * saturation_bins).astype(np.intp), saturation_bins - 1)
+    bins = np.where(distance <= radius, hue_index * saturation_bins + saturation_index, -1)
+    bins.flags.writeable = False
+    return bins
+
+def density_overlay(histogram, size, max_alpha=OVERLAY_ALPHA):
+    """
+    Render a hue/saturation histogram as a translucent heatmap over a wheel of the given size.
+    Densities are log-scaled so sparse colours stay visible next to dominant ones; empty bins
+    are fully transparent.
+
+    Parameters:
+    histogram (numpy.ndarray): Counts of shape (hue_bins, saturation_bins).
+    size (int): Width and height of the wheel in pixels.
+    max_alpha (float): Opacity of the densest bin (0-1).
+
+    Returns:
+    PIL.Image.Image: RGBA image of size (size, size).
+    """
+    hue_bins, saturation_bins = histogram.shape
+    density = np.log1p(histogram.ravel().astype(np.float64))
+    if density.max() > 0:
+        density /= density.max()
+    ramp = make_gradient(DENSITY_STOPS, 256, "OKLab")
+    level = np.rint(density * 255).astype(np.intp)
+    alpha = np.rint(MIN_ALPHA + density * (max_alpha * 255 - MIN_ALPHA))
+    colours = np.zeros((len(density) + 1, 4), dtype=np.uint8)  # The last entry, index -1, is outside the wheel
+    colours[:-1, :3] = ramp[level]
+    colours[:-1, 3] = np.where(histogram.ravel() > 0, alpha, 0)
+    return Image.fromarray(colours[wheel_bins(size, hue_bins, saturation_bins)], "RGBA")
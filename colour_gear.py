@@ -1,9 +1,136 @@
 from conversion_functions import *
+from batch_conversions import hsv_to_rgb_float_batch, jit_kernels
+from gradient_functions import GRADIENT_SPACES, make_gradient, gradient_to_image
+from contrast_functions import text_colour
+from cvd_simulation import CVD_MATRICES, simulate_cvd
+from colour_density import density_overlay
+from profiling import profiler
 import tkinter as tk
 from tkinter import ttk
 from tkinter import Canvas
-from PIL import Image, ImageDraw, ImageTk
+from PIL import Image, ImageTk
 import math
+import queue
+from collections import namedtuple
+import threading
+import numpy as np
+
+MIN_WHEEL_SIZE = 100  # Smallest wheel drawn when the window shrinks
+PREVIEW_FACTOR = 4  # The instant preview is rendered at 1/PREVIEW_FACTOR resolution
+RENDER_BAND = 64  # Rows rendered between cancellation checks
+RENDER_POLL_MS = 15  # How often the UI thread checks for a finished background render
+WHEEL_CACHE_SIZE = 4  # Number of wheel sizes whose cached colours are kept
+SIMULATED_WHEEL_CACHE_SIZE = 8  # Number of colour-vision simulations of wheels that are kept
+GRADIENT_PREVIEW_WIDTH = 300  # Size of the harmony gradient preview strip
+GRADIENT_PREVIEW_HEIGHT = 24
+
+# Wheel colours cached per size. Every RGB channel of an HSV colour is proportional to V, so the wheel
+# at any brightness is the unrounded full-value (V = 100) colours scaled and rounded. full_value is the
+# exact V = 100 wheel and base holds the unrounded float32 colours used for scaling.
+WheelBase = namedtuple("WheelBase", ["full_value", "base"])
+_wheel_bases = {}
+_wheel_bases_lock = threading.Lock()
+# Wheels as seen with a colour vision deficiency, cached per (size, value, deficiency, severity %)
+_simulated_wheels = {}
+
+def wheel_base(size, cancelled=None):
+    """
+    Return the cached colours of a wheel, computing the hue and saturation of every pixel only the
+    first time a size is requested. Safe to call off the UI thread.
+
+    @param size: Width and height of the wheel in pixels.
+    @param cancelled: Optional callable; rendering stops early and returns None once it returns True.
+    @return: WheelBase of (size, size, 3) arrays, black outside the wheel, or None if cancelled.
+    """
+    with _wheel_bases_lock:
+        wheel = _wheel_bases.get(size)
+    if wheel is not None:
+        return wheel
+
+    center = size // 2
+    radius = max(1, size // 2)
+    base = np.zeros((size, size, 3), dtype=np.float64)
+    dx = np.arange(size, dtype=np.float64) - center
+    kernels = jit_kernels()
+    for top in range(0, size, RENDER_BAND):
+        if cancelled is not None and cancelled():
+            return None
+        if kernels is not None:
+            kernels.wheel_rows(size, top, min(top + RENDER_BAND, size), base)
+            continue
+        dy = np.arange(top, min(top + RENDER_BAND, size), dtype=np.float64)[:, None] - center
+        distance = np.sqrt(dx * dx + dy * dy)
+        inside = distance <= radius
+        hue = ((np.arctan2(dy, dx) + math.pi) / (2 * math.pi) * 360) % 360
+        saturation = distance / radius * 100
+        hsv = np.stack([hue[inside], saturation[inside], np.full(np.count_nonzero(inside), 100.0)], axis=-1)
+        base[top:top + RENDER_BAND][inside] = hsv_to_rgb_float_batch(hsv)
+
+    full_value = np.rint(base).astype(np.uint8)
+    full_value.flags.writeable = False
+    wheel = WheelBase(full_value, base.astype(np.float32))
+    with _wheel_bases_lock:
+        if len(_wheel_bases) >= WHEEL_CACHE_SIZE:
+            _wheel_bases.pop(next(iter(_wheel_bases)))
+        _wheel_bases[size] = wheel
+    return wheel
+
+def apply_wheel_value(wheel, value, out=None):
+    """
+    Map cached wheel colours to RGB at the given value (brightness).
+
+    @param wheel: WheelBase returned by wheel_base.
+    @param value: HSV value (0-100).
+    @param out: Optional float32 array of the wheel's shape to reuse as scratch space (NumPy backend only).
+    @return: uint8 array of shape (size, size, 3). At V = 100 this is the read-only cached wheel.
+    """
+    if value == 100:
+        return wheel.full_value
+    kernels = jit_kernels()
+    if kernels is not None:
+        result = np.empty(wheel.base.shape, dtype=np.uint8)
+        kernels.scale_wheel(wheel.base, np.float32(value / 100), result)
+        return result
+    scaled = np.multiply(wheel.base, np.float32(value / 100), out=out)
+    return np.rint(scaled, out=scaled).astype(np.uint8)
+
+def render_colour_wheel(size, value=100, cancelled=None):
+    """
+    Render the HSV colour wheel as an RGB array. Safe to call off the UI thread.
+
+    @param size: Width and height of the wheel in pixels.
+    @param value: HSV value (0-100) shared by every pixel of the wheel.
+    @param cancelled: Optional callable; rendering stops early and returns None once it returns True.
+    @return: uint8 array of shape (size, size, 3), or None if cancelled.
+    """
+    wheel = wheel_base(size, cancelled)
+    if wheel is None:
+        return None
+    return apply_wheel_value(wheel, value)
+
+def simulated_wheel(size, value, deficiency, severity):
+    """
+    Return the wheel as seen with a colour vision deficiency, cached next to the normal wheel so
+    toggling the simulation does not recompute it.
+
+    @param size: Width and height of the wheel in pixels.
+    @param value: HSV value (0-100) of the wheel.
+    @param deficiency: One of cvd_simulation.CVD_MATRICES.
+    @param severity: Severity in percent (0-100).
+    @return: Read-only uint8 array of shape (size, size, 3).
+    """
+    key = (size, value, deficiency, severity)
+    with _wheel_bases_lock:
+        wheel = _simulated_wheels.get(key)
+    if wheel is not None:
+        return wheel
+    wheel = simulate_cvd(render_colour_wheel(size, value), deficiency, severity / 100)
+    wheel.flags.writeable = False
+    with _wheel_bases_lock:
+        if len(_simulated_wheels) >= SIMULATED_WHEEL_CACHE_SIZE:
+            _simulated_wheels.pop(next(iter(_simulated_wheels)))
+        _simulated_wheels[key] = wheel
+    return wheel
 
 class ColourGearPage(ttk.Frame):
     def __init__(self, parent, controller):
@@ -11,6 +138,20 @@ class ColourGearPage(ttk.Frame):
         self.controller = controller
         self.size = 300
         self.current_harmony = tk.StringVar(value="Complementary")
+        self.value = tk.IntVar(value=100)  # HSV value (brightness) of the whole wheel
+        self.value_scratch = None  # Reused float buffer for brightness changes
+        self.selected_point = None  # Last selected wheel position, kept so it survives resizes
+
+        # Background rendering state; bumping the generation cancels stale renders
+        self.render_generation = 0
+        self.render_queue = queue.Queue()
+        self.render_polling = False
+        self.wheel_is_preview = False  # True while the upscaled low-resolution wheel is showing
+
+        # Hue/saturation density of an image from Colour Grab, drawn as one translucent image over the wheel
+        self.density_histogram = None
+        self.density_overlays = {}  # Overlay images of the current histogram per wheel size
+        self.density_item = None
 
         # Cache the colour wheel image
         self.colour_wheel = self.create_colour_wheel(self.size)
@@ -21,9 +162,41 @@ class ColourGearPage(ttk.Frame):
 
         # Create the canvas for the colour wheel
         self.canvas = Canvas(self, width=self.size, height=self.size)
-        self.canvas.create_image((self.size // 2, self.size // 2), image=self.colour_wheel_tk)
+        self.wheel_item = self.canvas.create_image((self.size // 2, self.size // 2), image=self.colour_wheel_tk)
         self.canvas.pack(pady=10)
 
+        # Brightness slider; dragging it re-renders the wheel live
+        self.value_frame = tk.Frame(self)
+        self.value_frame.pack(pady=(0, 10))
+        tk.Label(self.value_frame, text="Brightness", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        self.value_slider = ttk.Scale(self.value_frame, from_=0, to=100, orient=tk.HORIZONTAL, length=200,
+                                      command=self.on_value_change)
+        self.value_slider.set(self.value.get())
+        self.value_slider.pack(side=tk.LEFT)
+        self.value_label = tk.Label(self.value_frame, textvariable=self.value, width=4)
+        self.value_label.pack(side=tk.LEFT, padx=5)
+
+        # Colour vision simulation of the displayed wheel; picked colours stay the real ones
+        self.cvd_type = tk.StringVar(value="Normal")
+        self.cvd_severity = tk.IntVar(value=100)  # Percent
+        self.cvd_frame = tk.Frame(self)
+        self.cvd_frame.pack(pady=(0, 10))
+        tk.Label(self.cvd_frame, text="Vision", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        cvd_selector = ttk.Combobox(self.cvd_frame, textvariable=self.cvd_type, width=12, state="readonly",
+                                    values=["Normal"] + [name.capitalize() for name in CVD_MATRICES])
+        cvd_selector.pack(side=tk.LEFT, padx=5)
+        cvd_selector.bind("<<ComboboxSelected>>", lambda event: self.refresh_wheel_display())
+        self.cvd_slider = ttk.Scale(self.cvd_frame, from_=0, to=100, orient=tk.HORIZONTAL, length=100,
+                                    command=self.on_severity_change)
+        self.cvd_slider.set(self.cvd_severity.get())
+        self.cvd_slider.pack(side=tk.LEFT)
+        tk.Label(self.cvd_frame, textvariable=self.cvd_severity, width=4).pack(side=tk.LEFT, padx=5)
+        self.show_density_overlay = tk.BooleanVar(value=True)
+        self.density_check = ttk.Checkbutton(self.cvd_frame, text="Image density", state=tk.DISABLED,
+                                             variable=self.show_density_overlay,
+                                             command=self.update_density_overlay)
+        self.density_check.pack(side=tk.LEFT, padx=5)
+
         self.canvas.bind("<B1-Motion>", self.on_motion)
         self.canvas.bind("<Button-1>", self.on_click)
 
@@ -46,28 +219,170 @@ class ColourGearPage(ttk.Frame):
             placeholder.grid(row=i // 2, column=(i % 2) * 2, columnspan=2, padx=5, pady=5, sticky="ew")
             placeholder.grid_remove()
 
+        # Gradient preview through the selected colour and its harmony
+        self.gradient_space = tk.StringVar(value="OKLab")
+        self.gradient_frame = tk.Frame(self)
+        self.gradient_frame.pack(pady=(0, 10))
+        gradient_space_selector = ttk.Combobox(self.gradient_frame, textvariable=self.gradient_space,
+                                               values=list(GRADIENT_SPACES), width=8, state="readonly")
+        gradient_space_selector.pack(side=tk.LEFT, padx=5)
+        gradient_space_selector.bind("<<ComboboxSelected>>", lambda event: self.refresh_gradient_preview())
+        self.gradient_label = tk.Label(self.gradient_frame, relief="ridge")
+        self.gradient_label.pack(side=tk.LEFT)
+        self.gradient_colours = []
+
         self.update_harmony(self.current_harmony.get())
 
+        # Follow the size of the container
+        self.bind("<Configure>", self.on_resize)
+
     def create_colour_wheel(self, size):
         """Creates a colour wheel image based on HSV values, caching it for faster access."""
-        image = Image.new("RGB", (size, size))
-        draw = ImageDraw.Draw(image)
-        center = size // 2
-        radius = size // 2
-
-        # Precompute wheel
-        for x in range(size):
-            for y in range(size):
-                dx, dy = x - center, y - center
-                distance = math.sqrt(dx * dx + dy * dy)
-                if distance <= radius:
-                    angle = math.atan2(dy, dx)
-                    hue = (angle + math.pi) / (2 * math.pi) * 360
-                    hue = hue % 360  # Ensure hue is within [0, 360) range
-                    saturation = distance / radius * 100
-                    rgb = hsv_to_rgb(hue, saturation, 100)
-                    draw.point((x, y), fill=rgb)
-        return image
+        return Image.fromarray(render_colour_wheel(size, self.value.get()))
+
+    def on_value_change(self, value):
+        """Re-renders the wheel at the slider's brightness, reusing the cached hue and saturation."""
+        value = int(round(float(value)))
+        if value == self.value.get():
+            return
+        self.value.set(value)
+        if self.wheel_is_preview:
+            # The full-resolution wheel is still rendering and picks up the new value when it lands
+            self.colour_wheel = self.preview_wheel(self.size)
+        else:
+            wheel = wheel_base(self.size)
+            if self.value_scratch is None or self.value_scratch.shape != wheel.base.shape:
+                self.value_scratch = np.empty_like(wheel.base)
+            self.colour_wheel = Image.fromarray(apply_wheel_value(wheel, value, out=self.value_scratch))
+        self.colour_wheel_tk.paste(self.wheel_display_image())  # Update the displayed image in place
+        if self.selected_point is not None:
+            self.select_point(*self.selected_point)
+
+    def on_severity_change(self, value):
+        """Re-simulates the wheel at the slider's severity."""
+        value = int(round(float(value)))
+        if value != self.cvd_severity.get():
+            self.cvd_severity.set(value)
+            self.refresh_wheel_display()
+
+    def wheel_display_image(self):
+        """Returns the wheel image to show: the wheel itself, or as seen with the selected deficiency."""
+        deficiency = self.cvd_type.get().lower()
+        if deficiency not in CVD_MATRICES:
+            return self.colour_wheel
+        if self.wheel_is_preview:  # Simulate the preview directly rather than render the full wheel now
+            return Image.fromarray(simulate_cvd(np.asarray(self.colour_wheel), deficiency,
+                                                self.cvd_severity.get() / 100))
+        return Image.fromarray(simulated_wheel(self.size, self.value.get(), deficiency, self.cvd_severity.get()))
+
+    def refresh_wheel_display(self):
+        """Shows the wheel again after the colour vision simulation changed."""
+        self.colour_wheel_tk.paste(self.wheel_display_image())
+
+    def show_density(self, histogram, name):
+        """
+        Overlays the hue/saturation density of an image on the wheel.
+
+        @param histogram: Counts per hue and saturation bin, from colour_density.hue_saturation_histogram.
+        @param name: Name of the image, shown next to the toggle.
+        """
+        self.density_histogram = histogram
+        self.density_overlays = {}
+        self.show_density_overlay.set(True)
+        self.density_check.config(state=tk.NORMAL, text=f"Image density: {name}")
+        self.update_density_overlay()
+
+    def update_density_overlay(self):
+        """Draws the density overlay at the current wheel size, or removes it when hidden."""
+        if self.density_histogram is None or not self.show_density_overlay.get():
+            if self.density_item is not None:
+                self.canvas.delete(self.density_item)
+                self.density_item = None
+            return
+        overlay = self.density_overlays.get(self.size)
+        if overlay is None:
+            overlay = ImageTk.PhotoImage(density_overlay(self.density_histogram, self.size))
+            if len(self.density_overlays) >= WHEEL_CACHE_SIZE:
+                self.density_overlays.pop(next(iter(self.density_overlays)))
+            self.density_overlays[self.size] = overlay
+        if self.density_item is None:
+            self.density_item = self.canvas.create_image((self.size // 2, self.size // 2), image=overlay)
+            self.canvas.tag_raise(self.density_item, self.wheel_item)  # Above the wheel, below the markers
+        else:
+            self.canvas.coords(self.density_item, self.size // 2, self.size // 2)
+            self.canvas.itemconfig(self.density_item, image=overlay)
+
+    def available_wheel_size(self, width, height):
+        """Returns the largest wheel size that fits the page next to the other widgets."""
+        reserved = (self.harmony_buttons_frame.winfo_reqheight() + self.selected_colour_label.winfo_reqheight()
+                    + self.value_frame.winfo_reqheight() + self.cvd_frame.winfo_reqheight()
+                    + self.gradient_frame.winfo_reqheight()
+                    + 2 * self.placeholders[0].winfo_reqheight() + 100)  # Two harmony rows plus padding
+        return max(MIN_WHEEL_SIZE, min(width - 20, height - reserved))
+
+    def on_resize(self, event):
+        """Resizes the colour wheel when the page changes size."""
+        size = self.available_wheel_size(event.width, event.height)
+        if size != self.size:
+            self.resize_wheel(size)
+
+    def preview_wheel(self, size):
+        """Renders the wheel at low resolution and scales it up, for showing while the full wheel renders."""
+        with profiler.span("wheel.preview"):
+            return self.create_colour_wheel(max(1, size // PREVIEW_FACTOR)).resize((size, size), Image.BILINEAR)
+
+    def resize_wheel(self, size):
+        """Shows a low-resolution wheel immediately and renders the full-resolution one in the background."""
+        self.render_generation += 1
+        generation = self.render_generation
+        self.wheel_is_preview = True
+        self.set_wheel_image(self.preview_wheel(size))
+        threading.Thread(target=self.render_in_background, args=(size, generation), daemon=True).start()
+        if not self.render_polling:
+            self.render_polling = True
+            self.after(RENDER_POLL_MS, self.poll_render_queue)
+
+    def render_in_background(self, size, generation):
+        """Renders the wheel off the UI thread, giving up once a newer resize supersedes it."""
+        with profiler.span("wheel.render"):
+            wheel = wheel_base(size, cancelled=lambda: generation != self.render_generation)
+        if wheel is not None:
+            self.render_queue.put((generation, wheel))
+
+    def poll_render_queue(self):
+        """Swaps in the full-resolution wheel once the current background render finishes."""
+        while True:
+            try:
+                generation, wheel = self.render_queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.render_generation:
+                # Apply the brightness here so slider moves during the render are not lost
+                self.wheel_is_preview = False
+                self.set_wheel_image(Image.fromarray(apply_wheel_value(wheel, self.value.get())))
+                self.render_polling = False
+                return
+        if self.winfo_exists():
+            self.after(RENDER_POLL_MS, self.poll_render_queue)
+        else:
+            self.render_polling = False
+
+    @profiler.timed("tk.wheel_redraw")
+    def set_wheel_image(self, image):
+        """Displays a wheel image, resizing the canvas and keeping the current selection in place."""
+        old_size = self.size
+        self.size = image.width
+        self.colour_wheel = image
+        self.colour_wheel_tk = ImageTk.PhotoImage(self.wheel_display_image())
+        self.image_cache = self.colour_wheel_tk
+        self.canvas.config(width=self.size, height=self.size)
+        self.canvas.coords(self.wheel_item, self.size // 2, self.size // 2)
+        self.canvas.itemconfig(self.wheel_item, image=self.colour_wheel_tk)
+        self.update_density_overlay()
+        if self.selected_point is not None:
+            scale = self.size / old_size
+            x, y = self.selected_point
+            self.select_point(min(self.size - 1, int(x * scale)), min(self.size - 1, int(y * scale)))
 
     def on_motion(self, event):
         """Handles colour selection as the mouse moves."""
@@ -77,9 +392,14 @@ class ColourGearPage(ttk.Frame):
         """Handles colour selection on click."""
         self.handle_selection(event)
 
+    @profiler.timed("wheel.selection")
     def handle_selection(self, event):
-        x, y = event.x, event.y
+        self.select_point(event.x, event.y)
+
+    def select_point(self, x, y):
+        """Selects the wheel colour at (x, y) and shows its harmony."""
         if 0 <= x < self.size and 0 <= y < self.size:
+            self.selected_point = (x, y)
             rgb = self.colour_wheel.getpixel((x, y))
             hex_colour = '#{:02x}{:02x}{:02x}'.format(*rgb)
             text_colour = self.get_text_colour(rgb)
@@ -90,6 +410,36 @@ class ColourGearPage(ttk.Frame):
             # Update harmony based on current selection
             harmony = self.current_harmony.get()
             self.display_harmony(harmony, x, y)
+            self.update_gradient_preview([rgb] + self.get_harmony_colours(harmony, x, y))
+
+    def get_harmony_colours(self, harmony, x, y):
+        """Returns the RGB colours of the given harmony for the wheel position (x, y)."""
+        if harmony == "Complementary":
+            comp_x, comp_y, comp_rgb = self.get_complementary_colour(x, y)
+            return [] if comp_rgb is None else [comp_rgb]
+        getters = {
+            "Analogous": self.get_analogous_colours,
+            "Triadic": self.get_triadic_colours,
+            "Tetradic": self.get_tetradic_colours,
+            "Split-Complementary": self.get_split_complementary_colours,
+        }
+        if harmony not in getters:
+            return []
+        return [colour for _, _, colour in getters[harmony](x, y)]
+
+    def update_gradient_preview(self, colours):
+        """Shows a gradient through the given colours in the selected interpolation space."""
+        self.gradient_colours = list(colours)
+        self.refresh_gradient_preview()
+
+    def refresh_gradient_preview(self):
+        """Re-renders the gradient preview, e.g. after the interpolation space changes."""
+        if len(self.gradient_colours) < 2:
+            self.gradient_label.config(image="")
+            return
+        ramp = make_gradient(self.gradient_colours, GRADIENT_PREVIEW_WIDTH, self.gradient_space.get())
+        self.gradient_image_tk = ImageTk.PhotoImage(gradient_to_image(ramp, height=GRADIENT_PREVIEW_HEIGHT))
+        self.gradient_label.config(image=self.gradient_image_tk)
 
     def display_harmony(self, harmony, x, y):
         """Shows appropriate colour harmony based on the selected mode."""
@@ -282,5 +632,5 @@ class ColourGearPage(ttk.Frame):
             placeholder.grid_remove()
 
     def get_text_colour(self, rgb):
-        brightness = (0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]) / 255
-        return "black" if brightness > 0.5 else "white"
+        """Returns black or white, whichever has the higher WCAG contrast against the colour."""
+        return text_colour(rgb)
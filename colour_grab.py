@@ -1,11 +1,41 @@
+import os
+import queue
+import threading
+import time
 import cv2
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
-from tkinter import Canvas
-from PIL import Image, ImageTk
-from sklearn.cluster import KMeans
+from tkinter import Canvas, filedialog
+from PIL import Image, ImageOps, ImageTk
 import ttkbootstrap as ttkb
+from palette_functions import (auto_palette, extract_palette_progressive, ExtractionCancelled, MAX_ITERATIONS,
+                               palette_coverage, label_shares, order_by_coverage, label_map, label_map_image)
+from video_palette import process_video, timeline_to_json, timeline_to_image
+from image_transform import IMAGE_SPACES, export_channels
+from live_palette import LivePalette
+from quality_controller import QualityController, prepare_pixels, describe_quality
+from contrast_functions import text_colours
+from cvd_simulation import CVD_MATRICES, simulate_cvd
+from colour_correction import normalise_colours
+from colour_density import image_histogram
+from regional_palettes import grid_regions, parse_grid, regional_palettes, render_region_swatches
+from profiling import profiler
+from palette_index import PaletteIndex, DATA_FILE
+
+CAPTURE_WIDTH = 640  # Resolution and frame rate requested from the webcam
+CAPTURE_HEIGHT = 480
+CAPTURE_FPS = 30
+ANALYSIS_SCALE = 2  # Webcam frames are downscaled by this factor before clustering, then further as needed
+VIDEO_POLL_MS = 100  # How often the page checks whether a video timeline is ready
+REGION_POLL_MS = 100  # How often the page checks whether regional palettes are ready
+EXPORT_POLL_MS = 100  # How often the page checks whether a channel export has finished
+SIMILAR_POLL_MS = 100  # How often the page checks whether a palette index search is done
+SIMILAR_RESULTS = 5  # Images listed by Find Similar
+REGION_GRIDS = ["2x2", "3x3", "4x4", "6x6"]
+PALETTE_POLL_MS = 50  # How often the page checks on a running palette job
+MIN_LABEL_WIDTH = 60  # Narrowest palette swatch, in pixels, labelled with its hex code and coverage
+WHITE_BALANCE_OPTIONS = {"No white balance": None, "Gray world": "gray-world", "White patch": "white-patch"}
 
 class ColourGrabPage(ttk.Frame):
     def __init__(self, parent, controller):
@@ -22,6 +52,30 @@ class ColourGrabPage(ttk.Frame):
 
         self.cap = None  # Webcam capture not started yet
         self.updating_frame = False  # Prevent multiple update_frame calls
+        self.last_frame = None  # Most recent raw webcam frame, reused for analysis
+        self.frame_buffers = {}  # Preallocated frame buffers, reused for every frame
+        self.timeline = None  # Palette timeline of the last processed video
+        self.video_generation = 0  # Bumped per video job so results of abandoned jobs are ignored
+        self.video_queue = queue.Queue()  # Finished video jobs, handed from the worker thread to Tk
+        self.region_generation = 0  # Bumped per regional palette job so results of abandoned jobs are ignored
+        self.region_queue = queue.Queue()  # Finished regional palette jobs, handed to Tk
+        self.region_results = None  # RegionPalette list of the last regional analysis
+        self.palette_generation = 0  # Bumped per palette job so results of superseded jobs are ignored
+        self.palette_queue = queue.Queue()  # Progress and results of palette jobs, handed to Tk
+        self.palette_cancel = None  # Cancel event of the running palette job, None when idle
+        self.palette_thread = None  # Worker thread of the latest palette job
+        self.palette_polling = False  # True while poll_palette_queue is scheduled, so jobs share one poller
+        self.live_palette = None  # Worker process clustering webcam frames live, None when off
+        self.quality_controller = QualityController()  # Adapts webcam analysis to the target latency
+        self.displayed_palette = None  # Palette on the canvas, redrawn when the vision simulation changes
+        self.displayed_shares = None  # Share of the image each displayed colour covers, None for equal swatches
+        self.colour_map = None  # Image of where each palette colour occurs in the last analysed image
+        self.displayed_preview = None  # Image on the preview canvas, redrawn when the vision simulation changes
+        self.palette_index = None  # PaletteIndex searched by Find Similar, chosen on first use
+        self.export_queue = queue.Queue()  # Finished channel exports, handed from the worker thread to Tk
+        self.export_thread = None  # Worker thread of the latest channel export
+        self.similar_queue = queue.Queue()  # Finished palette index searches, handed to Tk
+        self.similar_thread = None  # Worker thread of the latest palette index search
 
         self._activate_image_mode()  # Set default mode to Image (manually activating)
 
@@ -32,11 +86,22 @@ class ColourGrabPage(ttk.Frame):
         mode_label.grid(column=0, row=0, sticky=tk.W)
 
         self.mode = tk.StringVar(value="Image")  # Default mode is 'Image'
-        mode_selector = ttkb.Combobox(self, textvariable=self.mode, values=["Webcam", "Image"],
+        mode_selector = ttkb.Combobox(self, textvariable=self.mode, values=["Webcam", "Image", "Video"],
                                       bootstyle="info", width=50)
         mode_selector.grid(column=0, row=1, columnspan=2, sticky=(tk.W, tk.E))
         mode_selector.bind("<<ComboboxSelected>>", self.switch_mode)
 
+        # Optional white balance and exposure normalisation of images and webcam frames before clustering
+        self.white_balance = tk.StringVar(value="No white balance")
+        white_balance_selector = ttk.Combobox(self, textvariable=self.white_balance, state="readonly",
+                                              values=list(WHITE_BALANCE_OPTIONS))
+        white_balance_selector.grid(column=0, row=2, sticky=(tk.W, tk.E))
+        self.normalise_exposure = tk.BooleanVar(value=False)
+        exposure_check = ttk.Checkbutton(self, text="Normalise exposure", variable=self.normalise_exposure)
+        exposure_check.grid(column=1, row=2, sticky=tk.W, padx=(10, 0))
+        self.temperature_label = ttk.Label(self, text="")
+        self.temperature_label.grid(column=0, row=3, columnspan=2, sticky=tk.W)
+
         # Image input section
         self.image_path_label = ttk.Label(self, text="Image Path:")
         self.image_path_label.grid(column=0, row=6, sticky=tk.W)
@@ -47,17 +112,80 @@ class ColourGrabPage(ttk.Frame):
         self.image_submit_button = ttk.Button(self, text="Go", command=self.imageSubmit)
         self.image_submit_button.grid(column=0, row=14, sticky=(tk.W, tk.E))
 
+        # Video input section, sharing the path entry with image mode
+        self.video_submit_button = ttk.Button(self, text="Go", command=self.videoSubmit)
+        self.video_submit_button.grid(column=0, row=14, sticky=(tk.W, tk.E))
+
+        self.export_json_button = ttk.Button(self, text="Export JSON", command=self.export_timeline_json)
+        self.export_json_button.grid(column=0, row=16, sticky=(tk.W, tk.E))
+
+        self.export_image_button = ttk.Button(self, text="Export Image", command=self.export_timeline_image)
+        self.export_image_button.grid(column=1, row=16, sticky=(tk.W, tk.E))
+
+        # Channel export of the whole image in another colour space
+        self.channel_space = tk.StringVar(value="HSL")
+        self.channel_space_selector = ttkb.Combobox(self, textvariable=self.channel_space, values=list(IMAGE_SPACES),
+                                                    state="readonly", bootstyle="info")
+        self.channel_space_selector.grid(column=0, row=18, sticky=(tk.W, tk.E))
+
+        self.export_channels_button = ttk.Button(self, text="Export Channels", command=self.export_image_channels)
+        self.export_channels_button.grid(column=1, row=18, sticky=(tk.W, tk.E))
+
+        # Project the image's colours onto the Colour Gear wheel as a density heatmap
+        self.show_on_wheel_button = ttk.Button(self, text="Show on Wheel", command=self.show_image_on_wheel)
+        self.show_on_wheel_button.grid(column=0, row=8, columnspan=2, sticky=(tk.W, tk.E))
+
+        # Palettes per region of the image, drawn as swatches over the image preview
+        self.region_grid = tk.StringVar(value="4x4")
+        self.region_grid_selector = ttk.Combobox(self, textvariable=self.region_grid, values=REGION_GRIDS)
+        self.region_grid_selector.grid(column=0, row=4, sticky=(tk.W, tk.E))
+        self.region_button = ttk.Button(self, text="Regional Palettes", command=self.regionSubmit)
+        self.region_button.grid(column=1, row=4, sticky=(tk.W, tk.E))
+
+        # Where each palette colour occurs in the image, shown on the preview canvas
+        self.colour_map_button = ttk.Button(self, text="Colour Map", command=self.show_colour_map,
+                                            state=tk.DISABLED)
+        self.colour_map_button.grid(column=0, row=5, columnspan=2, sticky=(tk.W, tk.E))
+
         # Webcam and Colour Palette Canvas
         self.webcam_canvas = Canvas(self, width=self.canvas_width, height=self.canvas_height)
         self.webcam_canvas.grid(column=0, row=10, columnspan=2, pady=10)
+        self.webcam_canvas.bind("<Button-1>", self.on_timeline_click)
 
         self.palette_canvas = Canvas(self, width=self.canvas_width, height=50)
         self.palette_canvas.grid(column=0, row=15, columnspan=2, pady=10)
 
+        # Progress of the background palette extraction
+        self.palette_progress = ttk.Progressbar(self, mode="determinate", maximum=1.0)
+        self.palette_progress.grid(column=0, row=19, sticky=(tk.W, tk.E))
+
+        self.cancel_palette_button = ttk.Button(self, text="Cancel", command=self.cancel_palette_job,
+                                                state=tk.DISABLED)
+        self.cancel_palette_button.grid(column=1, row=19, sticky=(tk.W, tk.E))
+
         # Error label for feedback
         self.error_label = ttk.Label(self, text=" ")
         self.error_label.grid(column=0, row=20, sticky=tk.W)
 
+        # Preview the palette and the images on the canvas as seen with a colour vision deficiency;
+        # hex codes stay the real colours
+        self.palette_vision = tk.StringVar(value="Normal")
+        palette_vision_selector = ttk.Combobox(self, textvariable=self.palette_vision, state="readonly",
+                                               values=["Normal"] + [name.capitalize() for name in CVD_MATRICES])
+        palette_vision_selector.grid(column=0, row=21, sticky=(tk.W, tk.E))
+        palette_vision_selector.bind("<<ComboboxSelected>>", lambda event: self.redraw_vision())
+        self.palette_severity = ttk.Scale(self, from_=0, to=100, value=100, orient=tk.HORIZONTAL,
+                                          command=lambda value: self.redraw_vision())
+        self.palette_severity.grid(column=1, row=21, sticky=(tk.W, tk.E))
+
+        # Search a palette index (built with palette_index.py) for images with a similar palette
+        self.find_similar_button = ttk.Button(self, text="Find Similar", command=self.find_similar_images)
+        self.find_similar_button.grid(column=0, row=22, sticky=(tk.W, tk.E))
+        choose_index_button = ttk.Button(self, text="Choose Index", command=self.choose_palette_index)
+        choose_index_button.grid(column=1, row=22, sticky=(tk.W, tk.E))
+        self.similar_label = ttk.Label(self, text="", justify=tk.LEFT)
+        self.similar_label.grid(column=0, row=23, columnspan=2, sticky=tk.W)
+
         # Number of colors selector
         num_colour_label = tk.Label(self, text="Select Number of Colours:", font=('Arial', 12, 'bold'),
                                     fg="white", bg="gray")
@@ -66,9 +194,26 @@ class ColourGrabPage(ttk.Frame):
         self.num_colours = tk.IntVar(value=5)  # Default number of colours
         num_colour_selector = ttkb.Combobox(self, textvariable=self.num_colours, values=list(range(1, 11)),
                                             bootstyle="info", width=50)
-        num_colour_selector.grid(column=0, row=12, columnspan=2, sticky=(tk.W, tk.E))
+        num_colour_selector.grid(column=0, row=12, sticky=(tk.W, tk.E))
         num_colour_selector.set("5")
 
+        self.auto_colours = tk.BooleanVar(value=False)  # Choose the number of colours automatically
+        auto_colour_check = ttk.Checkbutton(self, text="Auto", variable=self.auto_colours)
+        auto_colour_check.grid(column=1, row=12, sticky=tk.W, padx=(10, 0))
+
+        # Number of colours and score chosen by the automatic search, shown next to the palette
+        self.auto_result_label = ttk.Label(self, text="")
+        self.auto_result_label.grid(column=0, row=17, columnspan=2, sticky=tk.W)
+
+        # Live palette of the webcam, clustered continuously in a worker process
+        self.live_analysis = tk.BooleanVar(value=False)
+        self.live_check = ttk.Checkbutton(self, text="Live palette", variable=self.live_analysis,
+                                          command=self.toggle_live_palette)
+        self.live_check.grid(column=0, row=9, sticky=tk.W)
+        # Analysis quality the latency controller chose for the latest webcam palette
+        self.quality_label = ttk.Label(self, text="")
+        self.quality_label.grid(column=1, row=9, sticky=tk.W)
+
         self.webcam_submit_button = ttk.Button(self, text="Go", command=self.webcamSubmit)
         self.webcam_submit_button.grid(column=0, row=13, columnspan=2, pady=(0, 10), sticky=tk.EW)
 
@@ -78,10 +223,12 @@ class ColourGrabPage(ttk.Frame):
             self.grid_columnconfigure(i, weight=1)
 
     def switch_mode(self, event=None):
-        """Switches between webcam and image modes, adjusting the UI accordingly."""
+        """Switches between webcam, image and video modes, adjusting the UI accordingly."""
         self.error_label.config(text="")
         if self.mode.get().lower() == "webcam":
             self._activate_webcam_mode()
+        elif self.mode.get().lower() == "video":
+            self._activate_video_mode()
         else:
             self._activate_image_mode()
 
@@ -90,6 +237,7 @@ class ColourGrabPage(ttk.Frame):
     def _activate_webcam_mode(self):
         """Activates webcam mode and sets up the UI."""
         self._hide_image_widgets()
+        self._hide_video_widgets()
         self._show_webcam_widgets()
         if not self.cap:
             self.cap = cv2.VideoCapture(0)
@@ -97,6 +245,7 @@ class ColourGrabPage(ttk.Frame):
                 self.error_label.config(text="Webcam is not detected or cannot be opened.", foreground="red")
                 self.cap = None
             else:
+                self.configure_capture()
                 self.error_label.config(text="", foreground="black")
                 if not self.updating_frame:
                     self.update_frame()
@@ -104,51 +253,171 @@ class ColourGrabPage(ttk.Frame):
     def _activate_image_mode(self):
         """Activates image mode and sets up the UI."""
         self._hide_webcam_widgets()
+        self._hide_video_widgets()
         self._show_image_widgets()
         self.error_label.config(text="")
+        self._stop_webcam()
+
+    def _activate_video_mode(self):
+        """Activates video mode, showing the path entry and the timeline canvas."""
+        self._hide_webcam_widgets()
+        self._show_image_widgets()
+        self.image_submit_button.grid_remove()
+        self.channel_space_selector.grid_remove()
+        self.export_channels_button.grid_remove()
+        self.show_on_wheel_button.grid_remove()
+        self.region_grid_selector.grid_remove()
+        self.region_button.grid_remove()
+        self.colour_map_button.grid_remove()
+        self.image_path_label.config(text="Video Path:")
+        self.webcam_canvas.grid()
+        self._show_video_widgets()
+        self._stop_webcam()
+        self.webcam_canvas.delete("all")
+        self.displayed_preview = None
+        if self.timeline:
+            self.display_timeline(self.timeline)
+
+    def _stop_webcam(self):
+        """Stops webcam capture if it is active."""
+        self.stop_live_palette()
         if self.cap and self.cap.isOpened():
             self.cap.release()  # Stop webcam capture if active
         self.updating_frame = False
+        self.last_frame = None
 
     def _hide_image_widgets(self):
         """Hides widgets related to the image input mode."""
         self.image_path_label.grid_remove()
         self.image_path_entry.grid_remove()
         self.image_submit_button.grid_remove()
+        self.channel_space_selector.grid_remove()
+        self.export_channels_button.grid_remove()
+        self.show_on_wheel_button.grid_remove()
+        self.region_grid_selector.grid_remove()
+        self.region_button.grid_remove()
+        self.colour_map_button.grid_remove()
 
     def _show_image_widgets(self):
         """Shows widgets related to the image input mode."""
+        self.image_path_label.config(text="Image Path:")
         self.image_path_label.grid()
         self.image_path_entry.grid()
         self.image_submit_button.grid()
+        self.channel_space_selector.grid()
+        self.export_channels_button.grid()
+        self.show_on_wheel_button.grid()
+        self.region_grid_selector.grid()
+        self.region_button.grid()
+        self.colour_map_button.grid()
 
     def _hide_webcam_widgets(self):
         """Hides widgets related to the webcam input mode."""
         self.webcam_canvas.grid_remove()
         self.webcam_submit_button.grid_remove()
+        self.live_check.grid_remove()
+        self.quality_label.grid_remove()
 
     def _show_webcam_widgets(self):
         """Shows widgets related to the webcam input mode."""
         self.webcam_canvas.grid()
         self.webcam_submit_button.grid()
-
+        self.live_check.grid()
+        self.quality_label.grid()
+
+    def _hide_video_widgets(self):
+        """Hides widgets related to the video input mode."""
+        self.video_submit_button.grid_remove()
+        self.export_json_button.grid_remove()
+        self.export_image_button.grid_remove()
+
+    def _show_video_widgets(self):
+        """Shows widgets related to the video input mode."""
+        self.video_submit_button.grid()
+        self.export_json_button.grid()
+        self.export_image_button.grid()
+
+    def configure_capture(self):
+        """Requests the capture resolution and frame rate so the camera does not deliver oversized frames."""
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_WIDTH)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_HEIGHT)
+        self.cap.set(cv2.CAP_PROP_FPS, CAPTURE_FPS)
+
+    def get_frame_buffer(self, name, shape):
+        """Returns a preallocated uint8 buffer, reallocating it only when the shape changes."""
+        buffer = self.frame_buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self.frame_buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def resize_to_rgb(self, frame, width, height, name):
+        """Downscales a BGR frame first and then converts only the small copy to RGB, using reused buffers."""
+        small = self.get_frame_buffer(f"{name}_bgr", (height, width, 3))
+        cv2.resize(frame, (width, height), dst=small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self.get_frame_buffer(f"{name}_rgb", (height, width, 3)))
+
+    def read_frame(self):
+        """Reads a webcam frame into the reused capture buffer."""
+        capture = self.frame_buffers.get("capture")
+        ret, frame = self.cap.read() if capture is None else self.cap.read(capture)
+        if ret and isinstance(frame, np.ndarray):
+            self.frame_buffers["capture"] = frame
+        return ret, frame
+
+    @profiler.timed("webcam.update_frame")
     def update_frame(self):
         """Updates the webcam frame on the canvas."""
         if not self.cap:
             return
-        ret, frame = self.cap.read()
+        ret, frame = self.read_frame()
+        profiler.count("frames.captured" if ret else "frames.dropped")
         if ret and self.mode.get().lower() == "webcam":
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_resized = cv2.resize(frame_rgb, (self.canvas_width, self.canvas_height))
-            img = Image.fromarray(frame_resized)
-            img_tk = ImageTk.PhotoImage(image=img)
-            self.webcam_canvas.create_image(0, 0, anchor=tk.NW, image=img_tk)
-            self.webcam_canvas.img_tk = img_tk  # Keep a reference to avoid garbage collection
+            self.last_frame = frame
+            frame_resized = self.resize_to_rgb(frame, self.canvas_width, self.canvas_height, "preview")
+            self.show_preview(Image.fromarray(frame_resized))
+            profiler.count("frames.rendered")
+            if self.live_palette is not None:
+                self.update_live_palette(frame)
         if self.mode.get().lower() == "webcam" and self.cap:
-            self.after(30, self.update_frame)
+            self.after(1000 // CAPTURE_FPS, self.update_frame)
         else:
             self.updating_frame = False
 
+    def toggle_live_palette(self):
+        """Starts or stops live palette extraction for the webcam."""
+        if not self.live_analysis.get():
+            self.stop_live_palette()
+            return
+        if not self.cap:
+            self.live_analysis.set(False)
+            self.error_label.config(text="Webcam is not initialized.")
+            return
+        shape = (CAPTURE_HEIGHT // ANALYSIS_SCALE, CAPTURE_WIDTH // ANALYSIS_SCALE, 3)
+        self.live_palette = LivePalette(shape, max(1, self.num_colours.get()))
+        self.live_palette.start()
+        self.error_label.config(text="")
+
+    def update_live_palette(self, frame):
+        """Hands a webcam frame to the live worker and shows the newest palette it has finished."""
+        height, width = self.live_palette.shape[:2]
+        live_frame = self.resize_to_rgb(frame, width, height, "live")
+        self.correct_colours(live_frame)
+        self.live_palette.push(live_frame)
+        latest = self.live_palette.latest_palette()
+        if latest is not None:
+            self.display_colour_palette(latest[1])
+            self.quality_label.config(text=describe_quality(latest[2]))
+        elif not self.live_palette.running:
+            self.stop_live_palette()
+            self.error_label.config(text="Live palette worker stopped unexpectedly.")
+
+    def stop_live_palette(self):
+        """Stops the live palette worker, if it is running."""
+        if self.live_palette is not None:
+            self.live_palette.stop()
+            self.live_palette = None
+        self.live_analysis.set(False)
+
     def imageSubmit(self):
         """Handles image submission and processes it."""
         file_path = self.file_path.get()
@@ -156,19 +425,147 @@ class ColourGrabPage(ttk.Frame):
             self.error_label.config(text="File not found. Please check the path.")
             return
         try:
-            image = Image.open(file_path)
-            image = self._resize_image(image)
-            image_array = np.array(image)
-            if image_array.shape[-1] != 3:
-                image = image.convert("RGB")
+            with profiler.span("image.decode"):
+                image = Image.open(file_path)
+                image = self._resize_image(image)
                 image_array = np.array(image)
-            colours = self.extract_colour_palette(image_array)
+                if image_array.shape[-1] != 3:
+                    image = image.convert("RGB")
+                    image_array = np.array(image)
+            self.correct_colours(image_array)
             self.error_label.config(text="")
-            self.display_colour_palette(colours)
+            self.start_palette_job(image_array)
+        except FileNotFoundError:
+            self.error_label.config(text="File not found. Please check the path.")
+        except Exception as e:
+            self.error_label.config(text=f"An error occurred: {str(e)}")
+
+    def export_image_channels(self):
+        """Saves the image's channels in the selected space, as grayscale images or one .npy, in a background thread."""
+        file_path = self.file_path.get()
+        if not file_path:
+            self.error_label.config(text="File not found. Please check the path.")
+            return
+        output = filedialog.asksaveasfilename(defaultextension=".png",
+                                              filetypes=[("Grayscale images", "*.png"), ("Stacked array", "*.npy")])
+        if not output:
+            return
+        space = self.channel_space.get()
+        self.export_channels_button.config(state=tk.DISABLED)
+        self.error_label.config(text="Exporting channels...", foreground="black")
+
+        def work():
+            try:
+                with Image.open(file_path) as image:
+                    self.export_queue.put((export_channels(image, space, output), None))
+            except Exception as e:
+                self.export_queue.put((None, e))
+
+        self.export_thread = threading.Thread(target=work, daemon=True)
+        self.export_thread.start()
+        self.after(EXPORT_POLL_MS, self.poll_export_queue)
+
+    def poll_export_queue(self):
+        """Reports the written files once the background channel export finishes."""
+        try:
+            written, error = self.export_queue.get_nowait()
+        except queue.Empty:
+            self.after(EXPORT_POLL_MS, self.poll_export_queue)
+            return
+        self.export_channels_button.config(state=tk.NORMAL)
+        if isinstance(error, FileNotFoundError):
+            self.error_label.config(text="File not found. Please check the path.", foreground="red")
+        elif error is not None:
+            self.error_label.config(text=f"An error occurred: {str(error)}", foreground="red")
+        else:
+            self.error_label.config(text=f"Saved {', '.join(os.path.basename(path) for path in written)}",
+                                    foreground="green")
+
+    def correct_colours(self, image):
+        """White-balances and normalises the exposure of an RGB array in place, as selected."""
+        method = WHITE_BALANCE_OPTIONS[self.white_balance.get()]
+        exposure = self.normalise_exposure.get()
+        text = ""
+        if method is not None or exposure:
+            correction = normalise_colours(image, method, exposure)
+            if correction.temperature is not None:
+                text = f"Light: about {correction.temperature} K, exposure x{correction.exposure:.2f}"
+        if self.temperature_label.cget("text") != text:
+            self.temperature_label.config(text=text)
+
+    def show_image_on_wheel(self):
+        """Shows where the image's colours sit on the Colour Gear wheel, as a hue/saturation density heatmap."""
+        file_path = self.file_path.get()
+        if not file_path:
+            self.error_label.config(text="File not found. Please check the path.")
+            return
+        try:
+            histogram = image_histogram(file_path)
         except FileNotFoundError:
             self.error_label.config(text="File not found. Please check the path.")
+            return
         except Exception as e:
             self.error_label.config(text=f"An error occurred: {str(e)}")
+            return
+        self.error_label.config(text="")
+        self.controller.show_frame("Colour Gear")
+        self.controller.frames["Colour Gear"].show_density(histogram, os.path.basename(file_path))
+
+    def regionSubmit(self):
+        """Extracts a palette per region of the image in a background thread."""
+        file_path = self.file_path.get()
+        if not file_path:
+            self.error_label.config(text="File not found. Please check the path.")
+            return
+        try:
+            rows, cols = parse_grid(self.region_grid.get())
+            with Image.open(file_path) as image:
+                image_array = np.array(self._resize_image(image.convert("RGB")))
+        except FileNotFoundError:
+            self.error_label.config(text="File not found. Please check the path.")
+            return
+        except Exception as e:
+            self.error_label.config(text=f"An error occurred: {str(e)}")
+            return
+        self.correct_colours(image_array)
+        self.region_generation += 1
+        generation = self.region_generation
+        n_colours = max(1, self.num_colours.get())
+        self.region_button.config(state=tk.DISABLED)
+        self.error_label.config(text="Extracting regional palettes...", foreground="black")
+        size = (self.canvas_width, self.canvas_height)
+
+        def work():
+            try:
+                regions = grid_regions(image_array.shape[0], image_array.shape[1], rows, cols)
+                with profiler.span("palette.regions"):
+                    results = regional_palettes(image_array, regions, n_colours)
+                preview = ImageOps.contain(render_region_swatches(image_array, results), size)
+                self.region_queue.put((generation, results, preview, None))
+            except Exception as e:
+                self.region_queue.put((generation, None, None, e))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(REGION_POLL_MS, self.poll_region_queue)
+
+    def poll_region_queue(self):
+        """Shows the regional palettes over the image preview once the background job finishes."""
+        try:
+            generation, results, preview, error = self.region_queue.get_nowait()
+        except queue.Empty:
+            self.after(REGION_POLL_MS, self.poll_region_queue)
+            return
+        if generation != self.region_generation:
+            self.after(REGION_POLL_MS, self.poll_region_queue)
+            return
+        self.region_button.config(state=tk.NORMAL)
+        if error is not None:
+            self.error_label.config(text=f"An error occurred: {str(error)}", foreground="red")
+            return
+        self.region_results = results
+        self.error_label.config(text=f"Extracted palettes of {len(results)} regions.", foreground="black")
+        self.show_preview(preview)
+        self.webcam_canvas.grid()
 
     def _resize_image(self, image):
         """Resizes the image to improve processing speed."""
@@ -179,46 +576,340 @@ class ColourGrabPage(ttk.Frame):
         if not self.cap:
             self.error_label.config(text="Webcam is not initialized.")
             return
-        ret, frame = self.cap.read()
+        # Analyse the frame the preview last showed; only read a new one if there is none yet
+        if self.last_frame is not None:
+            ret, frame = True, self.last_frame
+        else:
+            ret, frame = self.read_frame()
         if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_resized = cv2.resize(frame_rgb, (frame_rgb.shape[1] // 2, frame_rgb.shape[0] // 2))
-            colours = self.extract_colour_palette(frame_resized)
-            self.palette_canvas.delete("all")
-            self.display_colour_palette(colours)
+            height, width = frame.shape[:2]
+            frame_resized = self.resize_to_rgb(frame, max(1, width // ANALYSIS_SCALE),
+                                               max(1, height // ANALYSIS_SCALE), "analysis")
             self.error_label.config(text="")
+            # The analysis buffer is reused by the next frame; the job adapts it to the target latency
+            analysis = frame_resized.copy()
+            self.correct_colours(analysis)
+            self.start_palette_job(analysis, adaptive=True)
         else:
             self.error_label.config(text="Failed to capture image from webcam.")
 
-    def extract_colour_palette(self, image):
-        """Extracts a colour palette using KMeans clustering."""
-        pixels = image.reshape(-1, 3)
-        n_clusters = max(1, self.num_colours.get())  # Ensure at least 1 cluster
+    def videoSubmit(self):
+        """Starts building the palette timeline of a video file in a background thread."""
+        file_path = self.file_path.get()
+        if not file_path:
+            self.error_label.config(text="File not found. Please check the path.")
+            return
+        self.video_generation += 1
+        generation = self.video_generation
+        n_colours = max(1, self.num_colours.get())
+        self.video_submit_button.config(state=tk.DISABLED)
+        self.error_label.config(text="Processing video...", foreground="black")
+
+        def work():
+            try:
+                self.video_queue.put((generation, process_video(file_path, n_colours=n_colours), None))
+            except Exception as e:
+                self.video_queue.put((generation, None, e))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(VIDEO_POLL_MS, self.poll_video_queue)
+
+    def poll_video_queue(self):
+        """Shows the timeline once the background job finishes, ignoring results of abandoned jobs."""
         try:
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42)  # Set random_state for deterministic results
-            kmeans.fit(pixels)
-            return kmeans.cluster_centers_.astype(int)
-        except Exception as e:
-            self.error_label.config(text=f"Error during colour extraction: {str(e)}")
-            return []
+            generation, timeline, error = self.video_queue.get_nowait()
+        except queue.Empty:
+            self.after(VIDEO_POLL_MS, self.poll_video_queue)
+            return
+        if generation != self.video_generation:
+            self.after(VIDEO_POLL_MS, self.poll_video_queue)
+            return
+        self.video_submit_button.config(state=tk.NORMAL)
+        if isinstance(error, FileNotFoundError):
+            self.error_label.config(text="File not found. Please check the path.", foreground="red")
+        elif error is not None:
+            self.error_label.config(text=f"An error occurred: {str(error)}", foreground="red")
+        else:
+            self.timeline = timeline
+            self.error_label.config(text=f"Found {len(timeline['scenes'])} scenes. Click one to see its palette.",
+                                    foreground="black")
+            if self.mode.get().lower() == "video":
+                self.display_timeline(timeline)
+
+    def display_timeline(self, timeline):
+        """Draws the palette timeline on the canvas and shows the palette of the first scene."""
+        self.show_preview(timeline_to_image(timeline, self.canvas_width, self.canvas_height))
+        if timeline["scenes"]:
+            self.display_colour_palette(timeline["scenes"][0]["palette"])
+
+    def on_timeline_click(self, event):
+        """Shows the palette of the scene under the cursor when the timeline is clicked."""
+        if self.mode.get().lower() != "video" or not self.timeline or not self.timeline["scenes"]:
+            return
+        seconds = event.x / self.canvas_width * self.timeline["duration"]
+        scene = next((scene for scene in self.timeline["scenes"] if scene["start"] <= seconds < scene["end"]),
+                     self.timeline["scenes"][-1])
+        self.display_colour_palette(scene["palette"])
+        self.error_label.config(text=f"Scene {scene['start']:.1f}s - {scene['end']:.1f}s", foreground="black")
+
+    def export_timeline_json(self):
+        """Saves the palette timeline as a JSON file."""
+        if not self.timeline:
+            self.error_label.config(text="Process a video first.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if file_path:
+            timeline_to_json(self.timeline, file_path)
+            self.error_label.config(text=f"Saved timeline to {file_path}", foreground="green")
+
+    def export_timeline_image(self):
+        """Saves the palette timeline as an image strip."""
+        if not self.timeline:
+            self.error_label.config(text="Process a video first.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG", "*.png")])
+        if file_path:
+            timeline_to_image(self.timeline).save(file_path)
+            self.error_label.config(text=f"Saved timeline to {file_path}", foreground="green")
+
+    def start_palette_job(self, image, adaptive=False):
+        """
+        Extracts the palette of an image in a background thread, superseding any running job.
+
+        @param image: RGB array or PIL image.
+        @param adaptive: Downscale, sample and cap iterations as the quality controller currently
+        chooses, and time the job so the controller can adapt; used for webcam frames.
+        """
+        if self.palette_cancel is not None:
+            self.palette_cancel.set()
+        self.palette_generation += 1
+        generation = self.palette_generation
+        cancel = threading.Event()
+        self.palette_cancel = cancel
+        auto = self.auto_colours.get()
+        n_colours = max(1, self.num_colours.get())  # Ensure at least 1 cluster
+        self.palette_progress.config(value=0)
+        self.cancel_palette_button.config(state=tk.NORMAL)
+
+        def report(done, total):
+            self.palette_queue.put(("progress", generation, done / total))
+
+        settings = self.quality_controller.settings if adaptive else None
+        map_size = max(self.canvas_width, self.canvas_height)
+
+        def work():
+            try:
+                start = time.perf_counter()
+                pixels, max_iter = image, MAX_ITERATIONS
+                if settings is not None:
+                    pixels = prepare_pixels(np.asarray(image), settings, np.random.default_rng(generation))
+                    max_iter = settings.max_iter
+                with profiler.span("palette.kmeans"):
+                    if auto:
+                        palette, k, score, labels = auto_palette(pixels, progress=report, cancel=cancel,
+                                                                 return_labels=True)
+                    else:
+                        palette, labels = extract_palette_progressive(pixels, n_colours, progress=report,
+                                                                      cancel=cancel, max_iter=max_iter,
+                                                                      return_labels=True)
+                        k, score = None, None
+                # Coverage comes from the fit's labels. Webcam frames count the pixels they were clustered
+                # on; images count every pixel, so only a fit on a sample (Auto) assigns the image again.
+                with profiler.span("palette.coverage"):
+                    pixel_count = np.asarray(pixels).size // 3
+                    if len(labels) == pixel_count:
+                        shares = label_shares(labels, len(palette))
+                    else:
+                        shares, labels = palette_coverage(pixels, palette), None
+                    colour_map = None
+                    if settings is None:
+                        colour_map = label_map(np.asarray(image), palette, map_size, labels)
+                result = (palette, k, score, shares, colour_map)
+                duration = time.perf_counter() - start if settings is not None else None
+                self.palette_queue.put(("done", generation, result, None, duration))
+            except ExtractionCancelled:
+                pass
+            except Exception as e:
+                self.palette_queue.put(("done", generation, None, e, None))
+
+        self.palette_thread = threading.Thread(target=work, daemon=True)
+        self.palette_thread.start()
+        if not self.palette_polling:
+            self.palette_polling = True
+            self.after(PALETTE_POLL_MS, self.poll_palette_queue)
+
+    def poll_palette_queue(self):
+        """Shows the progress of the palette job, and its palette once done; stale jobs are ignored."""
+        progress, finished = None, None
+        while True:
+            try:
+                message = self.palette_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message[1] != self.palette_generation:
+                continue
+            if message[0] == "progress":
+                progress = message[2]
+            else:
+                finished = message
+        if progress is not None:
+            self.palette_progress.config(value=progress)
+        if finished is None:
+            if self.palette_cancel is not None:
+                self.after(PALETTE_POLL_MS, self.poll_palette_queue)
+            else:
+                self.palette_polling = False
+            return
+        self.palette_polling = False
+        self.palette_cancel = None
+        self.cancel_palette_button.config(state=tk.DISABLED)
+        _, _, result, error, duration = finished
+        if duration is not None:
+            self.quality_controller.record(duration)
+            self.quality_label.config(text=describe_quality(self.quality_controller.report()))
+        if error is not None:
+            self.error_label.config(text=f"Error during colour extraction: {str(error)}")
+            return
+        palette, k, score, shares, labels = result
+        if labels is not None:
+            self.colour_map = label_map_image(labels, palette)
+            self.colour_map_button.config(state=tk.NORMAL)
+        if k is None:
+            self.auto_result_label.config(text="")
+        else:
+            score_text = "single colour" if score is None else f"silhouette {score:.2f}"
+            self.auto_result_label.config(text=f"Auto: {k} colours ({score_text})")
+        self.palette_progress.config(value=1.0)
+        self.display_colour_palette(palette, shares)
+
+    def show_colour_map(self):
+        """Shows where each colour of the last image palette occurs, painting every pixel with its palette colour."""
+        if self.colour_map is None:
+            return
+        self.show_preview(ImageOps.contain(self.colour_map, (self.canvas_width, self.canvas_height), Image.NEAREST))
+        self.webcam_canvas.grid()
 
-    def display_colour_palette(self, colours):
-        """Displays the extracted colour palette on the canvas with hex values inside the blocks."""
-        block_width = self.canvas_width // len(colours)
+    def show_preview(self, image):
+        """Shows an image on the preview canvas, simulated with the selected colour vision deficiency."""
+        self.displayed_preview = image
+        deficiency = self.palette_vision.get().lower()
+        if deficiency in CVD_MATRICES:
+            with profiler.span("cvd.preview"):
+                image = Image.fromarray(simulate_cvd(np.asarray(image.convert("RGB")), deficiency,
+                                                     self.palette_severity.get() / 100))
+        img_tk = ImageTk.PhotoImage(image=image)
+        self.webcam_canvas.delete("all")
+        self.webcam_canvas.create_image(0, 0, anchor=tk.NW, image=img_tk)
+        self.webcam_canvas.img_tk = img_tk  # Keep a reference to avoid garbage collection
+
+    def cancel_palette_job(self):
+        """Cancels the running palette job."""
+        if self.palette_cancel is None:
+            return
+        self.palette_cancel.set()
+        self.palette_cancel = None
+        self.palette_generation += 1
+        self.palette_progress.config(value=0)
+        self.cancel_palette_button.config(state=tk.DISABLED)
+        self.error_label.config(text="Palette extraction cancelled.")
+
+    @profiler.timed("tk.palette_redraw")
+    def display_colour_palette(self, colours, shares=None):
+        """Displays the colour palette on the canvas with hex values inside the blocks, sized by coverage if given."""
         self.palette_canvas.delete("all")
-        for i, colour in enumerate(colours):
-            colour = np.clip(colour, 0, 255)
+        colours = np.clip(colours, 0, 255).astype(np.uint8)
+        if shares is None:
+            edges = np.arange(len(colours) + 1) * (self.canvas_width // len(colours))
+        else:
+            colours, shares = order_by_coverage(colours, shares)
+            edges = np.round(np.concatenate([[0], np.cumsum(shares)]) * self.canvas_width).astype(int)
+        self.displayed_palette = colours
+        self.displayed_shares = shares
+        shown = colours
+        deficiency = self.palette_vision.get().lower()
+        if deficiency in CVD_MATRICES:
+            shown = simulate_cvd(colours, deficiency, self.palette_severity.get() / 100)
+        label_colours = text_colours(shown)  # Black or white, whichever contrasts more (WCAG)
+        for i, (colour, fill) in enumerate(zip(colours, shown)):
             hex_colour = f'#{int(colour[0]):02x}{int(colour[1]):02x}{int(colour[2]):02x}'
             rect = self.palette_canvas.create_rectangle(
-                i * block_width, 0, (i + 1) * block_width, 50, fill=hex_colour, outline=""
-            )
-            self.palette_canvas.create_text(
-                (i * block_width) + block_width // 2, 25,
-                text=hex_colour, fill='white' if np.mean(colour) < 128 else 'black',
-                font=('Arial', 10, 'bold')
+                edges[i], 0, edges[i + 1], 50,
+                fill=f'#{int(fill[0]):02x}{int(fill[1]):02x}{int(fill[2]):02x}', outline=""
             )
             self.palette_canvas.tag_bind(rect, '<Button-1>',
                                          lambda event, hex_code=hex_colour: self.copy_to_clipboard(hex_code))
+            if shares is None:
+                text = hex_colour
+            elif edges[i + 1] - edges[i] >= MIN_LABEL_WIDTH:
+                text = f"{hex_colour}\n{shares[i]:.0%}"
+            else:
+                continue  # Too narrow to label; the swatch still copies its hex code when clicked
+            self.palette_canvas.create_text(
+                (edges[i] + edges[i + 1]) // 2, 25,
+                text=text, fill=label_colours[i],
+                font=('Arial', 10, 'bold'), justify=tk.CENTER
+            )
+
+    def redraw_palette(self):
+        """Draws the displayed palette again, e.g. after the colour vision simulation changed."""
+        if self.displayed_palette is not None:
+            self.display_colour_palette(self.displayed_palette, self.displayed_shares)
+
+    def redraw_vision(self):
+        """Draws the palette and the preview again after the colour vision simulation changed."""
+        self.redraw_palette()
+        if self.displayed_preview is not None:
+            self.show_preview(self.displayed_preview)
+
+    def choose_palette_index(self):
+        """Asks for the directory of a palette index; returns whether one was opened."""
+        directory = filedialog.askdirectory(title="Palette index directory")
+        if not directory:
+            return False
+        if not os.path.exists(os.path.join(directory, DATA_FILE)):
+            self.error_label.config(text=f"Not a palette index: {directory}", foreground="red")
+            return False
+        try:
+            self.palette_index = PaletteIndex(directory)
+        except Exception as e:
+            self.error_label.config(text=f"An error occurred: {str(e)}", foreground="red")
+            return False
+        self.error_label.config(text=f"Palette index with {len(self.palette_index)} images.", foreground="black")
+        return True
+
+    def find_similar_images(self):
+        """Searches the palette index for the images closest to the displayed palette, in a background thread."""
+        if self.displayed_palette is None:
+            self.error_label.config(text="Extract a palette first.", foreground="red")
+            return
+        if self.palette_index is None and not self.choose_palette_index():
+            return
+        palette_index, colours, shares = self.palette_index, self.displayed_palette, self.displayed_shares
+        self.find_similar_button.config(state=tk.DISABLED)
+
+        def work():
+            try:
+                self.similar_queue.put((palette_index.query(colours, shares, SIMILAR_RESULTS), None))
+            except Exception as e:
+                self.similar_queue.put((None, e))
+
+        self.similar_thread = threading.Thread(target=work, daemon=True)
+        self.similar_thread.start()
+        self.after(SIMILAR_POLL_MS, self.poll_similar_queue)
+
+    def poll_similar_queue(self):
+        """Lists the closest images once the palette index search finishes."""
+        try:
+            matches, error = self.similar_queue.get_nowait()
+        except queue.Empty:
+            self.after(SIMILAR_POLL_MS, self.poll_similar_queue)
+            return
+        self.find_similar_button.config(state=tk.NORMAL)
+        if error is not None:
+            self.error_label.config(text=f"An error occurred: {str(error)}", foreground="red")
+            return
+        lines = [f"{distance:6.1f}  {os.path.basename(path)}" for path, distance in matches]
+        self.similar_label.config(text="\n".join(lines) if lines else "The palette index is empty.")
 
     def copy_to_clipboard(self, hex_code):
         """Copies the hex code to the clipboard and displays feedback."""
@@ -227,6 +918,8 @@ class ColourGrabPage(ttk.Frame):
         self.error_label.config(text=f"Copied {hex_code} to clipboard!", foreground="green")
 
     def __del__(self):
-        """Releases the webcam when the object is destroyed."""
+        """Releases the webcam and the live palette worker when the object is destroyed."""
+        if getattr(self, "live_palette", None) is not None:
+            self.live_palette.stop()
         if self.cap and self.cap.isOpened():
             self.cap.release()
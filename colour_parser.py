@@ -0,0 +1,335 @@
+import argparse
+import bisect
+import json
+import math
+import re
+from collections import namedtuple
+from conversion_functions import validate_rgb, hsl_to_rgb, hsv_to_rgb
+from icc_conversions import cmyk_to_rgb_icc
+
+# A parsed colour: (r, g, b) integers, alpha (0-1) and the syntax it was written in
+ParsedColour = namedtuple("ParsedColour", ["rgb", "alpha", "syntax"])
+
+# CSS Color Module Level 4 named colours
+NAMED_COLOURS = {
+    "aliceblue": 0xF0F8FF, "antiquewhite": 0xFAEBD7, "aqua": 0x00FFFF, "aquamarine": 0x7FFFD4,
+    "azure": 0xF0FFFF, "beige": 0xF5F5DC, "bisque": 0xFFE4C4, "black": 0x000000,
+    "blanchedalmond": 0xFFEBCD, "blue": 0x0000FF, "blueviolet": 0x8A2BE2, "brown": 0xA52A2A,
+    "burlywood": 0xDEB887, "cadetblue": 0x5F9EA0, "chartreuse": 0x7FFF00, "chocolate": 0xD2691E,
+    "coral": 0xFF7F50, "cornflowerblue": 0x6495ED, "cornsilk": 0xFFF8DC, "crimson": 0xDC143C,
+    "cyan": 0x00FFFF, "darkblue": 0x00008B, "darkcyan": 0x008B8B, "darkgoldenrod": 0xB8860B,
+    "darkgray": 0xA9A9A9, "darkgreen": 0x006400, "darkgrey": 0xA9A9A9, "darkkhaki": 0xBDB76B,
+    "darkmagenta": 0x8B008B, "darkolivegreen": 0x556B2F, "darkorange": 0xFF8C00, "darkorchid": 0x9932CC,
+    "darkred": 0x8B0000, "darksalmon": 0xE9967A, "darkseagreen": 0x8FBC8F, "darkslateblue": 0x483D8B,
+    "darkslategray": 0x2F4F4F, "darkslategrey": 0x2F4F4F, "darkturquoise": 0x00CED1, "darkviolet": 0x9400D3,
+    "deeppink": 0xFF1493, "deepskyblue": 0x00BFFF, "dimgray": 0x696969, "dimgrey": 0x696969,
+    "dodgerblue": 0x1E90FF, "firebrick": 0xB22222, "floralwhite": 0xFFFAF0, "forestgreen": 0x228B22,
+    "fuchsia": 0xFF00FF, "gainsboro": 0xDCDCDC, "ghostwhite": 0xF8F8FF, "gold": 0xFFD700,
+    "goldenrod": 0xDAA520, "gray": 0x808080, "green": 0x008000, "greenyellow": 0xADFF2F,
+    "grey": 0x808080, "honeydew": 0xF0FFF0, "hotpink": 0xFF69B4, "indianred": 0xCD5C5C,
+    "indigo": 0x4B0082, "ivory": 0xFFFFF0, "khaki": 0xF0E68C, "lavender": 0xE6E6FA,
+    "lavenderblush": 0xFFF0F5, "lawngreen": 0x7CFC00, "lemonchiffon": 0xFFFACD, "lightblue": 0xADD8E6,
+    "lightcoral": 0xF08080, "lightcyan": 0xE0FFFF, "lightgoldenrodyellow": 0xFAFAD2, "lightgray": 0xD3D3D3,
+    "lightgreen": 0x90EE90, "lightgrey": 0xD3D3D3, "lightpink": 0xFFB6C1, "lightsalmon": 0xFFA07A,
+    "lightseagreen": 0x20B2AA, "lightskyblue": 0x87CEFA, "lightslategray": 0x778899, "lightslategrey": 0x778899,
+    "lightsteelblue": 0xB0C4DE, "lightyellow": 0xFFFFE0, "lime": 0x00FF00, "limegreen": 0x32CD32,
+    "linen": 0xFAF0E6, "magenta": 0xFF00FF, "maroon": 0x800000, "mediumaquamarine": 0x66CDAA,
+    "mediumblue": 0x0000CD, "mediumorchid": 0xBA55D3, "mediumpurple": 0x9370DB, "mediumseagreen": 0x3CB371,
+    "mediumslateblue": 0x7B68EE, "mediumspringgreen": 0x00FA9A, "mediumturquoise": 0x48D1CC,
+    "mediumvioletred": 0xC71585, "midnightblue": 0x191970, "mintcream": 0xF5FFFA, "mistyrose": 0xFFE4E1,
+    "moccasin": 0xFFE4B5, "navajowhite": 0xFFDEAD, "navy": 0x000080, "oldlace": 0xFDF5E6,
+    "olive": 0x808000, "olivedrab": 0x6B8E23, "orange": 0xFFA500, "orangered": 0xFF4500,
+    "orchid": 0xDA70D6, "palegoldenrod": 0xEEE8AA, "palegreen": 0x98FB98, "paleturquoise": 0xAFEEEE,
+    "palevioletred": 0xDB7093, "papayawhip": 0xFFEFD5, "peachpuff": 0xFFDAB9, "peru": 0xCD853F,
+    "pink": 0xFFC0CB, "plum": 0xDDA0DD, "powderblue": 0xB0E0E6, "purple": 0x800080,
+    "rebeccapurple": 0x663399, "red": 0xFF0000, "rosybrown": 0xBC8F8F, "royalblue": 0x4169E1,
+    "saddlebrown": 0x8B4513, "salmon": 0xFA8072, "sandybrown": 0xF4A460, "seagreen": 0x2E8B57,
+    "seashell": 0xFFF5EE, "sienna": 0xA0522D, "silver": 0xC0C0C0, "skyblue": 0x87CEEB,
+    "slateblue": 0x6A5ACD, "slategray": 0x708090, "slategrey": 0x708090, "snow": 0xFFFAFA,
+    "springgreen": 0x00FF7F, "steelblue": 0x4682B4, "tan": 0xD2B48C, "teal": 0x008080,
+    "thistle": 0xD8BFD8, "tomato": 0xFF6347, "turquoise": 0x40E0D0, "violet": 0xEE82EE,
+    "wheat": 0xF5DEB3, "white": 0xFFFFFF, "whitesmoke": 0xF5F5F5, "yellow": 0xFFFF00,
+    "yellowgreen": 0x9ACD32,
+}
+_NAMED = {name: ParsedColour((value >> 16, (value >> 8) & 0xFF, value & 0xFF), 1.0, "named")
+          for name, value in NAMED_COLOURS.items()}
+_NAMED["transparent"] = ParsedColour((0, 0, 0), 0.0, "named")
+
+# Functional notations, their syntax name and the number of colour components they take
+FUNCTIONS = {
+    "rgb": ("rgb", 3), "rgba": ("rgb", 3),
+    "hsl": ("hsl", 3), "hsla": ("hsl", 3),
+    "hsv": ("hsv", 3), "hsva": ("hsv", 3), "hsb": ("hsv", 3),
+    "cmyk": ("cmyk", 4), "device-cmyk": ("cmyk", 4),
+}
+# Input formats of the Colour Converter page, used to read bare lists such as "255, 87, 51"
+HINTS = {"RGB": "rgb", "HSL": "hsl", "HSV": "hsv", "CMYK": "cmyk", "HEX": "hex"}
+EXAMPLES = {"rgb": "255, 255, 255", "hsl": "360, 100, 50", "hsv": "360, 100, 100", "cmyk": "0.0, 0.0, 0.0, 0.0"}
+
+_HEX_RE = re.compile(r"#?([0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})")
+_FUNCTION_RE = re.compile(r"([a-zA-Z-]+)\(\s*([^()]*?)\s*\)")
+_NUMBER_RE = re.compile(r"([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(%|deg|grad|rad|turn)?", re.IGNORECASE)
+_ANGLE_UNITS = {None: 1.0, "deg": 1.0, "grad": 0.9, "rad": 180 / math.pi, "turn": 360.0}
+
+# Declarations ("property: value") inside a CSS block, and colour-like tokens in their values: hex,
+# functional notations and named colours
+_CSS_BRACE_RE = re.compile(r"[{}]")
+_CSS_DECLARATION_RE = re.compile(r"(?:^|;)\s*[\w-]+\s*:([^;]*)")
+_CSS_TOKEN_RE = re.compile(
+    r"(?P<hex>#[0-9a-zA-Z]+)"
+    r"|(?P<function>(?<![\w-])(?:" + "|".join(sorted(FUNCTIONS, key=len, reverse=True)) + r")\([^()]*\))"
+    r"|(?<![\w.#/-])(?P<name>(?:" + "|".join(sorted(_NAMED, key=len, reverse=True)) + r"))(?![\w.(/-])",
+    re.IGNORECASE)
+
+def _hex_colour(digits):
+    """Convert 3, 4, 6 or 8 validated hex digits to a ParsedColour."""
+    if len(digits) <= 4:
+        digits = "".join(digit * 2 for digit in digits)
+    value = int(digits, 16)
+    if len(digits) == 8:
+        return ParsedColour((value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF), (value & 0xFF) / 255, "hex")
+    return ParsedColour((value >> 16, (value >> 8) & 0xFF, value & 0xFF), 1.0, "hex")
+
+def _number(token, percent_scale, allow_angle=False):
+    """
+    Parse one numeric component. Percentages are multiplied by percent_scale / 100, and angle
+    units are converted to degrees when allowed.
+    """
+    match = _NUMBER_RE.fullmatch(token)
+    if not match:
+        raise ValueError(f"Invalid number: {token!r}.")
+    value = float(match.group(1))
+    if not math.isfinite(value):  # e.g. 1e999, which float() reads as infinity
+        raise ValueError(f"Invalid number: {token!r}.")
+    unit = match.group(2) and match.group(2).lower()
+    if unit == "%":
+        return value * percent_scale / 100
+    if unit is not None:
+        if not allow_angle:
+            raise ValueError(f"Invalid unit in {token!r}.")
+        return value * _ANGLE_UNITS[unit]
+    return value
+
+def _split_arguments(arguments):
+    """Split functional arguments in comma ("1, 2, 3, 0.5") or space ("1 2 3 / 50%") syntax."""
+    if "," in arguments:
+        return [part.strip() for part in arguments.split(",")], None
+    components, _, alpha = arguments.partition("/")
+    return components.split(), alpha.strip() or None
+
+def _components(syntax, parts, alpha):
+    """Convert the parsed components of one syntax to a ParsedColour."""
+    alpha = 1.0 if alpha is None else _number(alpha, 1.0)
+    if not 0 <= alpha <= 1:
+        raise ValueError(f"Invalid alpha value: {alpha}. Must be between 0 and 1.")
+    if syntax == "rgb":
+        rgb = tuple(int(round(_number(part, 255))) for part in parts)
+        validate_rgb(*rgb)
+    elif syntax == "cmyk":
+        rgb = cmyk_to_rgb_icc(*(_number(part, 1.0) for part in parts))  # Through the CMYK profile, if set
+    else:
+        hue = _number(parts[0], 360, allow_angle=True) % 360  # Hue is an angle, so it wraps like in CSS
+        second, third = (_number(part, 100) for part in parts[1:])
+        rgb = (hsl_to_rgb if syntax == "hsl" else hsv_to_rgb)(hue, second, third)
+    return ParsedColour(rgb, alpha, syntax)
+
+def _parse_function(name, arguments):
+    """Parse a functional notation such as rgb(255 0 0 / 50%)."""
+    if name not in FUNCTIONS:
+        raise ValueError(f"Unknown colour function: {name}().")
+    syntax, count = FUNCTIONS[name]
+    parts, alpha = _split_arguments(arguments)
+    if alpha is None and len(parts) == count + 1:
+        parts, alpha = parts[:count], parts[count]
+    if len(parts) != count:
+        raise ValueError(f"{name}() takes {count} values (plus an optional alpha), got {len(parts)}.")
+    return _components(syntax, parts, alpha)
+
+def parse_colour(text, hint=None):
+    """
+    Parse a colour written in any supported syntax, detecting the syntax automatically.
+
+    Supported: hex (#RGB, #RGBA, #RRGGBB, #RRGGBBAA), CSS named colours, rgb()/rgba(), hsl()/hsla(),
+    hsv()/hsb() and cmyk()/device-cmyk() in comma or space syntax, with percentages, hue angle units
+    and an optional alpha. Bare lists such as "255, 87, 51" are read in the hinted format.
+
+    Parameters:
+    text (str): The colour string.
+    hint (str): Format of bare input, one of RGB, HEX, CMYK, HSL or HSV (as on the Colour Converter
+                page). Defaults to RGB; a hint of HEX also accepts hex digits without '#'.
+
+    Returns:
+    ParsedColour: The (r, g, b) values, alpha and detected syntax.
+
+    Raises:
+    ValueError: If the string is not a valid colour.
+    """
+    text = text.strip()
+    # Fast path for the commonest forms: #RRGGBB and plain names
+    if len(text) == 7 and text[0] == "#" and _HEX_RE.fullmatch(text):
+        value = int(text[1:], 16)
+        return ParsedColour((value >> 16, (value >> 8) & 0xFF, value & 0xFF), 1.0, "hex")
+    named = _NAMED.get(text.lower())
+    if named is not None:
+        return named
+
+    if text.startswith("#"):
+        match = _HEX_RE.fullmatch(text)
+        if not match:
+            raise ValueError(f"Invalid hex color: {text}. Must be 3, 4, 6 or 8 hexadecimal digits.")
+        return _hex_colour(match.group(1))
+    match = _FUNCTION_RE.fullmatch(text)
+    if match:
+        return _parse_function(match.group(1).lower(), match.group(2))
+
+    syntax = HINTS.get(hint.upper() if hint else "RGB")
+    if syntax is None:
+        raise ValueError(f"Invalid input format: {hint}.")
+    if syntax == "hex":
+        match = _HEX_RE.fullmatch(text)
+        if not match:
+            raise ValueError(f"Invalid hex color: {text}. Must be 3, 4, 6 or 8 hexadecimal digits.")
+        return _hex_colour(match.group(1))
+    parts, alpha = _split_arguments(text)
+    count = FUNCTIONS[syntax][1]
+    if alpha is not None or len(parts) != count:
+        raise ValueError(f"{syntax.upper()} input must have {count} values (e.g., {EXAMPLES[syntax]})")
+    return _components(syntax, parts, None)
+
+def parse_colours(values, hint=None):
+    """
+    Parse many colour strings, collecting errors instead of stopping at the first one.
+
+    Parameters:
+    values (iterable): Colour strings.
+    hint (str): Format of bare input, as for parse_colour.
+
+    Returns:
+    tuple: (colours, errors), a list holding a ParsedColour or None per value and a list of
+    (index, message) pairs for the values that failed.
+    """
+    colours, errors = [], []
+    for index, value in enumerate(values):
+        try:
+            colours.append(parse_colour(value, hint))
+        except (ValueError, TypeError, AttributeError) as e:
+            colours.append(None)
+            errors.append((index, str(e)))
+    return colours, errors
+
+def _css_blocks(text):
+    """
+    Yield the (start, end) offsets of the declarations in every CSS block, leaving out selectors
+    and at-rule preludes, including those of nested rules.
+    """
+    depth, start = 0, 0
+    for brace in _CSS_BRACE_RE.finditer(text):
+        end = brace.start()
+        if depth > 0:
+            if brace.group() == "{":  # A nested rule, whose selector follows the last declaration
+                end = max(text.rfind(";", start, end) + 1, start)
+            yield start, end
+        depth = depth + 1 if brace.group() == "{" else max(depth - 1, 0)
+        start = brace.end()
+
+def scan_css(text):
+    """
+    Find and parse every colour in the declaration values of a CSS file. Selectors are skipped, so
+    IDs such as #main and pseudo-classes such as a:hover are not read as colours.
+
+    Parameters:
+    text (str): CSS source.
+
+    Returns:
+    tuple: (colours, errors), lists of (line, column, token, ParsedColour) and
+    (line, column, token, message), with 1-based lines and columns.
+    """
+    line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+    colours, errors = [], []
+    for start, end in _css_blocks(text):
+        for declaration in _CSS_DECLARATION_RE.finditer(text[start:end]):
+            for match in _CSS_TOKEN_RE.finditer(text, start + declaration.start(1), start + declaration.end(1)):
+                token = match.group()
+                offset = match.start()
+                line = bisect.bisect_right(line_starts, offset)
+                position = (line, offset - line_starts[line - 1] + 1)
+                try:
+                    if match.lastgroup == "hex":
+                        hex_match = _HEX_RE.fullmatch(token)
+                        if not hex_match:
+                            raise ValueError(f"Invalid hex color: {token}. Must be 3, 4, 6 or 8 hexadecimal digits.")
+                        colour = _hex_colour(hex_match.group(1))
+                    elif match.lastgroup == "name":
+                        colour = _NAMED[token.lower()]
+                    else:
+                        function = _FUNCTION_RE.fullmatch(token)
+                        colour = _parse_function(function.group(1).lower(), function.group(2))
+                    colours.append(position + (token, colour))
+                except ValueError as e:
+                    errors.append(position + (token, str(e)))
+    return colours, errors
+
+def parse_design_tokens(tokens):
+    """
+    Parse the colour tokens of a design-token file, such as the W3C format
+    {"brand": {"primary": {"$type": "color", "$value": "#FF5733"}}}.
+
+    Tokens typed as colours ($type or type "color", possibly inherited from a group) must parse,
+    and their failures are reported; bare lists such as "255, 87, 51" are read as RGB. Untyped
+    string values are parsed only when written in colour syntax (hex, a colour function or a
+    named colour), so values such as "4, 8, 12" are not mistaken for colours.
+
+    Parameters:
+    tokens (dict or str): Parsed JSON, or JSON text.
+
+    Returns:
+    tuple: (colours, errors), lists of (path, ParsedColour) and (path, message), where path is the
+    dotted path of the value, e.g. "brand.primary.$value".
+    """
+    if isinstance(tokens, str):
+        tokens = json.loads(tokens)
+    colours, errors = [], []
+
+    def visit(node, path, inherited_type):
+        if isinstance(node, dict):
+            node_type = node.get("$type", node.get("type", inherited_type))
+            for key, child in node.items():
+                if key not in ("$type", "type"):
+                    visit(child, path + [str(key)], node_type)
+        elif isinstance(node, list):
+            for index, child in enumerate(node):
+                visit(child, path + [str(index)], inherited_type)
+        elif isinstance(node, str):
+            text = node.strip()
+            if inherited_type != "color" and not (text.startswith("#") or _FUNCTION_RE.fullmatch(text)
+                                                  or text.lower() in _NAMED):
+                return
+            dotted = ".".join(path)
+            try:
+                colours.append((dotted, parse_colour(node)))
+            except ValueError as e:
+                if inherited_type == "color":
+                    errors.append((dotted, str(e)))
+
+    visit(tokens, [], None)
+    return colours, errors
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Find and validate the colours in CSS or design-token files.")
+    parser.add_argument("files", nargs="+", help="CSS or JSON design-token files")
+    args = parser.parse_args()
+    failed = False
+    for file_path in args.files:
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        if file_path.lower().endswith(".json"):
+            found, problems = parse_design_tokens(text)
+            problems = [f"{file_path}: {path}: {message}" for path, message in problems]
+        else:
+            found, problems = scan_css(text)
+            problems = [f"{file_path}:{line}:{column}: {token}: {message}" for line, column, token, message in problems]
+        print(f"{file_path}: {len(found)} colours, {len(problems)} errors")
+        for problem in problems:
+            print(problem)
+        failed = failed or bool(problems)
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from batch_conversions import (rgb_to_hex_batch, hex_to_rgb_batch, cmyk_to_rgb_batch, rgb_to_cmyk_batch,
+                               hsl_to_rgb_batch, rgb_to_hsl_batch, hsv_to_rgb_batch, rgb_to_hsv_batch)
+from colour_parser import parse_colours
+from harmony_functions import HARMONY_OFFSETS, harmony_colours_batch
+from palette_functions import extract_palette, load_image_pixels
+
+# Batch kernels exposed on /convert/<name>
+CONVERSIONS = {
+    "rgb_to_hex": rgb_to_hex_batch,
+    "hex_to_rgb": hex_to_rgb_batch,
+    "cmyk_to_rgb": cmyk_to_rgb_batch,
+    "rgb_to_cmyk": rgb_to_cmyk_batch,
+    "hsl_to_rgb": hsl_to_rgb_batch,
+    "rgb_to_hsl": rgb_to_hsl_batch,
+    "hsv_to_rgb": hsv_to_rgb_batch,
+    "rgb_to_hsv": rgb_to_hsv_batch,
+}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+def run_palette_job(payload):
+    """
+    Extract a palette for a /palette request. Runs in a worker process.
+
+    Parameters:
+    payload (dict): Request body holding either "pixels" or "path", and optionally "n_colours".
+
+    Returns:
+    list: Palette colours as [r, g, b] lists.
+    """
+    if "path" in payload:
+        pixels = load_image_pixels(payload["path"])
+    elif "pixels" in payload:
+        pixels = payload["pixels"]
+    else:
+        raise ValueError("Palette request must provide 'pixels' or 'path'.")
+    return extract_palette(pixels, payload.get("n_colours", 5)).tolist()
+
+class BatchCoalescer:
+    """Collects single-value requests that arrive within a short window and runs them as one batch."""
+
+    def __init__(self, kernel, window=0.002, max_batch=4096):
+        """
+        @param kernel: Function that converts a list of values into an array of results.
+        @param window: Seconds to wait for more requests after the first one of a batch arrives.
+        @param max_batch: Batch size that triggers an immediate flush.
+        """
+        self.kernel = kernel
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.flush_handle = None
+        self.batches_run = 0
+
+    async def submit(self, value):
+        """Queue a value and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((value, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        """Run the kernel over every pending value and resolve their futures."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        self.batches_run += 1
+        try:
+            results = self.kernel([value for value, _ in batch])
+        except (ValueError, TypeError, IndexError):
+            # One invalid value fails the whole batch, so retry each value on its own
+            for value, future in batch:
+                self._resolve(future, lambda: self.kernel([value])[0])
+            return
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, lambda: result)
+
+    @staticmethod
+    def _resolve(future, compute):
+        if future.done():
+            return
+        try:
+            result = compute()
+            future.set_result(result.tolist() if hasattr(result, "tolist") else result)
+        except (ValueError, TypeError, IndexError) as e:
+            future.set_exception(ValueError(str(e)))
+
+class ColourServer:
+    """Local JSON/HTTP server exposing conversions, harmonies and palette extraction."""
+
+    def __init__(self, host="127.0.0.1", port=8765, window=0.002, max_batch=4096, executor=None):
+        """
+        @param host: Interface to listen on.
+        @param port: Port to listen on (0 picks a free port).
+        @param window: Coalescing window in seconds for single-colour requests.
+        @param max_batch: Largest batch handed to a kernel at once.
+        @param executor: Pool for palette jobs; a process pool is created when omitted.
+        """
+        self.host = host
+        self.port = port
+        self.executor = executor
+        self.owns_executor = executor is None
+        self.coalescers = {name: BatchCoalescer(kernel, window, max_batch) for name, kernel in CONVERSIONS.items()}
+        for harmony in HARMONY_OFFSETS:
+            kernel = lambda values, h=harmony: harmony_colours_batch(values, h)
+            self.coalescers[f"harmony:{harmony}"] = BatchCoalescer(kernel, window, max_batch)
+        self.server = None
+
+    async def start(self):
+        """Start listening and return the bound port."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self):
+        """Stop listening and shut down the palette worker pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, response = await self.dispatch(method, path, body)
+                payload = json.dumps(response).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        """Route a request and return (status, JSON-serialisable response)."""
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method != "POST":
+            return 405, {"error": f"Method {method} is not allowed."}
+        try:
+            data = json.loads(body or b"{}")
+            if path.startswith("/convert/"):
+                return 200, await self.convert(path[len("/convert/"):], data)
+            if path == "/parse":
+                return 200, self.parse(data)
+            if path == "/harmony":
+                return 200, await self.harmony(data)
+            if path == "/palette":
+                loop = asyncio.get_running_loop()
+                return 200, {"palette": await loop.run_in_executor(self.executor, run_palette_job, data)}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+        return 404, {"error": f"Unknown path: {path}"}
+
+    async def convert(self, name, data):
+        """Convert one value (coalesced with concurrent requests) or a list of values."""
+        if name not in CONVERSIONS:
+            raise ValueError(f"Unknown conversion: {name}.")
+        if "values" in data:
+            return {"results": CONVERSIONS[name](data["values"]).tolist()}
+        return {"result": await self.coalescers[name].submit(data["value"])}
+
+    def parse(self, data):
+        """Parse a list of colour strings in any supported syntax, reporting errors per item."""
+        colours, errors = parse_colours(data["values"], data.get("hint"))
+        return {
+            "results": [None if colour is None else {"rgb": list(colour.rgb), "alpha": colour.alpha,
+                                                     "syntax": colour.syntax} for colour in colours],
+            "errors": [{"index": index, "error": message} for index, message in errors],
+        }
+
+    async def harmony(self, data):
+        """Compute the harmony colours of one colour, coalesced with concurrent requests."""
+        harmony = data.get("harmony", "Complementary")
+        if harmony not in HARMONY_OFFSETS:
+            raise ValueError(f"Invalid harmony: {harmony}.")
+        return {"colours": await self.coalescers[f"harmony:{harmony}"].submit(data["rgb"])}
+
+async def serve(host, port, window, workers):
+    """Run the colour server until cancelled."""
+    server = ColourServer(host, port, window, executor=ProcessPoolExecutor(max_workers=workers))
+    server.owns_executor = True
+    await server.start()
+    print(f"Colour server listening on http://{server.host}:{server.port}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON/HTTP colour service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window", type=float, default=0.002, help="Coalescing window in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="Palette worker processes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.window, args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,171 @@
+import numpy as np
+
+# Vectorised float conversions between sRGB (0-255) and perceptual or linear colour spaces.
+# Unlike batch_conversions these do not round, so they suit interpolation and colour maths.
+
+# Linear sRGB to CIE XYZ (D65)
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+XYZ_TO_RGB = np.linalg.inv(RGB_TO_XYZ)
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# Linear sRGB to OKLab, from Björn Ottosson's reference implementation
+RGB_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+LMS_TO_OKLAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+LMS_TO_RGB = np.linalg.inv(RGB_TO_LMS)
+OKLAB_TO_LMS = np.linalg.inv(LMS_TO_OKLAB)
+
+def to_rgb8(rgb):
+    """
+    Clip and round float RGB values to 8-bit integers.
+
+    Parameters:
+    rgb (array-like): Float RGB values, nominally 0-255.
+
+    Returns:
+    numpy.ndarray: uint8 array of the same shape.
+    """
+    return np.rint(np.clip(rgb, 0, 255)).astype(np.uint8)
+
+def srgb_to_linear(rgb):
+    """
+    Convert sRGB values (0-255) to linear-light RGB (0-1).
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding sRGB values.
+
+    Returns:
+    numpy.ndarray: Float array of the same shape holding linear RGB values.
+    """
+    c = np.asarray(rgb, dtype=np.float64) / 255
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(linear):
+    """
+    Convert linear-light RGB (0-1) to sRGB values (0-255), without clipping or rounding.
+
+    Parameters:
+    linear (array-like): Array of shape (..., 3) holding linear RGB values.
+
+    Returns:
+    numpy.ndarray: Float array of the same shape holding sRGB values.
+    """
+    c = np.asarray(linear, dtype=np.float64)
+    encoded = np.where(c <= 0.0031308, 12.92 * c, 1.055 * np.abs(c) ** (1 / 2.4) * np.sign(c) - 0.055)
+    return encoded * 255
+
+def rgb_to_xyz(rgb):
+    """Convert sRGB values (0-255) to CIE XYZ (D65, Y of white = 1)."""
+    return srgb_to_linear(rgb) @ RGB_TO_XYZ.T
+
+def xyz_to_rgb(xyz):
+    """Convert CIE XYZ (D65) to float sRGB values (0-255), without clipping or rounding."""
+    return linear_to_srgb(np.asarray(xyz, dtype=np.float64) @ XYZ_TO_RGB.T)
+
+def rgb_to_lab(rgb):
+    """
+    Convert sRGB values (0-255) to CIE L*a*b* (D65).
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding sRGB values.
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding L (0-100), a and b.
+    """
+    xyz = rgb_to_xyz(rgb) / D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+def lab_to_rgb(lab):
+    """
+    Convert CIE L*a*b* (D65) to float sRGB values (0-255), without clipping or rounding.
+
+    Parameters:
+    lab (array-like): Array of shape (..., 3) holding L, a and b.
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding sRGB values.
+    """
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    xyz = np.where(f > 6 / 29, f ** 3, 3 * (6 / 29) ** 2 * (f - 4 / 29))
+    return xyz_to_rgb(xyz * D65_WHITE)
+
+def rgb_to_oklab(rgb):
+    """
+    Convert sRGB values (0-255) to OKLab.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding sRGB values.
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding L (0-1), a and b.
+    """
+    lms = srgb_to_linear(rgb) @ RGB_TO_LMS.T
+    return np.cbrt(lms) @ LMS_TO_OKLAB.T
+
+def oklab_to_rgb(oklab):
+    """
+    Convert OKLab to float sRGB values (0-255), without clipping or rounding.
+
+    Parameters:
+    oklab (array-like): Array of shape (..., 3) holding L, a and b.
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding sRGB values.
+    """
+    lms = (np.asarray(oklab, dtype=np.float64) @ OKLAB_TO_LMS.T) ** 3
+    return linear_to_srgb(lms @ LMS_TO_RGB.T)
+
+def _hue_max_min(rgb):
+    """Return the unrounded hue (0-360), max and min of RGB values scaled to 0-1."""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    max_val, min_val = rgb.max(axis=-1), rgb.min(axis=-1)
+    delta = max_val - min_val
+    safe_delta = np.where(delta == 0, 1, delta)
+    h = np.where(max_val == r, ((g - b) / safe_delta) % 6,
+                 np.where(max_val == g, (b - r) / safe_delta + 2, (r - g) / safe_delta + 4))
+    return np.where(delta == 0, 0, h * 60) % 360, max_val, min_val
+
+def rgb_to_hsl_float(rgb):
+    """
+    Convert sRGB values (0-255) to unrounded HSL.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding sRGB values.
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding hue (0-360), saturation and lightness (0-100).
+    """
+    h, max_val, min_val = _hue_max_min(rgb)
+    l = (max_val + min_val) / 2
+    denominator = 1 - np.abs(2 * l - 1)
+    s = np.where(denominator == 0, 0, (max_val - min_val) / np.where(denominator == 0, 1, denominator))
+    return np.stack([h, s * 100, l * 100], axis=-1)
+
+def rgb_to_hsv_float(rgb):
+    """
+    Convert sRGB values (0-255) to unrounded HSV.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding sRGB values.
+
+    Returns:
+    numpy.ndarray: Float array of shape (..., 3) holding hue (0-360), saturation and value (0-100).
+    """
+    h, max_val, min_val = _hue_max_min(rgb)
+    s = np.where(max_val == 0, 0, (max_val - min_val) / np.where(max_val == 0, 1, max_val))
+    return np.stack([h, s * 100, max_val * 100], axis=-1)
@@ -0,0 +1,144 @@
+import argparse
+import numpy as np
+from colour_parser import parse_colour
+from colour_spaces import srgb_to_linear
+from batch_conversions import rgb_to_hex_batch
+
+# WCAG 2.x relative luminance weights of linear sRGB, and the minimum contrast ratios of each
+# conformance level for normal and large text (18pt, or 14pt bold)
+LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+WCAG_LEVELS = {
+    "AA": {"normal": 4.5, "large": 3.0},
+    "AAA": {"normal": 7.0, "large": 4.5},
+}
+# Luminance above which black text contrasts more than white: (L + 0.05) / 0.05 = 1.05 / (L + 0.05)
+BLACK_TEXT_LUMINANCE = np.sqrt(1.05 * 0.05) - 0.05
+
+def relative_luminance(rgb):
+    """
+    Compute the WCAG relative luminance of sRGB colours.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: Float array of shape (...) holding luminances (0 for black, 1 for white).
+    """
+    return srgb_to_linear(rgb) @ LUMINANCE_WEIGHTS
+
+def contrast_ratio(rgb1, rgb2):
+    """
+    Compute the WCAG contrast ratio between colours, broadcasting like numpy.
+
+    Parameters:
+    rgb1, rgb2 (array-like): Arrays of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray or float: Contrast ratios from 1 to 21.
+    """
+    l1 = relative_luminance(rgb1) + 0.05
+    l2 = relative_luminance(rgb2) + 0.05
+    return np.maximum(l1, l2) / np.minimum(l1, l2)
+
+def contrast_matrix(rgb):
+    """
+    Compute the contrast ratio of every pair of colours in one vectorised operation.
+
+    Parameters:
+    rgb (array-like): Array of shape (n, 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: Symmetric float array of shape (n, n); the diagonal is 1.
+    """
+    luminance = relative_luminance(np.asarray(rgb).reshape(-1, 3)) + 0.05
+    matrix = np.maximum.outer(luminance, luminance)
+    matrix /= np.minimum.outer(luminance, luminance)
+    return matrix
+
+def validate_level(level):
+    """
+    Validate that a conformance level is supported.
+
+    Parameters:
+    level (str): Name of the WCAG level.
+
+    Raises:
+    ValueError: If the level is not one of WCAG_LEVELS.
+    """
+    if level not in WCAG_LEVELS:
+        raise ValueError(f"Invalid WCAG level: {level}. Must be one of {', '.join(WCAG_LEVELS)}.")
+
+def accessible_pairs(rgb, level="AA", large_text=False):
+    """
+    Find every pair of colours whose contrast meets a WCAG level.
+
+    Parameters:
+    rgb (array-like): Array of shape (n, 3) holding RGB values (0-255).
+    level (str): Conformance level, one of WCAG_LEVELS.
+    large_text (bool): Use the lower thresholds for large text.
+
+    Returns:
+    tuple: (pairs, ratios), where pairs is an integer array of shape (m, 2) of colour indices
+    (i < j) and ratios holds their contrast ratios, highest first.
+    """
+    validate_level(level)
+    threshold = WCAG_LEVELS[level]["large" if large_text else "normal"]
+    matrix = contrast_matrix(rgb)
+    first, second = np.nonzero(np.triu(matrix >= threshold, 1))
+    ratios = matrix[first, second]
+    order = np.argsort(-ratios, kind="stable")
+    return np.stack([first[order], second[order]], axis=1), ratios[order]
+
+def compliance_levels(ratios, large_text=False):
+    """
+    Name the highest WCAG level each contrast ratio meets.
+
+    Parameters:
+    ratios (array-like): Contrast ratios.
+    large_text (bool): Use the thresholds for large text.
+
+    Returns:
+    numpy.ndarray: Array of "AAA", "AA" or "" per ratio.
+    """
+    size = "large" if large_text else "normal"
+    ratios = np.asarray(ratios)
+    return np.where(ratios >= WCAG_LEVELS["AAA"][size], "AAA",
+                    np.where(ratios >= WCAG_LEVELS["AA"][size], "AA", ""))
+
+def text_colours(rgb):
+    """
+    Choose black or white text for background colours, whichever has the higher contrast ratio.
+
+    Parameters:
+    rgb (array-like): Array of shape (n, 3) holding RGB values (0-255).
+
+    Returns:
+    list: "black" or "white" for each colour.
+    """
+    dark = relative_luminance(np.asarray(rgb).reshape(-1, 3)) > BLACK_TEXT_LUMINANCE
+    return np.where(dark, "black", "white").tolist()
+
+def text_colour(rgb):
+    """
+    Choose black or white text for one background colour, whichever has the higher contrast ratio.
+
+    Parameters:
+    rgb (tuple): RGB values (0-255).
+
+    Returns:
+    str: "black" or "white".
+    """
+    return "black" if relative_luminance(rgb[:3]) > BLACK_TEXT_LUMINANCE else "white"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List the colour pairs of a palette that meet WCAG contrast.")
+    parser.add_argument("colours", nargs="+", help="Colours, e.g. '#FF0000' 'rgb(0 0 255)' teal")
+    parser.add_argument("--level", default="AA", choices=list(WCAG_LEVELS))
+    parser.add_argument("--large-text", action="store_true", help="Use the thresholds for large text")
+    args = parser.parse_args()
+    palette = np.array([parse_colour(colour).rgb for colour in args.colours])
+    hex_codes = rgb_to_hex_batch(palette)
+    pairs, ratios = accessible_pairs(palette, args.level, args.large_text)
+    for (i, j), ratio, name in zip(pairs, ratios, compliance_levels(ratios, args.large_text)):
+        print(f"{hex_codes[i]} {hex_codes[j]} {ratio:.2f}:1 {name}")
+    print(f"{len(pairs)} of {len(palette) * (len(palette) - 1) // 2} pairs meet {args.level}")
@@ -0,0 +1,221 @@
+import numpy as np
+from conversion_functions import validate_rgb, rgb_to_hsl, rgb_to_hsv, rgb_to_cmyk
+from batch_conversions import (validate_rgb_array, iter_rgb_cube, rgb_to_hsl_batch, rgb_to_hsv_batch,
+                               rgb_to_cmyk_batch)
+
+# Integer (fixed-point) conversions for 8-bit RGB inputs.
+#
+# Every output of the float conversions is round(100 * a / b) or round(60 * a / b) for small
+# integers a and b, so it can be computed exactly with integer division and a half-to-even
+# rounding step. The float code only disagrees with the exact result when the exact value is
+# a tie (x.5), where accumulated float error decides the direction. Ties are detected exactly
+# and, for those inputs only, resolved with the float expression so the output stays
+# bit-identical to conversion_functions.
+
+def _round_ratio(numerator, denominator):
+    """
+    Round numerator / denominator half-to-even using integers only.
+
+    Parameters:
+    numerator, denominator (int): Non-negative numerator and positive denominator.
+
+    Returns:
+    tuple: The rounded quotient and whether the exact value was a tie.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient & 1):
+        quotient += 1
+    return quotient, twice == denominator
+
+def _hue_fixed(r, g, b, max_val, delta):
+    """Return the rounded hue (0-360) and its tie flag for a non-grey colour."""
+    if max_val == r:
+        numerator = 60 * (g - b) + (360 * delta if g < b else 0)
+    elif max_val == g:
+        numerator = 60 * (b - r) + 120 * delta
+    else:
+        numerator = 60 * (r - g) + 240 * delta
+    return _round_ratio(numerator, delta)
+
+# RGB to HSL
+def rgb_to_hsl_fixed(r, g, b):
+    """
+    Convert RGB to HSL with integer arithmetic.
+
+    Parameters:
+    r, g, b (int): RGB values (0-255).
+
+    Returns:
+    tuple: Corresponding HSL values (0-360, 0-100, 0-100), identical to rgb_to_hsl.
+    """
+    validate_rgb(r, g, b)
+    max_val, min_val = max(r, g, b), min(r, g, b)
+    l, l_tie = _round_ratio(100 * (max_val + min_val), 510)
+    delta = max_val - min_val
+    if delta == 0:
+        return 0, 0, l
+    total = max_val + min_val
+    s, s_tie = _round_ratio(100 * delta, 510 - total if total > 255 else total)
+    h, h_tie = _hue_fixed(r, g, b, max_val, delta)
+    if h_tie or s_tie or l_tie:
+        return rgb_to_hsl(r, g, b)
+    return h, s, l
+
+# RGB to HSV
+def rgb_to_hsv_fixed(r, g, b):
+    """
+    Convert RGB to HSV with integer arithmetic.
+
+    Parameters:
+    r, g, b (int): RGB values (0-255).
+
+    Returns:
+    tuple: Corresponding HSV values (0-360, 0-100, 0-100), identical to rgb_to_hsv.
+    """
+    validate_rgb(r, g, b)
+    max_val, min_val = max(r, g, b), min(r, g, b)
+    v, v_tie = _round_ratio(100 * max_val, 255)
+    delta = max_val - min_val
+    if delta == 0:
+        return 0, 0, v
+    s, s_tie = _round_ratio(100 * delta, max_val)
+    h, h_tie = _hue_fixed(r, g, b, max_val, delta)
+    if h_tie or s_tie or v_tie:
+        return rgb_to_hsv(r, g, b)
+    return h, s, v
+
+# RGB to CMYK
+def rgb_to_cmyk_fixed(r, g, b):
+    """
+    Convert RGB to CMYK with integer arithmetic.
+
+    Parameters:
+    r, g, b (int): RGB values (0-255).
+
+    Returns:
+    tuple: Corresponding CMYK values (0-1), identical to rgb_to_cmyk.
+    """
+    validate_rgb(r, g, b)
+    max_val = max(r, g, b)
+    if max_val == 0:
+        return 0, 0, 0, 1
+    c, c_tie = _round_ratio(100 * (max_val - r), max_val)
+    m, m_tie = _round_ratio(100 * (max_val - g), max_val)
+    y, y_tie = _round_ratio(100 * (max_val - b), max_val)
+    k, k_tie = _round_ratio(100 * (255 - max_val), 255)
+    if c_tie or m_tie or y_tie or k_tie:
+        return rgb_to_cmyk(r, g, b)
+    return c / 100, m / 100, y / 100, k / 100
+
+def _round_ratio_array(numerator, denominator):
+    """Array version of _round_ratio. Denominators of zero must be masked by the caller."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = 2 * remainder
+    quotient += (twice > denominator) | ((twice == denominator) & (quotient & 1 == 1))
+    return quotient, twice == denominator
+
+def _split_int(rgb):
+    """Split an RGB array into int32 channels plus its max, min and delta."""
+    rgb = validate_rgb_array(rgb).astype(np.int32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    max_val = np.maximum(np.maximum(r, g), b)
+    min_val = np.minimum(np.minimum(r, g), b)
+    return rgb, r, g, b, max_val, min_val, max_val - min_val
+
+def _hue_fixed_array(r, g, b, max_val, delta):
+    """Array version of _hue_fixed; greys get hue 0 and no tie."""
+    grey = delta == 0
+    safe_delta = np.where(grey, 1, delta)
+    numerator = np.where(max_val == r, 60 * (g - b) + np.where(g < b, 360 * delta, 0),
+                         np.where(max_val == g, 60 * (b - r) + 120 * delta, 60 * (r - g) + 240 * delta))
+    h, tie = _round_ratio_array(numerator, safe_delta)
+    return np.where(grey, 0, h), tie & ~grey
+
+def _resolve_ties(result, rgb, tie, float_kernel):
+    """Replace the results of tied inputs with the float kernel's output for those inputs only."""
+    if tie.any():
+        result[tie] = float_kernel(rgb[tie])
+    return result
+
+# RGB to HSL
+def rgb_to_hsl_fixed_batch(rgb):
+    """
+    Convert an array of RGB values to HSL with integer arithmetic.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: uint16 array of shape (..., 3) holding HSL values, identical to rgb_to_hsl.
+    """
+    rgb, r, g, b, max_val, min_val, delta = _split_int(rgb)
+    total = max_val + min_val
+    l, l_tie = _round_ratio_array(100 * total, 510)
+    denominator = np.where(total > 255, 510 - total, total)
+    s, s_tie = _round_ratio_array(100 * delta, np.where(delta == 0, 1, denominator))
+    h, h_tie = _hue_fixed_array(r, g, b, max_val, delta)
+    result = np.stack([h, s, l], axis=-1).astype(np.uint16)
+    return _resolve_ties(result, rgb, h_tie | (s_tie & (delta > 0)) | l_tie, rgb_to_hsl_batch)
+
+# RGB to HSV
+def rgb_to_hsv_fixed_batch(rgb):
+    """
+    Convert an array of RGB values to HSV with integer arithmetic.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+
+    Returns:
+    numpy.ndarray: uint16 array of shape (..., 3) holding HSV values, identical to rgb_to_hsv.
+    """
+    rgb, r, g, b, max_val, min_val, delta = _split_int(rgb)
+    v, v_tie = _round_ratio_array(100 * max_val, 255)
+    s, s_tie = _round_ratio_array(100 * delta, np.where(max_val == 0, 1, max_val))
+    h, h_tie = _hue_fixed_array(r, g, b, max_val, delta)
+    result = np.stack([h, s, v], axis=-1).astype(np.uint16)
+    return _resolve_ties(result, rgb, h_tie | s_tie | v_tie, rgb_to_hsv_batch)
+
+# RGB to CMYK
+def rgb_to_cmyk_fixed_batch(rgb, as_percent=False):
+    """
+    Convert an array of RGB values to CMYK with integer arithmetic.
+
+    Parameters:
+    rgb (array-like): Array of shape (..., 3) holding RGB values (0-255).
+    as_percent (bool): Return uint8 percentages (0-100) instead of fractions.
+
+    Returns:
+    numpy.ndarray: Array of shape (..., 4) holding CMYK values, identical to rgb_to_cmyk
+    (or 100 times those values when as_percent is set).
+    """
+    rgb, r, g, b, max_val, min_val, delta = _split_int(rgb)
+    black = max_val == 0
+    safe_max = np.where(black, 1, max_val)
+    cmy, cmy_tie = _round_ratio_array(100 * (max_val[..., None] - rgb), safe_max[..., None])
+    k, k_tie = _round_ratio_array(100 * (255 - max_val), 255)
+    result = np.concatenate([np.where(black[..., None], 0, cmy), k[..., None]], axis=-1).astype(np.uint8)
+    tie = (cmy_tie.any(axis=-1) & ~black) | k_tie
+    if tie.any():
+        result[tie] = np.rint(rgb_to_cmyk_batch(rgb[tie]) * 100).astype(np.uint8)
+    return result if as_percent else result / 100
+
+def verify_fixed_point(chunk_size=1 << 20):
+    """
+    Compare the fixed-point batch kernels with the float kernels over all 16.7M RGB values.
+
+    Parameters:
+    chunk_size (int): Number of colours converted per chunk.
+
+    Returns:
+    dict: Number of mismatching inputs per conversion.
+    """
+    mismatches = {"rgb_to_hsl": 0, "rgb_to_hsv": 0, "rgb_to_cmyk": 0}
+    for rgb in iter_rgb_cube(chunk_size):
+        mismatches["rgb_to_hsl"] += int((rgb_to_hsl_fixed_batch(rgb) != rgb_to_hsl_batch(rgb)).any(axis=-1).sum())
+        mismatches["rgb_to_hsv"] += int((rgb_to_hsv_fixed_batch(rgb) != rgb_to_hsv_batch(rgb)).any(axis=-1).sum())
+        mismatches["rgb_to_cmyk"] += int((rgb_to_cmyk_fixed_batch(rgb) != rgb_to_cmyk_batch(rgb)).any(axis=-1).sum())
+    return mismatches
+
+if __name__ == '__main__':
+    print(verify_fixed_point())
@@ -0,0 +1,121 @@
+import argparse
+import numpy as np
+from PIL import Image
+from colour_parser import parse_colour
+from batch_conversions import rgb_to_hex_batch, hsl_to_rgb_float_batch, hsv_to_rgb_float_batch
+from colour_spaces import (to_rgb8, rgb_to_lab, lab_to_rgb, rgb_to_oklab, oklab_to_rgb, rgb_to_hsl_float,
+                           rgb_to_hsv_float)
+
+# Interpolation spaces: (RGB to space, space to float RGB, whether the first component is a hue)
+GRADIENT_SPACES = {
+    "RGB": (lambda rgb: np.asarray(rgb, dtype=np.float64), lambda values: values, False),
+    "HSL": (rgb_to_hsl_float, hsl_to_rgb_float_batch, True),
+    "HSV": (rgb_to_hsv_float, hsv_to_rgb_float_batch, True),
+    "Lab": (rgb_to_lab, lab_to_rgb, False),
+    "OKLab": (rgb_to_oklab, oklab_to_rgb, False),
+}
+
+def parse_stops(stops):
+    """
+    Convert gradient stops given as colour strings or RGB triples to an RGB array.
+
+    Parameters:
+    stops (iterable): Colour strings in any syntax read by parse_colour (#RRGGBB, rgb(), named
+                      colours, ...) or (r, g, b) sequences.
+
+    Returns:
+    numpy.ndarray: Array of shape (n, 3) holding the RGB values (0-255).
+    """
+    rgb = np.array([parse_colour(stop).rgb if isinstance(stop, str) else tuple(stop) for stop in stops],
+                   dtype=np.float64)
+    if rgb.ndim != 2 or rgb.shape[1] != 3 or len(rgb) < 2:
+        raise ValueError("A gradient needs at least two colour stops.")
+    if rgb.min() < 0 or rgb.max() > 255:
+        raise ValueError("Invalid colour stop: each RGB value must be between 0 and 255.")
+    return rgb
+
+def make_gradient(stops, steps, space="OKLab", positions=None):
+    """
+    Interpolate a colour ramp through several stops in one vectorised pass.
+
+    Parameters:
+    stops (iterable): Colour strings or RGB triples, in order.
+    steps (int): Number of colours in the ramp (at least 2).
+    space (str): Interpolation space, one of GRADIENT_SPACES. HSL and HSV take the shortest way
+                 round the hue circle.
+    positions (iterable): Optional increasing stop positions from 0 to 1; evenly spaced by default.
+
+    Returns:
+    numpy.ndarray: uint8 array of shape (steps, 3) holding the ramp colours.
+    """
+    if space not in GRADIENT_SPACES:
+        raise ValueError(f"Invalid gradient space: {space}. Must be one of {', '.join(GRADIENT_SPACES)}.")
+    if steps < 2:
+        raise ValueError(f"Invalid number of steps: {steps}. Must be at least 2.")
+    to_space, from_space, has_hue = GRADIENT_SPACES[space]
+    rgb = parse_stops(stops)
+    values = to_space(rgb)
+    if positions is None:
+        positions = np.linspace(0, 1, len(rgb))
+    positions = np.asarray(positions, dtype=np.float64)
+    if len(positions) != len(rgb) or np.any(np.diff(positions) <= 0):
+        raise ValueError("Stop positions must be strictly increasing and match the number of stops.")
+
+    t = np.linspace(positions[0], positions[-1], steps)
+    segment = np.clip(np.searchsorted(positions, t, side="right") - 1, 0, len(positions) - 2)
+    local = ((t - positions[segment]) / (positions[segment + 1] - positions[segment]))[:, None]
+    start, end = values[segment], values[segment + 1]
+    if has_hue:
+        # Greys have no hue, so borrow the hue of the other end of the segment
+        start_hue = np.where(start[:, 1] == 0, end[:, 0], start[:, 0])
+        end_hue = np.where(end[:, 1] == 0, start_hue, end[:, 0])
+        hue_delta = (end_hue - start_hue + 180) % 360 - 180  # Shortest path round the hue circle
+        ramp = start + (end - start) * local
+        hue = (start_hue + hue_delta * local[:, 0]) % 360
+        ramp[:, 0] = np.where(hue >= 360, 0, hue)
+    else:
+        ramp = start + (end - start) * local
+    return to_rgb8(from_space(ramp))
+
+def gradient_to_hex(ramp):
+    """
+    Convert a colour ramp to a list of hex strings.
+
+    Parameters:
+    ramp (numpy.ndarray): Array of shape (n, 3) holding RGB values.
+
+    Returns:
+    list: Hexadecimal colour strings (#RRGGBB).
+    """
+    return rgb_to_hex_batch(np.asarray(ramp)).tolist()
+
+def gradient_to_image(ramp, width=None, height=20):
+    """
+    Render a colour ramp as a horizontal image strip.
+
+    Parameters:
+    ramp (numpy.ndarray): Array of shape (n, 3) holding RGB values.
+    width (int): Width of the strip in pixels; one pixel per colour by default.
+    height (int): Height of the strip in pixels.
+
+    Returns:
+    PIL.Image.Image: The rendered strip.
+    """
+    ramp = np.asarray(ramp, dtype=np.uint8)
+    if width is not None and width != len(ramp):
+        ramp = ramp[np.linspace(0, len(ramp) - 1, width).round().astype(int)]
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(ramp[None], (height, len(ramp), 3))))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a colour ramp through several stops.")
+    parser.add_argument("stops", nargs="+", help="Colour stops, e.g. '#FF0000' 'rgb(0 0 255)' teal")
+    parser.add_argument("--steps", type=int, default=256)
+    parser.add_argument("--space", default="OKLab", choices=list(GRADIENT_SPACES))
+    parser.add_argument("--image", help="Save the ramp as an image strip to this path")
+    parser.add_argument("--height", type=int, default=20, help="Height of the image strip")
+    args = parser.parse_args()
+    ramp = make_gradient(args.stops, args.steps, args.space)
+    if args.image:
+        gradient_to_image(ramp, height=args.height).save(args.image)
+    else:
+        print("\n".join(gradient_to_hex(ramp)))
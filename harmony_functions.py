@@ -0,0 +1,59 @@
+import numpy as np
+from conversion_functions import rgb_to_hsv, hsv_to_rgb
+from batch_conversions import rgb_to_hsv_batch, hsv_to_rgb_batch
+
+# Hue offsets (in degrees) of each harmony relative to the selected colour. These match the
+# angles the Colour Gear uses when walking around the colour wheel.
+HARMONY_OFFSETS = {
+    "Complementary": (180,),
+    "Analogous": (-30, 30),
+    "Triadic": (120, -120),
+    "Tetradic": (90, 180, 270),
+    "Split-Complementary": (150, -150),
+}
+
+def validate_harmony(harmony):
+    """
+    Validate that a harmony name is supported.
+
+    Parameters:
+    harmony (str): Name of the colour harmony.
+
+    Raises:
+    ValueError: If the harmony is not one of HARMONY_OFFSETS.
+    """
+    if harmony not in HARMONY_OFFSETS:
+        raise ValueError(f"Invalid harmony: {harmony}. Must be one of {', '.join(HARMONY_OFFSETS)}.")
+
+def harmony_colours(r, g, b, harmony):
+    """
+    Compute the colours that form a harmony with the given colour.
+
+    Parameters:
+    r, g, b (int): RGB values (0-255) of the base colour.
+    harmony (str): Name of the colour harmony.
+
+    Returns:
+    list: RGB tuples (0-255) of the harmony colours, excluding the base colour.
+    """
+    validate_harmony(harmony)
+    h, s, v = rgb_to_hsv(r, g, b)
+    return [hsv_to_rgb((h + offset) % 360, s, v) for offset in HARMONY_OFFSETS[harmony]]
+
+def harmony_colours_batch(rgb, harmony):
+    """
+    Compute the harmony colours for an array of base colours.
+
+    Parameters:
+    rgb (array-like): Array of shape (n, 3) holding RGB values (0-255).
+    harmony (str): Name of the colour harmony.
+
+    Returns:
+    numpy.ndarray: Array of shape (n, k, 3) holding the k harmony colours of each base colour.
+    """
+    validate_harmony(harmony)
+    hsv = rgb_to_hsv_batch(rgb).astype(np.float64)
+    offsets = np.asarray(HARMONY_OFFSETS[harmony], dtype=np.float64)
+    rotated = np.repeat(hsv[:, None, :], len(offsets), axis=1)
+    rotated[..., 0] = (rotated[..., 0] + offsets) % 360
+    return hsv_to_rgb_batch(rotated)
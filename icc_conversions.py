@@ -0,0 +1,262 @@
+import argparse
+import io
+import os
+import numpy as np
+from functools import lru_cache
+from PIL import Image, ImageCms
+from conversion_functions import validate_rgb, validate_cmyk, rgb_to_cmyk, cmyk_to_rgb
+from batch_conversions import validate_rgb_array, validate_cmyk_array, rgb_to_cmyk_batch, cmyk_to_rgb_batch
+
+# ICC-profile-aware RGB <-> CMYK conversions through Pillow's ImageCms (LittleCMS). When no CMYK
+# profile is configured every function falls back to the naive formulas of conversion_functions.
+RENDERING_INTENTS = {
+    "perceptual": ImageCms.Intent.PERCEPTUAL,
+    "relative": ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    "saturation": ImageCms.Intent.SATURATION,
+    "absolute": ImageCms.Intent.ABSOLUTE_COLORIMETRIC,
+}
+DEFAULT_INTENT = "relative"
+PROFILE_ENV = "COLOUR_CMYK_PROFILE"  # Path of the CMYK profile to use by default
+_cmyk_profile = os.environ.get(PROFILE_ENV) or None
+_intent = DEFAULT_INTENT
+
+def get_cmyk_profile():
+    """Return the path of the configured CMYK profile, or None when the naive formulas are used."""
+    return _cmyk_profile
+
+def get_rendering_intent():
+    """Return the name of the configured rendering intent."""
+    return _intent
+
+def set_cmyk_profile(path, intent=DEFAULT_INTENT):
+    """
+    Configure the CMYK profile and rendering intent used when none is passed explicitly.
+
+    Parameters:
+    path (str): Path of a CMYK ICC profile, or None to go back to the naive formulas.
+    intent (str): Rendering intent, one of RENDERING_INTENTS.
+
+    Raises:
+    ValueError: If the intent is unknown or the profile cannot be read or is not a CMYK profile.
+    """
+    global _cmyk_profile, _intent
+    if intent not in RENDERING_INTENTS:
+        raise ValueError(f"Invalid rendering intent: {intent}. Must be one of {', '.join(RENDERING_INTENTS)}.")
+    if path is not None:
+        load_profile(path, "CMYK")
+    _cmyk_profile, _intent = path, intent
+
+@lru_cache(maxsize=16)
+def load_profile(source, colour_space):
+    """
+    Open an ICC profile once and keep it for later transforms.
+
+    Parameters:
+    source (str or bytes): Path of the profile, its raw bytes (e.g. embedded in an image), or None
+                           for the built-in sRGB profile.
+    colour_space (str): Colour space the profile must describe, "RGB" or "CMYK".
+
+    Returns:
+    PIL.ImageCms.ImageCmsProfile: The opened profile.
+
+    Raises:
+    ValueError: If the profile cannot be read or describes another colour space.
+    """
+    try:
+        if source is None:
+            profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+        elif isinstance(source, bytes):
+            profile = ImageCms.ImageCmsProfile(io.BytesIO(source))
+        else:
+            profile = ImageCms.getOpenProfile(source)
+    except (OSError, ImageCms.PyCMSError) as e:
+        name = source if isinstance(source, str) else "data"
+        raise ValueError(f"Cannot read ICC profile {name}: {e}") from e
+    if profile.profile.xcolor_space.strip() != colour_space:
+        raise ValueError(f"Invalid ICC profile: expected a {colour_space} profile, "
+                         f"got {profile.profile.xcolor_space.strip()}.")
+    return profile
+
+@lru_cache(maxsize=32)
+def get_transform(rgb_profile, cmyk_profile, to_cmyk, intent):
+    """
+    Build a transform between an RGB and a CMYK profile, cached per profile pair, direction and
+    intent. Building a transform is expensive; applying a cached one is cheap.
+
+    Parameters:
+    rgb_profile (str or bytes): RGB profile path or bytes; None for sRGB.
+    cmyk_profile (str): CMYK profile path or bytes.
+    to_cmyk (bool): True for RGB to CMYK, False for CMYK to RGB.
+    intent (str): Rendering intent, one of RENDERING_INTENTS.
+
+    Returns:
+    PIL.ImageCms.ImageCmsTransform: The transform.
+    """
+    if intent not in RENDERING_INTENTS:
+        raise ValueError(f"Invalid rendering intent: {intent}. Must be one of {', '.join(RENDERING_INTENTS)}.")
+    rgb = load_profile(rgb_profile, "RGB")
+    cmyk = load_profile(cmyk_profile, "CMYK")
+    source, target, modes = (rgb, cmyk, ("RGB", "CMYK")) if to_cmyk else (cmyk, rgb, ("CMYK", "RGB"))
+    # NOCACHE disables LittleCMS's single-pixel cache, which is not safe to share between threads
+    return ImageCms.buildTransform(source, target, *modes, renderingIntent=RENDERING_INTENTS[intent],
+                                   flags=ImageCms.Flags.NOCACHE)
+
+def _apply(values, channels_in, mode_in, transform):
+    """Apply a transform to an array of 8-bit colours of shape (..., channels_in), via a one-row image."""
+    flat = np.ascontiguousarray(values, dtype=np.uint8).reshape(1, -1, channels_in)
+    result = np.asarray(ImageCms.applyTransform(Image.fromarray(flat, mode_in), transform))
+    return result.reshape(values.shape[:-1] + result.shape[-1:])
+
+def rgb_to_cmyk_icc_batch(rgb, profile=None, intent=None, rgb_profile=None):
+    """
+    Convert RGB values to CMYK through ICC profiles.
+
+    Parameters:
+    rgb (array-like): Integer array of shape (..., 3) holding RGB values (0-255).
+    profile (str): CMYK profile; the configured one by default. Without one the naive formula is used.
+    intent (str): Rendering intent; the configured one by default.
+    rgb_profile (str or bytes): Source RGB profile; sRGB by default.
+
+    Returns:
+    numpy.ndarray: float64 array of shape (..., 4) holding CMYK values (0-1), in 1/255 steps.
+    """
+    rgb = validate_rgb_array(rgb)
+    profile = profile or _cmyk_profile
+    if profile is None:
+        return rgb_to_cmyk_batch(rgb)
+    transform = get_transform(rgb_profile, profile, True, intent or _intent)
+    return _apply(rgb, 3, "RGB", transform) / 255.0
+
+def cmyk_to_rgb_icc_batch(cmyk, profile=None, intent=None, rgb_profile=None):
+    """
+    Convert CMYK values to RGB through ICC profiles. CMYK values are quantised to 8 bits, the
+    precision of the transform.
+
+    Parameters:
+    cmyk (array-like): Array of shape (..., 4) holding CMYK values (0-1).
+    profile (str): CMYK profile; the configured one by default. Without one the naive formula is used.
+    intent (str): Rendering intent; the configured one by default.
+    rgb_profile (str or bytes): Target RGB profile; sRGB by default.
+
+    Returns:
+    numpy.ndarray: Integer array of shape (..., 3) holding RGB values (0-255).
+    """
+    cmyk = validate_cmyk_array(cmyk)
+    profile = profile or _cmyk_profile
+    if profile is None:
+        return cmyk_to_rgb_batch(cmyk)
+    transform = get_transform(rgb_profile, profile, False, intent or _intent)
+    return _apply(np.rint(cmyk * 255), 4, "CMYK", transform).astype(np.int64)
+
+# Pillow serialises the output profile into every transformed image, which dominates the cost of
+# converting a single colour, so single-colour results are memoised per profile and intent.
+@lru_cache(maxsize=4096)
+def _profile_rgb_to_cmyk(rgb, profile, intent):
+    """Convert one validated RGB colour through a profile, memoised."""
+    return tuple(round(float(value), 2) for value in rgb_to_cmyk_icc_batch(np.array(rgb), profile, intent))
+
+@lru_cache(maxsize=4096)
+def _profile_cmyk_to_rgb(cmyk, profile, intent):
+    """Convert one validated CMYK colour through a profile, memoised."""
+    return tuple(int(value) for value in cmyk_to_rgb_icc_batch(np.array(cmyk), profile, intent))
+
+def rgb_to_cmyk_icc(r, g, b, profile=None, intent=None):
+    """
+    Convert RGB to CMYK through the CMYK profile, or with the naive formula when there is none.
+
+    Parameters:
+    r, g, b (int): RGB values (0-255).
+    profile (str): CMYK profile; the configured one by default.
+    intent (str): Rendering intent; the configured one by default.
+
+    Returns:
+    tuple: Corresponding CMYK values (0-1), rounded to 2 decimals.
+    """
+    validate_rgb(r, g, b)
+    profile = profile or _cmyk_profile
+    if profile is None:
+        return rgb_to_cmyk(r, g, b)
+    return _profile_rgb_to_cmyk((int(r), int(g), int(b)), profile, intent or _intent)
+
+def cmyk_to_rgb_icc(c, m, y, k, profile=None, intent=None):
+    """
+    Convert CMYK to RGB through the CMYK profile, or with the naive formula when there is none.
+
+    Parameters:
+    c, m, y, k (float): CMYK values (0-1).
+    profile (str): CMYK profile; the configured one by default.
+    intent (str): Rendering intent; the configured one by default.
+
+    Returns:
+    tuple: Corresponding RGB values (0-255).
+    """
+    validate_cmyk(c, m, y, k)
+    profile = profile or _cmyk_profile
+    if profile is None:
+        return cmyk_to_rgb(c, m, y, k)
+    return _profile_cmyk_to_rgb((c, m, y, k), profile, intent or _intent)
+
+def image_to_cmyk(image, profile=None, intent=None):
+    """
+    Convert a whole image to CMYK. A profile embedded in the image is used as its source profile,
+    and the CMYK profile is embedded in the result so it can be saved for print.
+
+    Parameters:
+    image (PIL.Image.Image): Image in any mode; converted to RGB first.
+    profile (str): CMYK profile; the configured one by default. Without one the naive formula is used.
+    intent (str): Rendering intent; the configured one by default.
+
+    Returns:
+    PIL.Image.Image: CMYK image.
+    """
+    rgb_profile = image.info.get("icc_profile") or None
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    profile = profile or _cmyk_profile
+    if profile is None:
+        cmyk = rgb_to_cmyk_batch(np.asarray(image))
+        return Image.fromarray(np.rint(cmyk * 255).astype(np.uint8), "CMYK")
+    try:
+        transform = get_transform(rgb_profile, profile, True, intent or _intent)
+    except ValueError:
+        transform = get_transform(None, profile, True, intent or _intent)  # Unusable embedded profile, assume sRGB
+    result = ImageCms.applyTransform(image, transform)
+    result.info["icc_profile"] = load_profile(profile, "CMYK").tobytes()
+    return result
+
+def image_from_cmyk(image, profile=None, intent=None):
+    """
+    Convert a whole CMYK image to sRGB, using its embedded profile when it has a usable one.
+
+    Parameters:
+    image (PIL.Image.Image): CMYK image.
+    profile (str): CMYK profile for images without an embedded one; the configured one by default.
+    intent (str): Rendering intent; the configured one by default.
+
+    Returns:
+    PIL.Image.Image: RGB image.
+    """
+    if image.mode != "CMYK":
+        raise ValueError(f"Invalid image mode: {image.mode}. Must be CMYK.")
+    embedded = image.info.get("icc_profile") or None
+    profile = profile or _cmyk_profile
+    if embedded is not None:
+        try:
+            return ImageCms.applyTransform(image, get_transform(None, embedded, False, intent or _intent))
+        except ValueError:
+            pass  # Unusable embedded profile, fall back to the given or configured one
+    if profile is None:
+        return Image.fromarray(cmyk_to_rgb_batch(np.asarray(image) / 255.0).astype(np.uint8), "RGB")
+    return ImageCms.applyTransform(image, get_transform(None, profile, False, intent or _intent))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert an image to CMYK with an ICC profile.")
+    parser.add_argument("image")
+    parser.add_argument("output", help="Output file, e.g. a .tif or .jpg that can hold CMYK")
+    parser.add_argument("--profile", default=_cmyk_profile, help=f"CMYK ICC profile (default: ${PROFILE_ENV})")
+    parser.add_argument("--intent", default=DEFAULT_INTENT, choices=list(RENDERING_INTENTS))
+    args = parser.parse_args()
+    with Image.open(args.image) as source:
+        converted = image_to_cmyk(source, args.profile, args.intent)
+    converted.save(args.output, icc_profile=converted.info.get("icc_profile"))
+    print(f"Saved {args.output} ({'profile ' + args.profile if args.profile else 'naive formula'})")
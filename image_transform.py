@@ -0,0 +1,233 @@
+import argparse
+import os
+from contextlib import ExitStack
+import numpy as np
+from PIL import Image
+from batch_conversions import hsl_to_rgb_float_batch, hsv_to_rgb_float_batch
+from colour_spaces import to_rgb8, rgb_to_lab, lab_to_rgb, rgb_to_hsl_float, rgb_to_hsv_float
+from icc_conversions import get_cmyk_profile, rgb_to_cmyk_icc_batch, cmyk_to_rgb_icc_batch
+
+CHUNK_PIXELS = 1 << 18  # Pixels converted per chunk, bounding the temporary arrays to a few MB
+
+def _wrap_hue(values):
+    """Wrap hue into [0, 360) and clip the percentage channels, so quantised planes convert back."""
+    values = np.array(values, dtype=np.float64)
+    values[..., 0] %= 360
+    np.clip(values[..., 1:], 0, 100, out=values[..., 1:])
+    return values
+
+def _rgb_to_cmyk_float(rgb):
+    """Unrounded CMYK (0-1), through the configured ICC profile when there is one."""
+    if get_cmyk_profile():
+        return rgb_to_cmyk_icc_batch(rgb.astype(np.int64))
+    rgb = rgb / 255.0
+    max_val = rgb.max(axis=-1, keepdims=True)
+    safe_max = np.where(max_val == 0, 1, max_val)
+    return np.concatenate([(max_val - rgb) / safe_max, 1 - max_val], axis=-1)
+
+def _cmyk_to_rgb_float(cmyk):
+    """RGB (0-255) from CMYK, through the configured ICC profile when there is one."""
+    cmyk = np.clip(cmyk, 0, 1)
+    if get_cmyk_profile():
+        return cmyk_to_rgb_icc_batch(cmyk).astype(np.float64)
+    return 255 * (1 - cmyk[..., :3]) * (1 - cmyk[..., 3:])
+
+# Colour spaces an image can be split into: channel names, the range of each channel (mapped to
+# 0-255 in grayscale exports), and the forward and inverse conversions of (n, 3) RGB arrays
+IMAGE_SPACES = {
+    "HSL": {"channels": ("H", "S", "L"), "ranges": ((0, 360), (0, 100), (0, 100)),
+            "forward": rgb_to_hsl_float,
+            "inverse": lambda values: hsl_to_rgb_float_batch(_wrap_hue(values))},
+    "HSV": {"channels": ("H", "S", "V"), "ranges": ((0, 360), (0, 100), (0, 100)),
+            "forward": rgb_to_hsv_float,
+            "inverse": lambda values: hsv_to_rgb_float_batch(_wrap_hue(values))},
+    "CMYK": {"channels": ("C", "M", "Y", "K"), "ranges": ((0, 1),) * 4,
+             "forward": _rgb_to_cmyk_float, "inverse": _cmyk_to_rgb_float},
+    "Lab": {"channels": ("L", "a", "b"), "ranges": ((0, 100), (-128, 127), (-128, 127)),
+            "forward": rgb_to_lab, "inverse": lab_to_rgb},
+}
+
+def _space(space):
+    """Look up a colour space of IMAGE_SPACES."""
+    if space not in IMAGE_SPACES:
+        raise ValueError(f"Invalid colour space: {space}. Must be one of {', '.join(IMAGE_SPACES)}.")
+    return IMAGE_SPACES[space]
+
+def _rows_per_chunk(width, chunk_pixels):
+    """Number of image rows converted at once."""
+    return max(1, chunk_pixels // max(1, width))
+
+def transform_image(image, space, out=None, chunk_pixels=CHUNK_PIXELS):
+    """
+    Convert every pixel of an image to another colour space, a band of rows at a time.
+
+    Parameters:
+    image (PIL.Image.Image or numpy.ndarray): The image; arrays must be RGB of shape (h, w, 3).
+    space (str): Target colour space, one of IMAGE_SPACES.
+    out (numpy.ndarray): Optional float array of shape (h, w, channels) to write into, such as a
+                         memory-mapped .npy file, so the full result never has to fit in memory.
+    chunk_pixels (int): Pixels converted per chunk.
+
+    Returns:
+    numpy.ndarray: float32 array of shape (h, w, channels), or out when given.
+    """
+    config = _space(space)
+    if isinstance(image, Image.Image):
+        image = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError(f"Invalid image shape: {image.shape}. Must be (height, width, 3).")
+    height, width = image.shape[:2]
+    shape = (height, width, len(config["channels"]))
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif out.shape != shape:
+        raise ValueError(f"Invalid output shape: {out.shape}. Must be {shape}.")
+    rows = _rows_per_chunk(width, chunk_pixels)
+    for top in range(0, height, rows):
+        out[top:top + rows] = config["forward"](image[top:top + rows])
+    return out
+
+def inverse_transform(channels, space, chunk_pixels=CHUNK_PIXELS):
+    """
+    Convert channel planes back to an RGB image, a band of rows at a time.
+
+    Parameters:
+    channels (numpy.ndarray): Array of shape (h, w, channels) in the given colour space.
+    space (str): Colour space of the channels, one of IMAGE_SPACES.
+    chunk_pixels (int): Pixels converted per chunk.
+
+    Returns:
+    PIL.Image.Image: The RGB image.
+    """
+    config = _space(space)
+    if channels.ndim != 3 or channels.shape[2] != len(config["channels"]):
+        raise ValueError(f"Invalid channel array shape: {channels.shape}. "
+                         f"{space} needs {len(config['channels'])} channels.")
+    height, width = channels.shape[:2]
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rows = _rows_per_chunk(width, chunk_pixels)
+    for top in range(0, height, rows):
+        rgb[top:top + rows] = to_rgb8(config["inverse"](np.asarray(channels[top:top + rows], dtype=np.float64)))
+    return Image.fromarray(rgb)
+
+def _to_grey(plane, value_range):
+    """Map channel values in value_range to 8-bit grey levels."""
+    low, high = value_range
+    return to_rgb8((np.asarray(plane, dtype=np.float32) - low) * (255 / (high - low)))
+
+def channels_to_images(channels, space):
+    """
+    Scale each channel plane to an 8-bit grayscale image, mapping the channel's range to 0-255.
+
+    Parameters:
+    channels (numpy.ndarray): Array of shape (h, w, channels) in the given colour space.
+    space (str): Colour space of the channels, one of IMAGE_SPACES.
+
+    Returns:
+    list: (channel name, PIL.Image.Image) pairs.
+    """
+    config = _space(space)
+    return [(name, Image.fromarray(_to_grey(channels[..., index], value_range)))
+            for index, (name, value_range) in enumerate(zip(config["channels"], config["ranges"]))]
+
+def images_to_channels(images, space):
+    """
+    Read grayscale channel images back into channel values, the inverse of channels_to_images.
+
+    Parameters:
+    images (list): Grayscale PIL images, one per channel of the space, in order.
+    space (str): Colour space of the channels, one of IMAGE_SPACES.
+
+    Returns:
+    numpy.ndarray: float32 array of shape (h, w, channels).
+    """
+    config = _space(space)
+    if len(images) != len(config["channels"]):
+        raise ValueError(f"{space} needs {len(config['channels'])} channel images, got {len(images)}.")
+    planes = [np.asarray(image.convert("L"), dtype=np.float32) * ((high - low) / 255) + low
+              for image, (low, high) in zip(images, config["ranges"])]
+    if any(plane.shape != planes[0].shape for plane in planes):
+        raise ValueError("Channel images must all have the same size.")
+    return np.stack(planes, axis=-1)
+
+def export_channels(image, space, output, chunk_pixels=CHUNK_PIXELS):
+    """
+    Write the channels of an image in a colour space to disk.
+
+    A path ending in .npy receives one stacked float32 array of shape (h, w, channels), written
+    through a memory map chunk by chunk. Any other path is used as a name pattern for separate
+    grayscale images, one per channel: photo.png becomes photo_H.png, photo_S.png and photo_L.png.
+
+    Parameters:
+    image (PIL.Image.Image or numpy.ndarray): The RGB image.
+    space (str): Colour space, one of IMAGE_SPACES.
+    output (str): Output path.
+    chunk_pixels (int): Pixels converted per chunk.
+
+    Returns:
+    list: Paths of the written files.
+    """
+    config = _space(space)
+    if isinstance(image, Image.Image):
+        image = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+    if output.lower().endswith(".npy"):
+        shape = image.shape[:2] + (len(config["channels"]),)
+        array = np.lib.format.open_memmap(output, mode="w+", dtype=np.float32, shape=shape)
+        transform_image(image, space, out=array, chunk_pixels=chunk_pixels)
+        array.flush()
+        del array
+        return [output]
+    # Convert band by band straight into 8-bit planes, so no full-size float array is needed
+    height, width = image.shape[:2]
+    planes = np.empty((len(config["channels"]), height, width), dtype=np.uint8)
+    rows = _rows_per_chunk(width, chunk_pixels)
+    for top in range(0, height, rows):
+        values = config["forward"](image[top:top + rows])
+        for index, value_range in enumerate(config["ranges"]):
+            planes[index, top:top + rows] = _to_grey(values[..., index], value_range)
+    stem, extension = os.path.splitext(output)
+    paths = []
+    for name, plane in zip(config["channels"], planes):
+        paths.append(f"{stem}_{name}{extension or '.png'}")
+        Image.fromarray(plane).save(paths[-1])
+    return paths
+
+def import_channels(paths, space, chunk_pixels=CHUNK_PIXELS):
+    """
+    Rebuild an RGB image from exported channels: one .npy file, or one grayscale image per channel.
+
+    Parameters:
+    paths (list): Paths written by export_channels.
+    space (str): Colour space of the channels, one of IMAGE_SPACES.
+    chunk_pixels (int): Pixels converted per chunk.
+
+    Returns:
+    PIL.Image.Image: The RGB image.
+    """
+    if len(paths) == 1 and paths[0].lower().endswith(".npy"):
+        channels = np.load(paths[0], mmap_mode="r")
+    else:
+        with ExitStack() as stack:
+            images = [stack.enter_context(Image.open(path)) for path in paths]
+            channels = images_to_channels(images, space)
+    return inverse_transform(channels, space, chunk_pixels)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Split images into colour-space channels and back.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write the channels of an image")
+    export_parser.add_argument("image")
+    export_parser.add_argument("output", help="A .npy file for a stacked array, otherwise an image name pattern")
+    export_parser.add_argument("--space", default="HSL", choices=list(IMAGE_SPACES))
+    import_parser = commands.add_parser("import", help="Rebuild an RGB image from exported channels")
+    import_parser.add_argument("channels", nargs="+", help="One .npy file, or one grayscale image per channel")
+    import_parser.add_argument("--space", default="HSL", choices=list(IMAGE_SPACES))
+    import_parser.add_argument("--output", required=True, help="Path of the rebuilt image")
+    args = parser.parse_args()
+    if args.command == "export":
+        with Image.open(args.image) as source:
+            written = export_channels(source, args.space, args.output)
+        print("Wrote " + ", ".join(written))
+    else:
+        import_channels(args.channels, args.space).save(args.output)
+        print(f"Wrote {args.output}")
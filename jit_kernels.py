@@ -0,0 +1,249 @@
+import numpy as np
+from numba import njit
+
+# Numba versions of the hot kernels. Every kernel repeats the float operations of the scalar
+# conversions in the same order, so results are identical to the NumPy backend. Kernels are
+# compiled on first use and cached on disk (cache=True), so later runs load them instead of
+# compiling again. Import this module through batch_conversions, which only loads it when the
+# Numba backend is selected.
+# The kernels are deliberately not parallel=True: Numba's threading layers are not safe to use from
+# several threads at once (the wheel renders off the UI thread) or before forking worker processes,
+# and the multi-core paths already spread their work over process pools.
+
+@njit(cache=True)
+def _hue(r_prime, g_prime, b_prime, max_val, delta):
+    """Compute the hue fraction (0-1) of one colour like the scalar code."""
+    if delta == 0:
+        return 0.0
+    if max_val == r_prime:
+        h = (g_prime - b_prime) / delta + (6 if g_prime < b_prime else 0)
+    elif max_val == g_prime:
+        h = (b_prime - r_prime) / delta + 2
+    else:
+        h = (r_prime - g_prime) / delta + 4
+    return h / 6
+
+@njit(cache=True)
+def rgb_to_hsl(rgb):
+    """
+    Convert RGB values to HSL.
+
+    Parameters:
+    rgb (numpy.ndarray): Validated integer array of shape (n, 3).
+
+    Returns:
+    numpy.ndarray: int64 array of shape (n, 3) holding HSL values.
+    """
+    out = np.empty((rgb.shape[0], 3), dtype=np.int64)
+    for i in range(rgb.shape[0]):
+        r_prime, g_prime, b_prime = rgb[i, 0] / 255.0, rgb[i, 1] / 255.0, rgb[i, 2] / 255.0
+        max_val = max(r_prime, g_prime, b_prime)
+        min_val = min(r_prime, g_prime, b_prime)
+        l = (max_val + min_val) / 2
+        delta = max_val - min_val
+        if delta == 0:
+            s = 0.0
+        elif l > 0.5:
+            s = delta / (2 - max_val - min_val)
+        else:
+            s = delta / (max_val + min_val)
+        h = _hue(r_prime, g_prime, b_prime, max_val, delta)
+        out[i, 0] = np.rint(h * 360)
+        out[i, 1] = np.rint(s * 100)
+        out[i, 2] = np.rint(l * 100)
+    return out
+
+@njit(cache=True)
+def rgb_to_hsv(rgb):
+    """
+    Convert RGB values to HSV.
+
+    Parameters:
+    rgb (numpy.ndarray): Validated integer array of shape (n, 3).
+
+    Returns:
+    numpy.ndarray: int64 array of shape (n, 3) holding HSV values.
+    """
+    out = np.empty((rgb.shape[0], 3), dtype=np.int64)
+    for i in range(rgb.shape[0]):
+        r_prime, g_prime, b_prime = rgb[i, 0] / 255.0, rgb[i, 1] / 255.0, rgb[i, 2] / 255.0
+        max_val = max(r_prime, g_prime, b_prime)
+        min_val = min(r_prime, g_prime, b_prime)
+        delta = max_val - min_val
+        s = 0.0 if max_val == 0 else delta / max_val
+        h = _hue(r_prime, g_prime, b_prime, max_val, delta)
+        out[i, 0] = np.rint(h * 360)
+        out[i, 1] = np.rint(s * 100)
+        out[i, 2] = np.rint(max_val * 100)
+    return out
+
+@njit(cache=True)
+def rgb_to_cmyk(rgb, channel_table, key_table):
+    """
+    Convert RGB values to CMYK through the lookup tables of batch_conversions._cmyk_tables.
+
+    Parameters:
+    rgb (numpy.ndarray): Validated integer array of shape (n, 3).
+    channel_table, key_table (numpy.ndarray): CMY and K values keyed by channel and maximum.
+
+    Returns:
+    numpy.ndarray: float64 array of shape (n, 4) holding CMYK values.
+    """
+    out = np.empty((rgb.shape[0], 4), dtype=np.float64)
+    for i in range(rgb.shape[0]):
+        max_val = max(rgb[i, 0], rgb[i, 1], rgb[i, 2])
+        for j in range(3):
+            out[i, j] = channel_table[max_val, rgb[i, j]]
+        out[i, 3] = key_table[max_val]
+    return out
+
+@njit(cache=True)
+def cmyk_to_rgb(cmyk):
+    """
+    Convert CMYK values to RGB.
+
+    Parameters:
+    cmyk (numpy.ndarray): Validated float array of shape (n, 4).
+
+    Returns:
+    numpy.ndarray: int64 array of shape (n, 3) holding RGB values.
+    """
+    out = np.empty((cmyk.shape[0], 3), dtype=np.int64)
+    for i in range(cmyk.shape[0]):
+        k = cmyk[i, 3]
+        for j in range(3):
+            out[i, j] = np.rint(255 * (1 - cmyk[i, j]) * (1 - k))
+    return out
+
+@njit(cache=True)
+def _sextant(h, c, x):
+    """Return the (r, g, b) offsets for a hue, in the branch order of the scalar code."""
+    if h < 60:
+        return c, x, 0.0
+    if h < 120:
+        return x, c, 0.0
+    if h < 180:
+        return 0.0, c, x
+    if h < 240:
+        return 0.0, x, c
+    if h < 300:
+        return x, 0.0, c
+    return c, 0.0, x
+
+@njit(cache=True)
+def _hsv_pixel(h, s, v):
+    """Convert one HSV colour to unrounded RGB (0-255)."""
+    s = s / 100
+    v = v / 100
+    c = v * s
+    x = c * (1 - abs((h / 60) % 2 - 1))
+    m = v - c
+    r, g, b = _sextant(h, c, x)
+    return (r + m) * 255, (g + m) * 255, (b + m) * 255
+
+@njit(cache=True)
+def hsl_to_rgb_float(hsl):
+    """
+    Convert HSL values to RGB without rounding.
+
+    Parameters:
+    hsl (numpy.ndarray): Validated float array of shape (n, 3).
+
+    Returns:
+    numpy.ndarray: float64 array of shape (n, 3) holding RGB values before rounding.
+    """
+    out = np.empty((hsl.shape[0], 3), dtype=np.float64)
+    for i in range(hsl.shape[0]):
+        h = hsl[i, 0]
+        s = hsl[i, 1] / 100
+        l = hsl[i, 2] / 100
+        c = (1 - abs(2 * l - 1)) * s
+        x = c * (1 - abs((h / 60) % 2 - 1))
+        m = l - c / 2
+        r, g, b = _sextant(h, c, x)
+        out[i, 0] = (r + m) * 255
+        out[i, 1] = (g + m) * 255
+        out[i, 2] = (b + m) * 255
+    return out
+
+@njit(cache=True)
+def hsv_to_rgb_float(hsv):
+    """
+    Convert HSV values to RGB without rounding.
+
+    Parameters:
+    hsv (numpy.ndarray): Validated float array of shape (n, 3).
+
+    Returns:
+    numpy.ndarray: float64 array of shape (n, 3) holding RGB values before rounding.
+    """
+    out = np.empty((hsv.shape[0], 3), dtype=np.float64)
+    for i in range(hsv.shape[0]):
+        out[i, 0], out[i, 1], out[i, 2] = _hsv_pixel(hsv[i, 0], hsv[i, 1], hsv[i, 2])
+    return out
+
+@njit(cache=True)
+def wheel_rows(size, top, stop, base):
+    """
+    Fill rows top to stop of a full-value colour wheel with unrounded RGB values.
+
+    Parameters:
+    size (int): Width and height of the wheel in pixels.
+    top, stop (int): Range of rows to fill.
+    base (numpy.ndarray): float64 array of shape (size, size, 3); pixels outside the wheel are left untouched.
+    """
+    center = size // 2
+    radius = max(1, size // 2)
+    for y in range(top, stop):
+        dy = float(y - center)
+        for x in range(size):
+            dx = float(x - center)
+            distance = np.sqrt(dx * dx + dy * dy)
+            if distance <= radius:
+                hue = ((np.arctan2(dy, dx) + np.pi) / (2 * np.pi) * 360) % 360
+                base[y, x, 0], base[y, x, 1], base[y, x, 2] = _hsv_pixel(hue, distance / radius * 100, 100.0)
+
+@njit(cache=True)
+def scale_wheel(base, factor, out):
+    """
+    Scale float32 wheel colours by a brightness factor and round them into a uint8 array in one pass.
+
+    Parameters:
+    base (numpy.ndarray): float32 array of shape (size, size, 3).
+    factor (numpy.float32): Value / 100.
+    out (numpy.ndarray): uint8 array of the same shape that receives the result.
+    """
+    for y in range(base.shape[0]):
+        for x in range(base.shape[1]):
+            for j in range(3):
+                out[y, x, j] = np.uint8(np.rint(base[y, x, j] * factor))
+
+@njit(cache=True)
+def nearest_centroid(pixels, centres):
+    """
+    Assign every pixel to its nearest centre.
+
+    Parameters:
+    pixels (numpy.ndarray): float64 array of shape (n, 3).
+    centres (numpy.ndarray): float64 array of shape (k, 3).
+
+    Returns:
+    tuple: (labels, distances), the index of the nearest centre (int64) and the squared distance to it.
+    """
+    n = pixels.shape[0]
+    labels = np.empty(n, dtype=np.int64)
+    distances = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        best = np.inf
+        best_label = 0
+        for j in range(centres.shape[0]):
+            d0 = pixels[i, 0] - centres[j, 0]
+            d1 = pixels[i, 1] - centres[j, 1]
+            d2 = pixels[i, 2] - centres[j, 2]
+            distance = d0 * d0 + d1 * d1 + d2 * d2
+            if distance < best:
+                best = distance
+                best_label = j
+        labels[i] = best_label
+        distances[i] = best
+    return labels, distances
@@ -0,0 +1,208 @@
+import multiprocessing
+import queue
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from quality_controller import TARGET_LATENCY, QualityController, prepare_pixels, fit_palette
+
+RING_MEMORY_BUDGET = 8 * 1024 * 1024  # Bytes of shared memory for the frame ring buffer
+WORKER_IDLE_WAIT = 0.005  # Seconds the worker sleeps when no new frame has arrived
+WORKER_START_METHOD = "spawn"  # A fresh interpreter, so the worker inherits no Tk or thread state
+
+class FrameRing:
+    """
+    A ring buffer of equally sized frames in shared memory, written by one process and read by another.
+
+    The block starts with one int64 sequence number per slot followed by the frames. The writer marks a
+    slot as busy (-1) while it copies a frame in, then stores the frame's sequence number. A reader copies
+    the newest frame out and keeps it only if the slot's sequence number did not change meanwhile, so a
+    frame is never read half-written and pixel data never passes through a pipe.
+    """
+
+    def __init__(self, shape, memory_budget=RING_MEMORY_BUDGET, name=None):
+        """
+        Create a ring buffer, or attach to an existing one by name.
+
+        @param shape: Shape of one frame, e.g. (height, width, 3); frames are uint8.
+        @param memory_budget: Bytes the whole ring may use; the number of slots is derived from it.
+        @param name: Name of an existing ring to attach to, or None to create a new one.
+        @raise ValueError: If the budget cannot hold two frames.
+        """
+        self.shape = tuple(shape)
+        self.frame_bytes = int(np.prod(self.shape))
+        self.slots = memory_budget // (self.frame_bytes + 8)
+        if self.slots < 2:
+            raise ValueError(f"Invalid memory budget: {memory_budget} bytes cannot hold two {self.shape} frames.")
+        size = self.slots * (self.frame_bytes + 8)
+        self.owner = name is None
+        # Worker processes share the creator's resource tracker, so attaching does not take ownership
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.sequences = np.ndarray((self.slots,), dtype=np.int64, buffer=self.memory.buf)
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self.memory.buf,
+                                 offset=self.slots * 8)
+        if self.owner:
+            self.sequences[:] = -1
+        self.written = 0  # Frames pushed by this process
+
+    @property
+    def name(self):
+        """Name of the shared memory block, used by other processes to attach."""
+        return self.memory.name
+
+    def push(self, frame):
+        """
+        Copy a frame into the next slot.
+
+        @param frame: uint8 array of the ring's frame shape.
+        @return: The sequence number of the frame.
+        """
+        sequence = self.written
+        slot = sequence % self.slots
+        self.sequences[slot] = -1
+        self.frames[slot] = frame
+        self.sequences[slot] = sequence
+        self.written += 1
+        return sequence
+
+    def newest(self):
+        """Return the highest sequence number in the ring, or -1 if it is empty."""
+        return int(self.sequences.max())
+
+    def read_newest(self, after=-1, out=None):
+        """
+        Copy out the newest frame if it is newer than a sequence number.
+
+        @param after: Sequence number of the last frame read.
+        @param out: Optional array to copy the frame into.
+        @return: (sequence, frame), or None when there is no newer complete frame.
+        """
+        sequence = self.newest()
+        if sequence <= after:
+            return None
+        slot = sequence % self.slots
+        out = np.empty(self.shape, dtype=np.uint8) if out is None else out
+        np.copyto(out, self.frames[slot])
+        if self.sequences[slot] != sequence:
+            return None  # Overwritten while copying; the next call reads a newer frame
+        return sequence, out
+
+    def close(self):
+        """Detach from the shared memory, and free it if this process created it."""
+        self.sequences = self.frames = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+def live_palette_worker(name, shape, memory_budget, n_colours, results, stop, target_latency=TARGET_LATENCY,
+                        random_state=42):
+    """
+    Cluster the newest frame of a ring buffer over and over until stopped. Runs in a worker process.
+
+    A QualityController picks the analysis resolution, pixel sample size and iteration cap of each
+    update to keep it near the target latency. Each fit is warm-started from the previous palette, so
+    consecutive palettes stay stable and converge in a few iterations. Only the (n_colours, 3)
+    centroid arrays and a small quality report are sent back.
+
+    Parameters:
+    name (str): Name of the FrameRing to attach to.
+    shape (tuple): Frame shape of the ring.
+    memory_budget (int): Memory budget the ring was created with.
+    n_colours (int): Number of colours per palette.
+    results (multiprocessing.Queue): Receives (sequence, centroids, quality report) tuples.
+    stop (multiprocessing.Event): Ends the loop when set.
+    target_latency (float): Seconds one palette update should take.
+    random_state (int): Seed for deterministic results.
+    """
+    ring = FrameRing(shape, memory_budget, name=name)
+    frame = np.empty(ring.shape, dtype=np.uint8)
+    controller = QualityController(target_latency)
+    rng = np.random.default_rng(random_state)
+    last = -1
+    centres = None
+    try:
+        while not stop.is_set():
+            latest = ring.read_newest(last, out=frame)
+            if latest is None:
+                time.sleep(WORKER_IDLE_WAIT)
+                continue
+            last = latest[0]
+            start = time.perf_counter()
+            report = controller.report()  # The settings this palette is computed with
+            pixels = prepare_pixels(frame, controller.settings, rng)
+            centres = fit_palette(pixels, n_colours, controller.settings, init=centres, random_state=random_state)
+            duration = time.perf_counter() - start
+            controller.record(duration)
+            report["latency_ms"] = round(duration * 1000, 1)
+            results.put((last, centres, report))
+    finally:
+        ring.close()
+
+class LivePalette:
+    """Runs live palette extraction in a worker process fed through a shared-memory FrameRing."""
+
+    def __init__(self, shape, n_colours=5, memory_budget=RING_MEMORY_BUDGET, target_latency=TARGET_LATENCY):
+        """
+        @param shape: Shape of the RGB frames to analyse; the worker downscales them as needed.
+        @param n_colours: Number of colours per palette.
+        @param memory_budget: Bytes of shared memory for the ring buffer.
+        @param target_latency: Seconds one palette update should take.
+        """
+        self.shape = tuple(shape)
+        self.n_colours = max(1, int(n_colours))
+        self.memory_budget = memory_budget
+        self.target_latency = target_latency
+        self.ring = None
+        self.process = None
+        self.palettes_received = 0
+
+    def start(self):
+        """Create the ring buffer and start the worker process."""
+        context = multiprocessing.get_context(WORKER_START_METHOD)
+        self.ring = FrameRing(self.shape, self.memory_budget)
+        self.results = context.Queue()
+        self.stop_event = context.Event()
+        self.process = context.Process(target=live_palette_worker, daemon=True,
+                                       args=(self.ring.name, self.shape, self.memory_budget, self.n_colours,
+                                             self.results, self.stop_event, self.target_latency))
+        self.process.start()
+
+    @property
+    def running(self):
+        """True while the worker process is alive."""
+        return self.process is not None and self.process.is_alive()
+
+    def push(self, frame):
+        """Hand a frame to the worker; never blocks, older unread frames are simply overwritten."""
+        return self.ring.push(frame)
+
+    def latest_palette(self):
+        """
+        Return the newest palette the worker has sent since the last call, without blocking.
+
+        @return: (sequence, palette as an integer array of shape (n_colours, 3), quality report of
+                 quality_controller.QualityController.report), or None.
+        """
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.palettes_received += 1
+        if latest is None:
+            return None
+        return latest[0], latest[1].astype(int), latest[2]
+
+    def stop(self, timeout=2.0):
+        """Stop the worker process and free the ring buffer."""
+        if self.process is not None:
+            self.stop_event.set()
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.results.close()
+            self.process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
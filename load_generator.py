@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+def percentile(values, fraction):
+    """
+    Return the value at the given fraction of a list of samples (nearest-rank).
+
+    Parameters:
+    values (list): Samples to rank.
+    fraction (float): Fraction between 0 and 1, e.g. 0.99 for p99.
+
+    Returns:
+    float: The sample at that rank, or 0.0 when there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def random_payload(path):
+    """Build a random request body for one of the colour service endpoints."""
+    rgb = [random.randint(0, 255) for _ in range(3)]
+    if path == "/harmony":
+        return {"rgb": rgb, "harmony": "Triadic"}
+    if path == "/palette":
+        return {"pixels": [[random.randint(0, 255) for _ in range(3)] for _ in range(256)], "n_colours": 3}
+    if path == "/convert/hex_to_rgb":
+        return {"value": "#{:02X}{:02X}{:02X}".format(*rgb)}
+    return {"value": rgb}
+
+async def send_request(reader, writer, host, path, payload):
+    """Send one POST on a keep-alive connection and return the decoded JSON response."""
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    response = json.loads(await reader.readexactly(length))
+    return int(status_line.split()[1]), response
+
+async def run_load(host="127.0.0.1", port=8765, path="/convert/rgb_to_hsl", concurrency=64, total=10000):
+    """
+    Drive the colour service with concurrent clients and measure throughput and latency.
+
+    Parameters:
+    host, port: Address of the colour service.
+    path (str): Endpoint to exercise.
+    concurrency (int): Number of simultaneous keep-alive connections.
+    total (int): Total number of requests to send.
+
+    Returns:
+    dict: Request count, error count, throughput (requests/s) and p50/p99 latency (ms).
+    """
+    latencies = []
+    errors = 0
+    remaining = [total]
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                status, _ = await send_request(reader, writer, host, path, random_payload(path))
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the local colour service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/convert/rgb_to_hsl")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+    stats = asyncio.run(run_load(args.host, args.port, args.path, args.concurrency, args.requests))
+    print(f"{stats['requests']} requests, {stats['errors']} errors, {stats['throughput']:.0f} req/s, "
+          f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
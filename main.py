@@ -1,12 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
-from tkinter import Canvas
+from tkinter import Canvas, filedialog
 from PIL import Image, ImageDraw, ImageTk
 import math
 from conversion_functions import *
 from colour_converter import ColourConverterPage
 from colour_gear import ColourGearPage
 from colour_grab import ColourGrabPage
+from profiling import profiler, format_status
+
+STATUS_POLL_MS = 500  # How often the profiling status bar is refreshed
 
 class MainApplication(tk.Tk):
     def __init__(self, *args: str, **kwargs: dict) -> None:
@@ -22,6 +25,7 @@ class MainApplication(tk.Tk):
 
         # Create and configure the notebook for tab-like navigation
         self.create_notebook()
+        self.create_status_bar()
 
     def create_notebook(self) -> None:
         """
@@ -40,6 +44,54 @@ class MainApplication(tk.Tk):
         self.create_lazy_page("Colour Gear", ColourGearPage)
         self.create_lazy_page("Colour Grab", ColourGrabPage)
 
+    def create_status_bar(self) -> None:
+        """
+        Create the profiling status bar, hidden until F12 turns profiling on. Shift+F12 saves the
+        recorded timings and counters to a JSON file.
+        """
+        self.status_bar = ttk.Label(self, text="", anchor=tk.W, font=("Courier", 9))
+        self.status_bar.grid(row=1, column=0, padx=5, sticky="ew")
+        self.status_polling = False
+        if profiler.enabled:
+            self.poll_status()
+        else:
+            self.status_bar.grid_remove()
+        self.bind_all("<F12>", lambda event: self.toggle_profiling())
+        self.bind_all("<Shift-F12>", lambda event: self.dump_profile())
+
+    def toggle_profiling(self) -> None:
+        """
+        Turn profiling and its status bar on or off.
+        """
+        profiler.enabled = not profiler.enabled
+        if profiler.enabled:
+            profiler.reset()
+            self.status_bar.grid()
+            if not self.status_polling:
+                self.poll_status()
+        else:
+            self.status_bar.grid_remove()
+
+    def poll_status(self) -> None:
+        """
+        Show the rolling p50/p95 timings of the slowest spans and the counters while profiling is on.
+        """
+        if not profiler.enabled:
+            self.status_polling = False
+            return
+        self.status_polling = True
+        self.status_bar.config(text=format_status(profiler.summary(), profiler.counts()))
+        self.after(STATUS_POLL_MS, self.poll_status)
+
+    def dump_profile(self) -> None:
+        """
+        Save everything the profiler recorded to a JSON file for offline analysis.
+        """
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if path:
+            profiler.dump(path)
+            self.status_bar.config(text=f"Saved profile to {path}")
+
     def create_lazy_page(self, page_name: str, page_class: type) -> None:
         """
         Create and add a page to the notebook lazily when it is first accessed.
@@ -0,0 +1,297 @@
+import time
+import cv2
+import numpy as np
+from PIL import Image
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from batch_conversions import jit_kernels
+
+AUTO_TIME_BUDGET = 1.0  # Seconds the automatic palette size search may take
+AUTO_SAMPLE_SIZE = 4000  # Pixels clustered for each candidate palette size
+AUTO_SCORE_SIZE = 1000  # Pixels used to compute each silhouette score
+ASSIGN_CHUNK = 1 << 16  # Pixels compared with the centres at a time by the NumPy backend
+PROGRESS_ITERATIONS = 5  # KMeans iterations between progress reports and cancellation checks
+MAX_ITERATIONS = 300  # KMeans iteration limit, as in scikit-learn
+EXPECTED_ITERATIONS = 30  # Iterations KMeans typically needs to converge on image pixels, for progress reports
+LABEL_MAP_SIZE = 512  # Longest side of the label map drawn to show where each palette colour occurs
+
+class ExtractionCancelled(Exception):
+    """Raised by a palette extraction whose cancel event was set."""
+
+def load_image_pixels(file_path, scale=2):
+    """
+    Load an image as an RGB array, downscaled to improve processing speed.
+
+    Parameters:
+    file_path (str): Path to the image file.
+    scale (int): Factor the width and height are divided by.
+
+    Returns:
+    numpy.ndarray: Array of shape (height, width, 3) holding the RGB pixels.
+    """
+    image = Image.open(file_path)
+    image = image.resize((max(1, image.width // scale), max(1, image.height // scale)))
+    return np.array(image.convert("RGB"))
+
+def extract_palette(image, n_colours, random_state=42):
+    """
+    Extract a colour palette from an image using KMeans clustering.
+
+    Parameters:
+    image (numpy.ndarray): Array whose last axis holds RGB values.
+    n_colours (int): Number of colours in the palette.
+    random_state (int): Seed for deterministic results.
+
+    Returns:
+    numpy.ndarray: Array of shape (n_colours, 3) holding the palette colours.
+    """
+    pixels = np.asarray(image).reshape(-1, 3)
+    kmeans = KMeans(n_clusters=max(1, int(n_colours)), random_state=random_state)
+    kmeans.fit(pixels)
+    return kmeans.cluster_centers_.astype(int)
+
+def extract_palette_progressive(image, n_colours, progress=None, cancel=None, random_state=42,
+                                max_iter=MAX_ITERATIONS, return_labels=False):
+    """
+    Extract a palette like extract_palette, reporting progress and checking for cancellation every
+    PROGRESS_ITERATIONS iterations. Each step resumes KMeans from the centres of the previous one,
+    so the palette matches one uninterrupted fit to within a unit of rounding.
+
+    Parameters:
+    image (numpy.ndarray): Array whose last axis holds RGB values.
+    n_colours (int): Number of colours in the palette.
+    progress (callable): Called as progress(done, total) with the iterations run so far. Most fits
+                         converge long before max_iter, so total is an estimate that starts at
+                         EXPECTED_ITERATIONS and grows if the fit runs longer; the last call is
+                         progress(max_iter, max_iter).
+    cancel (threading.Event): Stops the extraction when set.
+    random_state (int): Seed for deterministic results.
+    max_iter (int): Iteration cap.
+    return_labels (bool): Also return the palette index the fit assigned to every pixel.
+
+    Returns:
+    numpy.ndarray: Array of shape (n_colours, 3) holding the palette colours, or a tuple
+    (palette, labels) with return_labels, labels holding one index per pixel in row-major order.
+
+    Raises:
+    ExtractionCancelled: If the cancel event is set.
+    """
+    pixels = np.asarray(image).reshape(-1, 3)
+    n_clusters = max(1, int(n_colours))
+    done = 0
+    kmeans = None
+    while done < max_iter:
+        if cancel is not None and cancel.is_set():
+            raise ExtractionCancelled()
+        steps = min(PROGRESS_ITERATIONS, max_iter - done)
+        if kmeans is None:
+            kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, max_iter=steps)
+        else:
+            kmeans = KMeans(n_clusters=n_clusters, init=kmeans.cluster_centers_, n_init=1,
+                            random_state=random_state, max_iter=steps)
+        kmeans.fit(pixels)
+        done += kmeans.n_iter_
+        if kmeans.n_iter_ < steps:
+            break  # Converged
+        if progress is not None:
+            progress(done, min(max_iter, max(EXPECTED_ITERATIONS, done + PROGRESS_ITERATIONS)))
+    if progress is not None:
+        progress(max_iter, max_iter)
+    if return_labels:
+        return kmeans.cluster_centers_.astype(int), kmeans.labels_
+    return kmeans.cluster_centers_.astype(int)
+
+def extract_weighted_palette(image, n_colours, random_state=42):
+    """
+    Extract a colour palette together with the share of the image each colour covers.
+
+    Parameters:
+    image (numpy.ndarray): Array whose last axis holds RGB values.
+    n_colours (int): Number of colours in the palette.
+    random_state (int): Seed for deterministic results.
+
+    Returns:
+    tuple: (colours, weights), an int array of shape (k, 3) and float weights summing to 1,
+    ordered from the most to the least common colour. k is smaller than n_colours when the
+    image has fewer distinct colours.
+    """
+    pixels = np.asarray(image).reshape(-1, 3)
+    distinct = len(np.unique(pixels.astype(np.int64) @ np.array([1 << 16, 1 << 8, 1])))
+    n_clusters = max(1, min(int(n_colours), distinct))
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state).fit(pixels)
+    counts = np.bincount(kmeans.labels_, minlength=n_clusters)
+    order = np.argsort(-counts, kind="stable")
+    return np.clip(kmeans.cluster_centers_[order], 0, 255).astype(int), counts[order] / counts.sum()
+
+def nearest_centroid(pixels, centres):
+    """
+    Assign every pixel to its nearest palette colour.
+
+    Parameters:
+    pixels (array-like): Array whose last axis holds RGB values.
+    centres (array-like): Array of shape (k, 3) holding the palette colours.
+
+    Returns:
+    tuple: (labels, distances), the index of the nearest centre for each pixel and the squared
+    distance to it, both flattened to one value per pixel.
+    """
+    pixels = np.ascontiguousarray(pixels, dtype=np.float64).reshape(-1, 3)
+    centres = np.ascontiguousarray(centres, dtype=np.float64).reshape(-1, 3)
+    kernels = jit_kernels()
+    if kernels is not None:
+        return kernels.nearest_centroid(pixels, centres)
+    labels = np.empty(len(pixels), dtype=np.int64)
+    distances = np.empty(len(pixels), dtype=np.float64)
+    for start in range(0, len(pixels), ASSIGN_CHUNK):
+        chunk = ((pixels[start:start + ASSIGN_CHUNK, None, :] - centres[None]) ** 2).sum(axis=-1)
+        labels[start:start + ASSIGN_CHUNK] = chunk.argmin(axis=1)
+        distances[start:start + ASSIGN_CHUNK] = chunk[np.arange(len(chunk)), labels[start:start + ASSIGN_CHUNK]]
+    return labels, distances
+
+def label_shares(labels, k):
+    """
+    Compute the share of pixels assigned to each palette colour with one counting pass.
+
+    Parameters:
+    labels (numpy.ndarray): Palette index per pixel, e.g. the labels of the fit.
+    k (int): Number of palette colours.
+
+    Returns:
+    numpy.ndarray: Float array of shape (k,) holding the shares, summing to 1.
+    """
+    counts = np.bincount(np.ravel(labels), minlength=k)
+    return counts / max(1, counts.sum())
+
+def palette_coverage(image, centres, step=1):
+    """
+    Compute the share of an image each palette colour covers, assigning every pixel to its nearest
+    colour and counting the labels in a single pass, a band of rows at a time. Use label_shares
+    instead when the fit already labelled the pixels to count; this is for other resolutions, e.g.
+    the full image when the palette was fitted on a sample.
+
+    Parameters:
+    image (numpy.ndarray): RGB array of shape (h, w, 3), or pixels of shape (n, 3).
+    centres (array-like): Array of shape (k, 3) holding the palette colours.
+    step (int): Count every step-th row and column only; 1 counts every pixel at full resolution.
+
+    Returns:
+    numpy.ndarray: Float array of shape (k,) holding the shares, summing to 1.
+    """
+    image = np.asarray(image)
+    k = len(np.asarray(centres).reshape(-1, 3))
+    if image.ndim == 2:
+        image = image[None]  # One row of pixels
+    view = image[::step, ::step]
+    counts = np.zeros(k, dtype=np.int64)
+    rows = max(1, ASSIGN_CHUNK // max(1, view.shape[1]))
+    for top in range(0, view.shape[0], rows):
+        labels, _ = nearest_centroid(view[top:top + rows], centres)
+        counts += np.bincount(labels, minlength=k)
+    return counts / max(1, counts.sum())
+
+def order_by_coverage(colours, shares):
+    """
+    Order a palette from the most to the least common colour; ties keep their order.
+
+    Returns:
+    tuple: (colours, shares) as arrays, reordered.
+    """
+    shares = np.asarray(shares)
+    order = np.argsort(-shares, kind="stable")
+    return np.asarray(colours)[order], shares[order]
+
+def label_map(image, centres, max_size=LABEL_MAP_SIZE, labels=None):
+    """
+    Assign the pixels of a downsampled image to their nearest palette colour, to show where each
+    colour occurs. Downsampling takes the nearest pixel so no blended colours are introduced.
+
+    Parameters:
+    image (numpy.ndarray): uint8 RGB array of shape (h, w, 3).
+    centres (array-like): Array of shape (k, 3) holding the palette colours.
+    max_size (int): Longest side of the map in pixels; smaller images keep their size.
+    labels (numpy.ndarray): Optional palette index of every pixel of the image, e.g. from the fit;
+                            downsampled instead of assigning the pixels again.
+
+    Returns:
+    numpy.ndarray: Integer array of shape (h', w') holding palette indices.
+    """
+    height, width = image.shape[:2]
+    scale = min(1.0, max_size / max(height, width))
+    if labels is not None:
+        rows = np.minimum((np.arange(max(1, round(height * scale))) / scale).astype(np.intp), height - 1)
+        cols = np.minimum((np.arange(max(1, round(width * scale))) / scale).astype(np.intp), width - 1)
+        return np.asarray(labels).reshape(height, width)[np.ix_(rows, cols)]
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = cv2.resize(np.ascontiguousarray(image), size, interpolation=cv2.INTER_NEAREST)
+    labels, _ = nearest_centroid(image, centres)
+    return labels.reshape(image.shape[:2])
+
+def label_map_image(labels, colours):
+    """Render a label map as an RGB image, painting every pixel with its palette colour."""
+    return Image.fromarray(np.clip(colours, 0, 255).astype(np.uint8)[labels])
+
+def _add_farthest_centre(pixels, centres):
+    """Extend a set of centres with the pixel farthest from all of them, to warm-start the next k."""
+    _, distances = nearest_centroid(pixels, centres)
+    return np.vstack([centres, pixels[np.argmax(distances)]])
+
+def auto_palette(image, k_max=10, time_budget=AUTO_TIME_BUDGET, sample_size=AUTO_SAMPLE_SIZE, random_state=42,
+                 progress=None, cancel=None, return_labels=False):
+    """
+    Extract a palette, choosing the number of colours by silhouette score within a time budget.
+
+    Candidates k = 2, 3, ... are clustered on a fixed-size pixel sample, each one warm-started from
+    the centres of the previous k plus the sampled pixel farthest from them. The search stops at
+    k_max, when the sample has no more distinct colours, or when the next candidate would overrun
+    the time budget (judged by how long the previous one took).
+
+    Parameters:
+    image (numpy.ndarray): Array whose last axis holds RGB values.
+    k_max (int): Largest number of colours to try.
+    time_budget (float): Seconds the search may take.
+    sample_size (int): Number of pixels clustered and scored per candidate.
+    random_state (int): Seed for deterministic results.
+    progress (callable): Called as progress(done, total) after each candidate.
+    cancel (threading.Event): Stops the search when set.
+    return_labels (bool): Also return the palette index the chosen fit assigned to each clustered
+                          pixel. These cover the whole image only when it has at most sample_size
+                          pixels; otherwise they cover the sample.
+
+    Returns:
+    tuple: (palette, k, score), where palette is an array of shape (k, 3) and score is the
+    silhouette score of the chosen k, or None when the image has a single colour; with
+    return_labels, (palette, k, score, labels).
+
+    Raises:
+    ExtractionCancelled: If the cancel event is set.
+    """
+    start = time.perf_counter()
+    pixels = np.asarray(image).reshape(-1, 3).astype(np.float64)
+    rng = np.random.default_rng(random_state)
+    if len(pixels) > sample_size:
+        pixels = pixels[rng.choice(len(pixels), sample_size, replace=False)]
+    distinct = len(np.unique(pixels, axis=0))
+    best = (pixels.mean(axis=0, keepdims=True), 1, None, np.zeros(len(pixels), dtype=np.intp))
+
+    centres = best[0]
+    last_duration = 0.0
+    last_k = min(k_max, distinct)  # A single colour skips the search
+    for k in range(2, last_k + 1):
+        if cancel is not None and cancel.is_set():
+            raise ExtractionCancelled()
+        if time.perf_counter() - start + last_duration > time_budget and k > 2:
+            break
+        candidate_start = time.perf_counter()
+        kmeans = KMeans(n_clusters=k, init=_add_farthest_centre(pixels, centres), n_init=1,
+                        random_state=random_state).fit(pixels)
+        centres = kmeans.cluster_centers_
+        score = silhouette_score(pixels, kmeans.labels_, sample_size=min(len(pixels), AUTO_SCORE_SIZE),
+                                 random_state=random_state)
+        if best[2] is None or score > best[2]:
+            best = (centres, k, float(score), kmeans.labels_)
+        last_duration = time.perf_counter() - candidate_start
+        if progress is not None:
+            progress(k - 1, last_k - 1)
+    result = (best[0].astype(int), best[1], best[2])
+    return result + (best[3],) if return_labels else result
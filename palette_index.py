@@ -0,0 +1,278 @@
+import argparse
+import heapq
+import json
+import os
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from colour_parser import parse_colour
+from colour_spaces import rgb_to_lab
+from palette_functions import extract_weighted_palette
+
+INDEX_MAGIC = b"PALIDX01"  # Start of every palette index data file
+HEADER_SIZE = 12  # Magic plus the palette size as a uint32
+DATA_FILE = "palettes.bin"
+PATHS_FILE = "paths.jsonl"
+PALETTE_SIZE = 5  # Colours stored per image
+THUMBNAIL_SIZE = 128  # Images are shrunk to fit this box before their palette is extracted
+WEIGHT_SCALE = 65535  # Weights are stored as uint16 fractions of this
+QUERY_CHUNK = 2048  # Candidates whose tighter lower bound is computed together during a query
+
+def record_dtype(palette_size):
+    """Return the fixed-size record stored per image: RGB colours and quantised weights."""
+    return np.dtype([("colours", np.uint8, (palette_size, 3)), ("weights", np.uint16, (palette_size,))])
+
+def image_palette(file_path, palette_size=PALETTE_SIZE):
+    """
+    Extract the weighted palette of an image file from a thumbnail.
+
+    Parameters:
+    file_path (str): Path to the image file.
+    palette_size (int): Maximum number of colours.
+
+    Returns:
+    tuple: (colours, weights) as returned by extract_weighted_palette.
+    """
+    with Image.open(file_path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        return extract_weighted_palette(np.array(image), palette_size)
+
+def projection_bounds(query_lab, query_weights, lab, weights):
+    """
+    Lower-bound the Earth Mover's Distance between a query palette and many candidate palettes.
+
+    Moving colour along one axis costs no more than moving it in full, so the 1D transport cost of
+    each of L, a and b is a lower bound, and so is their root sum of squares. Each 1D cost is the
+    area between two cumulative distributions, computed for every candidate at once.
+
+    Parameters:
+    query_lab (numpy.ndarray): Array of shape (m, 3) holding the query colours in Lab.
+    query_weights (numpy.ndarray): Array of shape (m,) holding weights summing to 1.
+    lab (numpy.ndarray): Array of shape (n, k, 3) holding the candidate colours in Lab.
+    weights (numpy.ndarray): Array of shape (n, k) holding weights summing to 1 per candidate.
+
+    Returns:
+    numpy.ndarray: Array of shape (n,) holding the lower bounds.
+    """
+    n = len(lab)
+    points = np.concatenate([np.broadcast_to(query_lab, (n,) + query_lab.shape), lab], axis=1)
+    mass = np.concatenate([np.broadcast_to(query_weights, (n, len(query_weights))), -weights], axis=1)
+    order = np.argsort(points, axis=1)
+    sorted_points = np.take_along_axis(points, order, axis=1)
+    sorted_mass = np.take_along_axis(np.broadcast_to(mass[..., None], points.shape), order, axis=1)
+    difference = np.abs(np.cumsum(sorted_mass, axis=1)[:, :-1])
+    per_axis = (difference * np.diff(sorted_points, axis=1)).sum(axis=1)
+    return np.sqrt((per_axis ** 2).sum(axis=1))
+
+def _signature(lab, weights):
+    """Build an OpenCV EMD signature (weight, L, a, b rows) from the colours with non-zero weight."""
+    used = weights > 0
+    return np.ascontiguousarray(np.column_stack([weights[used], lab[used]]), dtype=np.float32)
+
+class PaletteIndex:
+    """
+    On-disk index of weighted image palettes, searched by Earth Mover's Distance in CIE Lab.
+
+    The index is a directory holding a binary file of fixed-size records (25 bytes per image with
+    five colours) and a JSON-lines file of image paths. Both are only ever appended to, so new
+    images can be added at any time without rewriting the index.
+    """
+
+    def __init__(self, directory, palette_size=PALETTE_SIZE):
+        """
+        Open the index in a directory, creating it if it does not exist.
+
+        @param directory: Directory holding the index files.
+        @param palette_size: Colours stored per image; an existing index keeps its own size.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, DATA_FILE)
+        self.paths_path = os.path.join(directory, PATHS_FILE)
+        if os.path.exists(self.data_path) and os.path.getsize(self.data_path) >= HEADER_SIZE:
+            with open(self.data_path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            if header[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                raise ValueError(f"Not a palette index: {self.data_path}")
+            palette_size = int(np.frombuffer(header, dtype=np.uint32, offset=len(INDEX_MAGIC))[0])
+        else:
+            with open(self.data_path, "wb") as f:
+                f.write(INDEX_MAGIC + np.uint32(palette_size).tobytes())
+            open(self.paths_path, "w").close()
+        self.palette_size = palette_size
+        self.dtype = record_dtype(palette_size)
+        self.last_evaluated = 0  # Exact distances computed by the most recent query
+
+        records = np.fromfile(self.data_path, dtype=self.dtype, offset=HEADER_SIZE)
+        with open(self.paths_path) as f:
+            self.paths = [json.loads(line) for line in f if line.strip()]
+        # An interrupted append can leave one file a record ahead of the other
+        count = min(len(records), len(self.paths))
+        self.paths = self.paths[:count]
+        self._known = set(self.paths)
+        self._lab = np.empty((0, palette_size, 3), dtype=np.float32)
+        self._weights = np.empty((0, palette_size), dtype=np.float32)
+        self._means = np.empty((0, 3), dtype=np.float32)
+        self._pending = [records[:count]]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, file_path):
+        return file_path in self._known
+
+    def _encode(self, colours, weights):
+        """Pack a palette into one record, padding it with zero-weight colours."""
+        colours = np.asarray(colours, dtype=np.int64).reshape(-1, 3)
+        weights = np.asarray(weights, dtype=np.float64).reshape(-1)
+        if len(colours) != len(weights) or not 0 < len(colours) <= self.palette_size:
+            raise ValueError(f"A palette needs 1 to {self.palette_size} colours with one weight each.")
+        if colours.min() < 0 or colours.max() > 255 or weights.min() < 0 or weights.sum() <= 0:
+            raise ValueError("Invalid palette: colours must be between 0 and 255 and weights must be positive.")
+        record = np.zeros(1, dtype=self.dtype)
+        record["colours"][0, :len(colours)] = colours
+        record["weights"][0, :len(weights)] = np.rint(weights / weights.sum() * WEIGHT_SCALE)
+        return record
+
+    def add(self, file_path, colours, weights):
+        """
+        Append one image's palette to the index.
+
+        @param file_path: Path identifying the image.
+        @param colours: RGB colours of the palette.
+        @param weights: Share of the image covered by each colour.
+        """
+        self.add_records([file_path], self._encode(colours, weights))
+
+    def add_records(self, file_paths, records):
+        """Append encoded records and their paths to the index files and the in-memory arrays."""
+        with open(self.data_path, "ab") as f:
+            records.tofile(f)
+        with open(self.paths_path, "a") as f:
+            f.writelines(json.dumps(path) + "\n" for path in file_paths)
+        self.paths.extend(file_paths)
+        self._known.update(file_paths)
+        self._pending.append(records)
+
+    def add_images(self, file_paths, workers=None):
+        """
+        Extract and index the palettes of several image files, skipping images already indexed.
+
+        @param file_paths: Paths of the images.
+        @param workers: Worker processes; 0 runs in this process, None uses every core.
+        @return: Number of images added.
+        """
+        new_paths = list(dict.fromkeys(path for path in file_paths if path not in self._known))
+        if not new_paths:
+            return 0
+        sizes = [self.palette_size] * len(new_paths)
+        if workers == 0:
+            palettes = list(map(image_palette, new_paths, sizes))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                palettes = list(executor.map(image_palette, new_paths, sizes, chunksize=16))
+        records = np.concatenate([self._encode(colours, weights) for colours, weights in palettes])
+        self.add_records(new_paths, records)
+        return len(new_paths)
+
+    def _load_pending(self):
+        """Convert newly added records to Lab colours, normalised weights and weighted mean colours."""
+        if not self._pending:
+            return
+        records = np.concatenate(self._pending)
+        self._pending = []
+        if not len(records):
+            return
+        lab = rgb_to_lab(records["colours"]).astype(np.float32)
+        weights = records["weights"].astype(np.float32)
+        weights /= weights.sum(axis=1, keepdims=True)
+        self._lab = np.concatenate([self._lab, lab])
+        self._weights = np.concatenate([self._weights, weights])
+        self._means = np.concatenate([self._means, (lab * weights[..., None]).sum(axis=1)])
+
+    def query(self, colours, weights=None, top_n=10):
+        """
+        Find the indexed images whose palettes are closest to a palette.
+
+        Candidates are visited in order of the cheapest lower bound, the Lab distance between the
+        weighted mean colours. Each chunk of candidates is then filtered with the tighter
+        projection_bounds, and only the survivors get an exact Earth Mover's Distance. The search
+        stops as soon as the mean-colour bound reaches the N-th best exact distance, so most images
+        are never compared in full.
+
+        @param colours: RGB colours of the query palette.
+        @param weights: Share of each colour; equal shares by default.
+        @param top_n: Number of results.
+        @return: List of (path, distance) pairs, closest first.
+        """
+        colours = np.asarray(colours, dtype=np.float64).reshape(-1, 3)
+        weights = np.ones(len(colours)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if len(colours) == 0 or len(weights) != len(colours) or weights.min() < 0 or weights.sum() <= 0:
+            raise ValueError("A query needs at least one colour with one non-negative weight each.")
+        self._load_pending()
+        self.last_evaluated = 0
+        if not len(self.paths) or top_n <= 0:
+            return []
+
+        weights = weights / weights.sum()
+        query_lab = rgb_to_lab(colours)
+        query_signature = _signature(query_lab, weights)
+        mean_bounds = np.linalg.norm(self._means - (query_lab * weights[:, None]).sum(axis=0), axis=1)
+        order = np.argsort(mean_bounds, kind="stable")
+        best = []  # Max-heap of (-distance, -index) holding the current top N
+        for start in range(0, len(order), QUERY_CHUNK):
+            chunk = order[start:start + QUERY_CHUNK]
+            if len(best) == top_n and mean_bounds[chunk[0]] >= -best[0][0]:
+                break
+            bounds = projection_bounds(query_lab, weights, self._lab[chunk], self._weights[chunk])
+            for position in np.argsort(bounds, kind="stable"):
+                if len(best) == top_n and bounds[position] >= -best[0][0]:
+                    break
+                index = chunk[position]
+                signature = _signature(self._lab[index], self._weights[index])
+                distance = cv2.EMD(query_signature, signature, cv2.DIST_L2)[0]
+                self.last_evaluated += 1
+                if len(best) < top_n:
+                    heapq.heappush(best, (-distance, -index))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, -index))
+        return [(self.paths[-index], -distance) for distance, index in sorted(best, reverse=True)]
+
+    def query_image(self, file_path, top_n=10):
+        """
+        Find the indexed images whose palettes are closest to the palette of an image file.
+
+        @param file_path: Path to the query image.
+        @param top_n: Number of results.
+        @return: List of (path, distance) pairs, closest first.
+        """
+        colours, weights = image_palette(file_path, self.palette_size)
+        return self.query(colours, weights, top_n)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Index image palettes and search for similar images.")
+    parser.add_argument("index", help="Directory of the palette index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_parser = subparsers.add_parser("add", help="Add images to the index")
+    add_parser.add_argument("images", nargs="+")
+    add_parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = run in-process)")
+    query_parser = subparsers.add_parser("query", help="Find images with a similar palette")
+    query_parser.add_argument("--image", help="Query with the palette of this image")
+    query_parser.add_argument("--palette", nargs="+", help="Query with these colours, e.g. '#FF0000' or 'rgb(0 128 255)'")
+    query_parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    palette_index = PaletteIndex(args.index)
+    if args.command == "add":
+        print(f"Added {palette_index.add_images(args.images, args.workers)} images ({len(palette_index)} indexed)")
+    else:
+        if args.image:
+            matches = palette_index.query_image(args.image, args.top)
+        elif args.palette:
+            matches = palette_index.query([parse_colour(colour).rgb for colour in args.palette], top_n=args.top)
+        else:
+            parser.error("query needs --image or --palette")
+        for path, distance in matches:
+            print(f"{distance:8.2f}  {path}")
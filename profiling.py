@@ -0,0 +1,196 @@
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+
+PROFILE_ENV = "COLOUR_PROFILE"  # Set to 1 to start the app with profiling enabled
+SPAN_WINDOW = 512  # Most recent timings kept per span for the rolling percentiles
+_DISABLED = nullcontext()  # Shared no-op span, so a disabled profiler allocates nothing
+
+class _Span:
+    """Times one pass through a block and records it on exit."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """
+    Collects timing spans and event counters of the app's hot paths.
+
+    Spans keep their most recent timings for rolling p50/p95 figures, plus a call count and total
+    time since the last reset. Recording is thread-safe, so background jobs can time themselves
+    too. While disabled, span returns a shared no-op context and count returns at once, so
+    instrumented code pays only an attribute check.
+    """
+
+    def __init__(self, enabled=False, window=SPAN_WINDOW):
+        """
+        @param enabled: Start recording immediately.
+        @param window: Most recent timings kept per span.
+        @raise ValueError: If the window is not positive.
+        """
+        if window < 1:
+            raise ValueError(f"Invalid window: {window}. Must be at least 1.")
+        self.enabled = enabled
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every recorded timing and counter."""
+        with self.lock:
+            self.samples = {}  # Span name -> deque of the latest durations in seconds
+            self.totals = {}  # Span name -> [calls, total seconds]
+            self.counters = {}  # Counter name -> count
+            self.started = time.time()
+
+    def span(self, name):
+        """
+        Time a block of code: with profiler.span("wheel.render"): ...
+
+        @param name: Name of the span; dotted names group related spans, e.g. "tk.palette_redraw".
+        @return: A context manager that records the block's duration when enabled.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return _Span(self, name)
+
+    def timed(self, name):
+        """
+        Decorate a function so every call is recorded as a span.
+
+        @param name: Name of the span.
+        """
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def record(self, name, duration):
+        """
+        Record one duration of a span, e.g. one measured elsewhere.
+
+        @param name: Name of the span.
+        @param duration: Seconds the span took.
+        """
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+                self.totals[name] = [0, 0.0]
+            samples.append(duration)
+            totals = self.totals[name]
+            totals[0] += 1
+            totals[1] += duration
+
+    def count(self, name, amount=1):
+        """
+        Add to an event counter, e.g. frames captured; does nothing while disabled.
+
+        @param name: Name of the counter.
+        @param amount: Number of events.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def counts(self):
+        """Return a copy of the counters, in name order."""
+        with self.lock:
+            return dict(sorted(self.counters.items()))
+
+    def summary(self):
+        """
+        Summarise every span over its rolling window.
+
+        @return: Dict of span name -> {"calls", "total_ms", "p50_ms", "p95_ms", "max_ms"}, where calls
+                 and total_ms cover everything since the last reset, in name order.
+        """
+        with self.lock:
+            spans = {name: (np.array(samples), *self.totals[name]) for name, samples in self.samples.items()}
+        result = {}
+        for name in sorted(spans):
+            samples, calls, total = spans[name]
+            p50, p95 = np.percentile(samples, [50, 95]) * 1000
+            result[name] = {"calls": calls, "total_ms": round(total * 1000, 3), "p50_ms": round(float(p50), 3),
+                            "p95_ms": round(float(p95), 3), "max_ms": round(float(samples.max()) * 1000, 3)}
+        return result
+
+    def snapshot(self):
+        """
+        Copy everything recorded, for offline analysis.
+
+        @return: JSON-serialisable dict with the start time, the span summary, the raw timings in
+                 milliseconds of every span's window and the counters.
+        """
+        summary = self.summary()
+        with self.lock:
+            samples = {name: [round(value * 1000, 4) for value in self.samples[name]] for name in summary}
+        return {"started": self.started, "elapsed_s": round(time.time() - self.started, 3), "summary": summary,
+                "samples_ms": samples, "counters": self.counts()}
+
+    def dump(self, path):
+        """
+        Write a snapshot to a JSON file.
+
+        @param path: File to write.
+        """
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+def format_status(summary, counters, limit=4):
+    """
+    Format profiling figures as one status-bar line: the slowest spans by p95, then the counters.
+
+    Parameters:
+    summary (dict): Span summary from Profiler.summary.
+    counters (dict): Counters from Profiler.counts.
+    limit (int): Number of spans shown.
+
+    Returns:
+    str: e.g. "wheel.render 12.0/30.5 ms | frames.captured 120", where span figures are p50/p95.
+    """
+    slowest = sorted(summary.items(), key=lambda item: -item[1]["p95_ms"])[:limit]
+    parts = [f"{name} {figures['p50_ms']:.1f}/{figures['p95_ms']:.1f} ms" for name, figures in slowest]
+    parts += [f"{name} {value}" for name, value in sorted(counters.items())]
+    return " | ".join(parts) if parts else "Profiling: no data yet"
+
+# Profiler shared by the whole app
+profiler = Profiler(enabled=os.environ.get(PROFILE_ENV, "") not in ("", "0"))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Summarise a profiling dump written by the app.")
+    parser.add_argument("dump", help="JSON file saved with Shift+F12")
+    args = parser.parse_args()
+    with open(args.dump) as file:
+        data = json.load(file)
+    print(f"{'span':<28}{'calls':>8}{'total ms':>12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, figures in sorted(data["summary"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:<28}{figures['calls']:>8}{figures['total_ms']:>12.1f}{figures['p50_ms']:>10.2f}"
+              f"{figures['p95_ms']:>10.2f}{figures['max_ms']:>10.2f}")
+    for name, value in data["counters"].items():
+        print(f"{name:<28}{value:>8}")
@@ -0,0 +1,138 @@
+from collections import namedtuple
+import cv2
+from sklearn.cluster import KMeans
+
+TARGET_LATENCY = 0.05  # Seconds one palette update should take
+SMOOTHING = 0.3  # Weight of the newest timing in the moving average
+RAISE_MARGIN = 0.5  # Quality is raised only when updates take less than this fraction of the target
+RAISE_AFTER = 5  # ... for this many updates in a row, so the level does not oscillate
+
+# Analysis settings from best to fastest: scale applied to the analysis frame, pixels sampled for
+# clustering (None for all) and the KMeans iteration cap. Level 0 keeps the analysis frame as it is
+# and uses the KMeans defaults, like the fixed settings used before.
+QualitySettings = namedtuple("QualitySettings", ["scale", "sample_size", "max_iter"])
+QUALITY_LEVELS = (
+    QualitySettings(1.0, None, 300),
+    QualitySettings(1.0, 20000, 100),
+    QualitySettings(0.5, 10000, 50),
+    QualitySettings(0.5, 4000, 30),
+    QualitySettings(0.25, 2000, 20),
+    QualitySettings(0.25, 1000, 10),
+)
+
+class QualityController:
+    """
+    Keeps palette updates near a target latency by moving between QUALITY_LEVELS.
+
+    Timings are smoothed with an exponential moving average. Quality drops one level as soon as the
+    average exceeds the target, and rises one level only after several fast updates in a row.
+    """
+
+    def __init__(self, target_latency=TARGET_LATENCY, levels=QUALITY_LEVELS, level=0):
+        """
+        @param target_latency: Seconds one palette update should take.
+        @param levels: QualitySettings from best to fastest.
+        @param level: Index of the starting level.
+        @raise ValueError: If the target is not positive or the level is out of range.
+        """
+        if target_latency <= 0:
+            raise ValueError(f"Invalid target latency: {target_latency}. Must be positive.")
+        if not 0 <= level < len(levels):
+            raise ValueError(f"Invalid quality level: {level}. Must be between 0 and {len(levels) - 1}.")
+        self.target_latency = target_latency
+        self.levels = levels
+        self.level = level
+        self.average = None  # Smoothed seconds per update at the current level
+        self.fast_updates = 0  # Consecutive updates well under the target
+
+    @property
+    def settings(self):
+        """The QualitySettings of the current level."""
+        return self.levels[self.level]
+
+    def record(self, duration):
+        """
+        Record how long an update took and change level if needed.
+
+        @param duration: Seconds the update took.
+        @return: The (possibly new) level.
+        """
+        self.average = duration if self.average is None else SMOOTHING * duration + (1 - SMOOTHING) * self.average
+        if self.average > self.target_latency and self.level < len(self.levels) - 1:
+            self._change_level(1)
+        elif self.average < self.target_latency * RAISE_MARGIN and self.level > 0:
+            self.fast_updates += 1
+            if self.fast_updates >= RAISE_AFTER:
+                self._change_level(-1)
+        else:
+            self.fast_updates = 0
+        return self.level
+
+    def _change_level(self, step):
+        """Move by step levels and start measuring the new level afresh."""
+        self.level += step
+        self.average = None
+        self.fast_updates = 0
+
+    def report(self):
+        """
+        Describe the current quality so results can be interpreted.
+
+        @return: Dict with the level, number of levels, settings and smoothed latency in ms.
+        """
+        return {
+            "level": self.level,
+            "levels": len(self.levels),
+            **self.settings._asdict(),
+            "latency_ms": None if self.average is None else round(self.average * 1000, 1),
+        }
+
+def describe_quality(report):
+    """Format a QualityController report as a short label, e.g. "Quality 3/6: 1/2 size, 10000 px, 50 it"."""
+    sample = "all px" if report["sample_size"] is None else f"{report['sample_size']} px"
+    latency = "" if report["latency_ms"] is None else f" ({report['latency_ms']:.0f} ms)"
+    return (f"Quality {report['level'] + 1}/{report['levels']}: 1/{round(1 / report['scale'])} size, {sample}, "
+            f"{report['max_iter']} it{latency}")
+
+def prepare_pixels(frame, settings, rng):
+    """
+    Downscale an RGB frame and sample its pixels according to quality settings.
+
+    Parameters:
+    frame (numpy.ndarray): uint8 RGB frame of shape (height, width, 3).
+    settings (QualitySettings): Scale and sample size to apply.
+    rng (numpy.random.Generator): Source of the pixel sample.
+
+    Returns:
+    numpy.ndarray: Pixels of shape (n, 3).
+    """
+    if settings.scale != 1:
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * settings.scale)), max(1, int(height * settings.scale)))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    pixels = frame.reshape(-1, 3)
+    if settings.sample_size is not None and len(pixels) > settings.sample_size:
+        pixels = pixels[rng.choice(len(pixels), settings.sample_size, replace=False)]
+    return pixels
+
+def fit_palette(pixels, n_colours, settings, init=None, random_state=42):
+    """
+    Cluster pixels with the iteration cap of the quality settings.
+
+    Parameters:
+    pixels (numpy.ndarray): Pixels of shape (n, 3).
+    n_colours (int): Number of colours in the palette.
+    settings (QualitySettings): Iteration cap to apply.
+    init (numpy.ndarray): Centres to warm-start from, e.g. the previous palette; k-means++ if None.
+    random_state (int): Seed for deterministic results.
+
+    Returns:
+    numpy.ndarray: float array of shape (n_colours, 3) holding the centres.
+    """
+    n_clusters = max(1, min(int(n_colours), len(pixels)))
+    if init is None or len(init) != n_clusters:
+        kmeans = KMeans(n_clusters=n_clusters, max_iter=settings.max_iter, random_state=random_state)
+    else:
+        kmeans = KMeans(n_clusters=n_clusters, init=init, n_init=1, max_iter=settings.max_iter,
+                        random_state=random_state)
+    return kmeans.fit(pixels).cluster_centers_
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from threadpoolctl import threadpool_limits
+from palette_functions import extract_weighted_palette
+
+TILE_SAMPLE_SIZE = 4000  # Pixels clustered per region
+SWATCH_FRACTION = 0.2  # Height of the swatch strip drawn along the bottom of each region
+SWATCH_MIN_HEIGHT = 4  # Pixels
+
+# A rectangular region of an image as (top, left, bottom, right) pixel bounds, with its palette
+# ordered from the most to the least common colour and the share of the region each colour covers
+RegionPalette = namedtuple("RegionPalette", ["box", "colours", "weights"])
+
+def _edges(length, count, fractions):
+    """Pixel positions of the lines splitting a length into count parts, or at the given fractions."""
+    if fractions is None:
+        return np.linspace(0, length, count + 1).round().astype(int)
+    fractions = sorted(float(value) for value in fractions)
+    if any(not 0 < value < 1 for value in fractions):
+        raise ValueError(f"Invalid grid lines: {fractions}. Must be fractions between 0 and 1.")
+    return np.array([0] + [int(round(value * length)) for value in fractions] + [length])
+
+def grid_regions(height, width, rows=4, cols=4, row_lines=None, col_lines=None):
+    """
+    Split an image into a grid of regions, evenly or along user-placed lines.
+
+    Parameters:
+    height, width (int): Size of the image in pixels.
+    rows, cols (int): Number of rows and columns of an even grid.
+    row_lines, col_lines (list): Optional positions of the horizontal and vertical grid lines as
+                                 fractions of the height and width; they replace rows and cols.
+
+    Returns:
+    list: (top, left, bottom, right) boxes in row-major order; empty regions are left out.
+
+    Raises:
+    ValueError: If the grid has no rows or columns, or a line lies outside the image.
+    """
+    if rows < 1 or cols < 1:
+        raise ValueError(f"Invalid grid: {rows}x{cols}. Must have at least one row and column.")
+    row_edges = _edges(height, rows, row_lines)
+    col_edges = _edges(width, cols, col_lines)
+    return [(int(top), int(left), int(bottom), int(right))
+            for top, bottom in zip(row_edges, row_edges[1:]) if bottom > top
+            for left, right in zip(col_edges, col_edges[1:]) if right > left]
+
+def parse_grid(text):
+    """
+    Parse a grid size written as ROWSxCOLS, e.g. "4x4".
+
+    Raises:
+    ValueError: If the text is not two positive integers separated by x.
+    """
+    try:
+        rows, cols = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid grid: {text}. Must be ROWSxCOLS, e.g. 4x4.") from None
+    if rows < 1 or cols < 1:
+        raise ValueError(f"Invalid grid: {text}. Must have at least one row and column.")
+    return rows, cols
+
+def region_palette(image, box, n_colours, sample_size=TILE_SAMPLE_SIZE, random_state=42):
+    """
+    Extract the palette of one region. The region is a view of the image; only the sampled pixels
+    are copied out of it.
+
+    Parameters:
+    image (numpy.ndarray): RGB array of shape (h, w, 3).
+    box (tuple): (top, left, bottom, right) bounds of the region.
+    n_colours (int): Number of colours in the palette.
+    sample_size (int): Pixels clustered for the region.
+    random_state (int): Seed for deterministic results.
+
+    Returns:
+    RegionPalette: The region's palette.
+    """
+    top, left, bottom, right = box
+    tile = image[top:bottom, left:right]
+    rng = np.random.default_rng(random_state)
+    if tile.shape[0] * tile.shape[1] > sample_size:
+        pixels = tile[rng.integers(0, tile.shape[0], sample_size), rng.integers(0, tile.shape[1], sample_size)]
+    else:
+        pixels = tile.reshape(-1, 3)
+    colours, weights = extract_weighted_palette(pixels, n_colours, random_state)
+    return RegionPalette(tuple(box), colours, weights)
+
+def regional_palettes(image, regions, n_colours=5, workers=None, sample_size=TILE_SAMPLE_SIZE, random_state=42):
+    """
+    Extract the palette of every region of an image concurrently.
+
+    Regions are independent, so they are clustered on a thread pool. Every worker reads its region
+    as a view of the one decoded pixel buffer, and scikit-learn's own threads are limited to one per
+    worker so the pool does not oversubscribe the cores.
+
+    Parameters:
+    image (PIL.Image.Image or numpy.ndarray): The image; arrays must be RGB of shape (h, w, 3).
+    regions (list): (top, left, bottom, right) boxes, e.g. from grid_regions.
+    n_colours (int): Number of colours per region.
+    workers (int): Worker threads; 0 runs in this thread, None uses every core.
+    sample_size (int): Pixels clustered per region.
+    random_state (int): Seed for deterministic results; each region gets its own derived seed.
+
+    Returns:
+    list: RegionPalette per region, in the order of regions.
+    """
+    if isinstance(image, Image.Image):
+        image = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+    height, width = image.shape[:2]
+    for top, left, bottom, right in regions:
+        if not (0 <= top < bottom <= height and 0 <= left < right <= width):
+            raise ValueError(f"Invalid region: {(top, left, bottom, right)}. Must lie within the "
+                             f"{width}x{height} image.")
+    seeds = [random_state + index for index in range(len(regions))]
+    if workers == 0:
+        return [region_palette(image, box, n_colours, sample_size, seed) for box, seed in zip(regions, seeds)]
+    with threadpool_limits(limits=1), ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return list(executor.map(region_palette, [image] * len(regions), regions, [n_colours] * len(regions),
+                                 [sample_size] * len(regions), seeds))
+
+def render_region_swatches(image, results):
+    """
+    Draw each region's palette as a strip of swatches along the bottom of the region, with widths
+    proportional to the share each colour covers.
+
+    Parameters:
+    image (PIL.Image.Image or numpy.ndarray): The RGB image the palettes were extracted from.
+    results (list): RegionPalette per region.
+
+    Returns:
+    PIL.Image.Image: A copy of the image with the swatches drawn in.
+    """
+    canvas = np.array(image.convert("RGB") if isinstance(image, Image.Image) else image, dtype=np.uint8)
+    for (top, left, bottom, right), colours, weights in results:
+        strip_top = bottom - max(SWATCH_MIN_HEIGHT, int((bottom - top) * SWATCH_FRACTION))
+        edges = left + np.round(np.concatenate([[0], np.cumsum(weights)]) * (right - left)).astype(int)
+        for colour, start, stop in zip(colours, edges, edges[1:]):
+            canvas[max(top, strip_top):bottom, start:stop] = colour
+        canvas[top:bottom, [left, right - 1]] = 255  # Outline so neighbouring regions stay apart
+        canvas[[top, bottom - 1], left:right] = 255
+    return Image.fromarray(canvas)
+
+def regions_to_json(results):
+    """Convert RegionPalette results to JSON-serialisable dicts."""
+    return [{"box": list(box), "palette": np.asarray(colours).tolist(), "weights": np.round(weights, 4).tolist()}
+            for box, colours, weights in results]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Extract a palette per region of an image.")
+    parser.add_argument("image")
+    parser.add_argument("--grid", default="4x4", help="Even grid as ROWSxCOLS (default: 4x4)")
+    parser.add_argument("--row-lines", help="Horizontal grid lines as fractions of the height, e.g. 0.3,0.7")
+    parser.add_argument("--col-lines", help="Vertical grid lines as fractions of the width, e.g. 0.5")
+    parser.add_argument("--colours", type=int, default=5, help="Colours per region")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads (0 = run in this thread)")
+    parser.add_argument("--output", help="Save the image with each region's swatches drawn in")
+    parser.add_argument("--json", help="Save the regions and palettes as JSON")
+    args = parser.parse_args()
+    rows, cols = parse_grid(args.grid)
+    with Image.open(args.image) as source:
+        pixels = np.asarray(source.convert("RGB"))
+    regions = grid_regions(pixels.shape[0], pixels.shape[1], rows, cols,
+                           args.row_lines.split(",") if args.row_lines else None,
+                           args.col_lines.split(",") if args.col_lines else None)
+    results = regional_palettes(pixels, regions, args.colours, args.workers)
+    if args.output:
+        render_region_swatches(pixels, results).save(args.output)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(regions_to_json(results), file, indent=2)
+    if not args.output and not args.json:
+        print(json.dumps(regions_to_json(results)))
@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+from conversion_functions import (rgb_to_hex, hex_to_rgb, cmyk_to_rgb, rgb_to_cmyk, hsl_to_rgb, rgb_to_hsl,
+                                  hsv_to_rgb, rgb_to_hsv)
+from batch_conversions import (rgb_to_hex_batch, hex_to_rgb_batch, cmyk_to_rgb_batch, rgb_to_cmyk_batch,
+                               hsl_to_rgb_batch, rgb_to_hsl_batch, hsv_to_rgb_batch, rgb_to_hsv_batch)
+from harmony_functions import harmony_colours, harmony_colours_batch
+
+@pytest.fixture
+def rgb_sample():
+    """Random RGB values plus the greys and primaries that hit edge cases."""
+    rng = np.random.default_rng(42)
+    edges = np.array([[0, 0, 0], [255, 255, 255], [128, 128, 128], [255, 0, 0], [0, 255, 0], [0, 0, 255]])
+    return np.concatenate([edges, rng.integers(0, 256, (5000, 3))])
+
+# Batch RGB conversions must match the scalar functions exactly
+@pytest.mark.parametrize("scalar, batch", [
+    (rgb_to_hsl, rgb_to_hsl_batch),
+    (rgb_to_hsv, rgb_to_hsv_batch),
+    (rgb_to_cmyk, rgb_to_cmyk_batch),
+])
+
+def test_rgb_batch_matches_scalar(rgb_sample, scalar, batch):
+    expected = np.array([scalar(*map(int, rgb)) for rgb in rgb_sample])
+    np.testing.assert_array_equal(batch(rgb_sample), expected)
+
+@pytest.mark.parametrize("scalar, batch", [
+    (hsl_to_rgb, hsl_to_rgb_batch),
+    (hsv_to_rgb, hsv_to_rgb_batch),
+])
+
+def test_hue_batch_matches_scalar(scalar, batch):
+    rng = np.random.default_rng(7)
+    values = np.column_stack([rng.uniform(0, 360, 5000) % 360, rng.uniform(0, 100, 5000), rng.uniform(0, 100, 5000)])
+    expected = np.array([scalar(*value) for value in values.tolist()])
+    np.testing.assert_array_equal(batch(values), expected)
+
+def test_cmyk_batch_matches_scalar():
+    rng = np.random.default_rng(3)
+    values = rng.uniform(0, 1, (5000, 4))
+    expected = np.array([cmyk_to_rgb(*value) for value in values.tolist()])
+    np.testing.assert_array_equal(cmyk_to_rgb_batch(values), expected)
+
+def test_hex_batch_round_trip(rgb_sample):
+    hex_values = rgb_to_hex_batch(rgb_sample)
+    assert list(hex_values[:6]) == [rgb_to_hex(*map(int, rgb)) for rgb in rgb_sample[:6]]
+    np.testing.assert_array_equal(hex_to_rgb_batch(hex_values), rgb_sample)
+    assert tuple(hex_to_rgb_batch(["#bada55"])[0]) == hex_to_rgb("#bada55")
+
+# Tests for invalid inputs
+def test_invalid_batches():
+    with pytest.raises(ValueError):
+        rgb_to_hsl_batch([[256, 0, 0]])
+    with pytest.raises(ValueError):
+        rgb_to_hsv_batch([[255, 87.5, 0]])
+    with pytest.raises(ValueError):
+        hsv_to_rgb_batch([[360, 100, 100]])
+    with pytest.raises(ValueError):
+        cmyk_to_rgb_batch([[0, 0, 0, 1.5]])
+    with pytest.raises(ValueError):
+        hsl_to_rgb_batch([[np.nan, 50, 50]])
+    with pytest.raises(ValueError):
+        hsv_to_rgb_batch([[0, np.nan, 50]])
+    with pytest.raises(ValueError):
+        cmyk_to_rgb_batch([[0, np.nan, 0, 0]])
+    with pytest.raises(ValueError):
+        hex_to_rgb_batch(["#FFF"])
+    with pytest.raises(ValueError):
+        hex_to_rgb_batch(["#ZZZZZZ"])
+
+def test_harmony_batch_matches_scalar(rgb_sample):
+    batch = harmony_colours_batch(rgb_sample[:500], "Tetradic")
+    for rgb, colours in zip(rgb_sample[:500], batch):
+        assert [tuple(colour) for colour in colours] == harmony_colours(*map(int, rgb), "Tetradic")
+
+def test_harmony_complementary_of_red():
+    assert harmony_colours(255, 0, 0, "Complementary") == [(0, 255, 255)]
+    with pytest.raises(ValueError):
+        harmony_colours(255, 0, 0, "Monochrome")
@@ -133,3 +133,54 @@ def test_convert_color_rgb_to_cmyk(mocker):
     page.convert_color()
 
     assert page.cmyk_value.get() == '0.0, 0.66, 0.8, 0.0'
+
+def test_live_conversion_is_debounced(mocker):
+    page = ColourConverterPage(None, None)
+    mock_after = mocker.patch.object(page, 'after', return_value='after#1')
+    page.color_format.set('RGB')  # Also writes the RGB placeholder to the input
+
+    for i in range(5000):  # Typing or a harness feeding values much faster than the debounce
+        page.color_input.set(f'{i % 256}, 87, 51')
+
+    assert mock_after.call_count == 1  # One timer, however many values arrived
+    page.last_input_time -= 1  # Typing paused
+    page.run_scheduled_conversion()
+    assert page.rgb_value.get() == '135, 87, 51'  # The last value typed
+    assert page.pending_conversion is None
+
+def test_live_conversion_waits_for_pause(mocker):
+    page = ColourConverterPage(None, None)
+    mock_after = mocker.patch.object(page, 'after', return_value='after#1')
+    page.color_input.set('#FF5733')
+
+    page.run_scheduled_conversion()  # Fires while input is still recent
+
+    assert mock_after.call_count == 2  # Rescheduled for the rest of the pause
+    assert page.rgb_value.get() != '255, 87, 51'
+
+def test_only_changed_outputs_are_set(mocker):
+    page = ColourConverterPage(None, None)
+    page.color_input = StringVar(value='255, 0, 0')
+    page.color_format = StringVar(value='RGB')
+    page.convert_color()
+    spies = {name: mocker.spy(getattr(page, name), 'set')
+             for name in ('rgb_value', 'hsl_value', 'hsv_value', 'cmyk_value', 'hex_value_var')}
+
+    page.color_input.set('255, 0, 0 ')  # Same colour, so nothing changes
+    page.convert_color()
+    assert all(spy.call_count == 0 for spy in spies.values())
+
+    page.color_input.set('254, 0, 0')  # RGB and hex change; HSL, HSV and CMYK round to the same text
+    page.convert_color()
+    assert spies['rgb_value'].call_count == 1
+    assert spies['hex_value_var'].call_count == 1
+    assert spies['hsl_value'].call_count == 0
+    assert spies['hsv_value'].call_count == 0
+    assert spies['cmyk_value'].call_count == 0
+    assert page.hsl_value.get() == '0, 100, 50'
+
+def test_live_conversion_ignores_empty_input(mocker):
+    page = ColourConverterPage(None, None)
+    page.color_input = StringVar(value='')
+    page.convert_color(live=True)
+    assert page.error_label.cget("text") == ""
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from colour_correction import (EXPOSURE_LIMITS, colour_temperature, estimate_correction, apply_correction,
+                               normalise_colours, correction_lut)
+from colour_spaces import srgb_to_linear
+
+@pytest.fixture
+def warm_image():
+    """A random scene under warm light: red strong, blue weak."""
+    rng = np.random.default_rng(0)
+    return (rng.integers(0, 256, (120, 160, 3)) * np.array([1.0, 0.8, 0.55])).astype(np.uint8)
+
+def test_colour_temperature_of_known_lights():
+    assert abs(colour_temperature([1, 1, 1]) - 6504) < 10  # sRGB white is D65
+    assert colour_temperature([1, 0.7, 0.4]) < 4500  # Warm light
+    assert colour_temperature([0.7, 0.8, 1]) > 8000  # Cool light
+    assert colour_temperature([0, 0, 0]) is None
+
+def test_gray_world_balances_channel_means(warm_image):
+    correction = estimate_correction(warm_image, "gray-world", exposure=False)
+    assert correction.temperature < 4500
+    assert correction.gains[2] > 1 > correction.gains[0]
+    normalise_colours(warm_image, "gray-world", exposure=False)
+    means = srgb_to_linear(warm_image).reshape(-1, 3).mean(axis=0)
+    assert means.max() / means.min() < 1.05
+
+def test_white_patch_makes_brightest_pixels_neutral():
+    image = np.full((50, 50, 3), (60, 50, 40), dtype=np.uint8)
+    image[:5] = (250, 230, 190)  # A white wall under warm light
+    normalise_colours(image, "white-patch", exposure=False)
+    top = image[0, 0].astype(int)
+    assert top.max() - top.min() <= 2
+
+def test_exposure_normalisation(warm_image):
+    dark = (warm_image // 4).astype(np.uint8)
+    correction = estimate_correction(dark, None, exposure=True)
+    assert np.array_equal(correction.gains, np.ones(3))
+    assert correction.exposure > 1
+    bright = np.full((10, 10, 3), 250, dtype=np.uint8)
+    assert estimate_correction(bright, None).exposure == EXPOSURE_LIMITS[0]
+
+def test_correction_is_applied_in_place(warm_image):
+    correction = estimate_correction(warm_image)
+    lut = correction_lut(correction)
+    expected = lut[warm_image, 0, np.arange(3)]
+    result = apply_correction(warm_image, correction)
+    assert result is warm_image
+    np.testing.assert_array_equal(warm_image, expected)
+
+def test_correction_of_strided_views(warm_image):
+    correction = estimate_correction(warm_image)
+    expected = warm_image.copy()
+    expected[::2, ::2] = correction_lut(correction)[warm_image[::2, ::2], 0, np.arange(3)]
+    view = warm_image[::2, ::2]
+    result = apply_correction(view, correction)
+    assert result is view
+    np.testing.assert_array_equal(warm_image, expected)  # Pixels outside the view are untouched
+
+def test_estimate_samples_a_grid_of_strided_views(warm_image):
+    view = warm_image[::2, ::3]
+    correction = estimate_correction(view, sample_pixels=100)
+    np.testing.assert_array_equal(correction.gains, estimate_correction(view.copy(), sample_pixels=100).gains)
+    sample = srgb_to_linear(view[::5, ::5]).reshape(-1, 3).mean(axis=0)  # 60x54 pixels, a step of 5
+    np.testing.assert_allclose(correction.gains, sample.mean() / sample)
+
+def test_black_frame_is_left_alone():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    correction = normalise_colours(image)
+    assert correction.temperature is None and not image.any()
+
+def test_invalid_method(warm_image):
+    with pytest.raises(ValueError, match="Invalid white balance method"):
+        estimate_correction(warm_image, "retinex")
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from PIL import Image
+from colour_density import (HUE_BINS, SATURATION_BINS, hue_saturation_histogram, image_histogram, file_histogram,
+                            wheel_bins, density_overlay)
+from colour_gear import render_colour_wheel
+
+def test_histogram_counts_every_pixel_in_its_bin():
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    image[:, :5] = (255, 0, 0)  # Hue 0, full saturation
+    image[:, 5:] = (128, 128, 128)  # Grey
+    histogram = hue_saturation_histogram(image)
+    assert histogram.shape == (HUE_BINS, SATURATION_BINS)
+    assert histogram.sum() == 200
+    assert histogram[0, -1] == 50 and histogram[0, 0] == 150
+    cyan = hue_saturation_histogram(np.full((1, 1, 3), (0, 255, 255), dtype=np.uint8))
+    assert cyan[HUE_BINS // 2, -1] == 1
+
+def test_histogram_chunks_match_whole():
+    image = np.random.default_rng(0).integers(0, 256, (61, 47, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(hue_saturation_histogram(image, chunk_pixels=100), hue_saturation_histogram(image))
+    with pytest.raises(ValueError, match="Invalid image shape"):
+        hue_saturation_histogram(image[..., 0])
+
+def test_wheel_bins_follow_wheel_geometry():
+    """The wheel's own colours should land in the bins the overlay draws at their positions."""
+    wheel = render_colour_wheel(200)
+    histogram = hue_saturation_histogram(wheel)
+    bins = wheel_bins(200)
+    assert bins[0, 0] == -1 and bins[100, 100] % SATURATION_BINS == 0  # Centre is unsaturated
+    assert (histogram.ravel()[bins[bins >= 0]] > 0).mean() > 0.99
+
+def test_density_overlay_is_translucent_where_colours_are():
+    image = np.full((30, 30, 3), (255, 0, 0), dtype=np.uint8)
+    overlay = np.asarray(density_overlay(hue_saturation_histogram(image), 200))
+    assert overlay.shape == (200, 200, 4)
+    assert overlay[100, 0, 3] > 0  # The red edge of the wheel, hue 0 at full saturation
+    assert overlay[100, 199, 3] == 0  # Cyan is absent
+    assert overlay[0, 0, 3] == 0  # Outside the wheel
+    assert overlay[..., 3].max() < 255
+
+def test_file_histogram_is_cached(tmp_path):
+    path = str(tmp_path / "image.png")
+    Image.fromarray(np.full((8, 8, 3), (0, 0, 255), dtype=np.uint8)).save(path)
+    first = image_histogram(path)
+    assert image_histogram(path) is first
+    assert file_histogram.cache_info().hits >= 1
+    assert first.sum() == 64 and not first.flags.writeable
@@ -1,7 +1,10 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from colour_gear import ColourGearPage
+from colour_gear import ColourGearPage, render_colour_wheel, wheel_base, apply_wheel_value, simulated_wheel
+from cvd_simulation import simulate_cvd
+from conversion_functions import hsv_to_rgb
 import tkinter as tk
+import numpy as np
 from PIL import Image
 
 @pytest.fixture
@@ -192,3 +195,122 @@ def test_handle_selection_out_of_bounds(colour_gear_page):
     colour_gear_page.handle_selection(mock_event)
     # Ensure no changes are made to selected colour
     assert colour_gear_page.selected_colour_label.cget("text") == "Selected colour"
+
+def test_render_colour_wheel_matches_hsv():
+    """Test that the vectorised wheel matches hsv_to_rgb at the sampled pixels."""
+    wheel = render_colour_wheel(200)
+    assert wheel.shape == (200, 200, 3)
+    assert tuple(wheel[100, 199]) == hsv_to_rgb(180, 99, 100)  # Right edge of the wheel is cyan
+    assert tuple(wheel[100, 100]) == (255, 255, 255)  # Centre is fully desaturated
+    assert tuple(wheel[0, 0]) == (0, 0, 0)  # Corners lie outside the wheel
+
+def test_render_colour_wheel_cancelled():
+    """Test that a cancelled render stops and returns None."""
+    assert render_colour_wheel(517, cancelled=lambda: True) is None  # A size no other test renders
+
+def test_resize_wheel_shows_preview_then_full_resolution(colour_gear_page):
+    """Test that resizing shows a preview at the new size, then swaps in the background render."""
+    with patch("colour_gear.threading.Thread"):
+        colour_gear_page.resize_wheel(400)
+    assert colour_gear_page.size == 400
+    assert colour_gear_page.colour_wheel.size == (400, 400)
+    assert int(colour_gear_page.canvas.cget("width")) == 400
+
+    colour_gear_page.render_in_background(400, colour_gear_page.render_generation)
+    colour_gear_page.poll_render_queue()
+    assert colour_gear_page.colour_wheel.getpixel((399, 200)) == tuple(render_colour_wheel(400)[200, 399])
+    assert colour_gear_page.render_polling is False
+
+def test_stale_render_is_discarded(colour_gear_page):
+    """Test that a render superseded by a newer resize is never displayed."""
+    with patch("colour_gear.threading.Thread"):
+        colour_gear_page.resize_wheel(400)
+        stale_generation = colour_gear_page.render_generation
+        colour_gear_page.resize_wheel(200)
+    colour_gear_page.render_queue.put((stale_generation, wheel_base(400)))
+    colour_gear_page.poll_render_queue()
+    assert colour_gear_page.size == 200
+
+def test_selection_survives_resize(colour_gear_page):
+    """Test that hit-testing follows the wheel size and the selection is rescaled."""
+    colour_gear_page.handle_selection(MagicMock(x=200, y=150))
+    with patch("colour_gear.threading.Thread"):
+        colour_gear_page.resize_wheel(600)
+    assert colour_gear_page.selected_point == (400, 300)
+    colour_gear_page.handle_selection(MagicMock(x=550, y=300))
+    assert colour_gear_page.selected_point == (550, 300)
+
+def test_wheel_value_scaling_matches_hsv():
+    """Test that scaling the cached wheel matches hsv_to_rgb to within rounding at any brightness."""
+    wheel = wheel_base(200)
+    np.testing.assert_array_equal(apply_wheel_value(wheel, 100), render_colour_wheel(200))
+    dark = apply_wheel_value(wheel, 40)
+    assert tuple(dark[0, 0]) == (0, 0, 0)
+    expected = hsv_to_rgb(180, 99, 40)
+    assert max(abs(int(a) - b) for a, b in zip(dark[100, 199], expected)) <= 1
+    assert wheel_base(200) is wheel  # Hue and saturation are only computed once per size
+
+def test_value_slider_rerenders_wheel(colour_gear_page):
+    """Test that moving the brightness slider darkens the wheel and updates the selection."""
+    colour_gear_page.handle_selection(MagicMock(x=200, y=150))
+    colour_gear_page.on_value_change("50")
+    assert colour_gear_page.value.get() == 50
+    assert max(colour_gear_page.colour_wheel.getpixel((150, 150))) <= 128
+    assert colour_gear_page.selected_colour_label.cget("bg") == '#{:02x}{:02x}{:02x}'.format(
+        *colour_gear_page.colour_wheel.getpixel((200, 150)))
+
+def test_value_slider_keeps_preview_off_full_render(colour_gear_page):
+    """Test that moving the slider while the low-resolution preview shows does not render the full wheel."""
+    colour_gear_page.wheel_is_preview = True
+    with patch("colour_gear.wheel_base", wraps=wheel_base) as mock_base:
+        colour_gear_page.on_value_change("50")
+    assert all(call.args[0] < colour_gear_page.size for call in mock_base.call_args_list)
+    assert colour_gear_page.colour_wheel.size == (colour_gear_page.size, colour_gear_page.size)
+    assert max(colour_gear_page.colour_wheel.getpixel((150, 150))) <= 128
+
+def test_gradient_preview_follows_selection(colour_gear_page):
+    """Test that selecting a colour renders a gradient through it and its harmony colours."""
+    colour_gear_page.update_harmony("Triadic")
+    colour_gear_page.handle_selection(MagicMock(x=200, y=150))
+    assert len(colour_gear_page.gradient_colours) == 3
+    assert colour_gear_page.gradient_colours[0] == colour_gear_page.colour_wheel.getpixel((200, 150))
+    assert colour_gear_page.gradient_label.cget("image")
+
+    colour_gear_page.gradient_space.set("HSV")
+    colour_gear_page.refresh_gradient_preview()
+    assert colour_gear_page.gradient_label.cget("image")
+
+def test_simulated_wheel_is_cached():
+    """Test that the simulated wheel matches simulating the rendered wheel and is computed once."""
+    wheel = simulated_wheel(200, 100, "deuteranopia", 60)
+    np.testing.assert_array_equal(wheel, simulate_cvd(render_colour_wheel(200), "deuteranopia", 0.6))
+    assert simulated_wheel(200, 100, "deuteranopia", 60) is wheel
+
+def test_vision_simulation_keeps_real_colours(colour_gear_page):
+    """Test that the wheel is shown as simulated while picked colours stay the real wheel colours."""
+    colour_gear_page.cvd_type.set("Protanopia")
+    with patch.object(colour_gear_page.colour_wheel_tk, "paste") as mock_paste:
+        colour_gear_page.refresh_wheel_display()
+    shown = np.asarray(mock_paste.call_args[0][0])
+    np.testing.assert_array_equal(shown, simulated_wheel(colour_gear_page.size, 100, "protanopia", 100))
+    colour_gear_page.handle_selection(MagicMock(x=200, y=150))
+    assert colour_gear_page.selected_colour_label.cget("bg") == '#{:02x}{:02x}{:02x}'.format(
+        *render_colour_wheel(colour_gear_page.size)[150, 200])
+
+def test_density_overlay_follows_wheel_size(colour_gear_page):
+    """Test that an image density is drawn as a single canvas image over the wheel and follows resizes."""
+    histogram = np.zeros((128, 32), dtype=np.int64)
+    histogram[0, -1] = 100
+    items_before = len(colour_gear_page.canvas.find_all())
+    colour_gear_page.show_density(histogram, "photo.jpg")
+    assert len(colour_gear_page.canvas.find_all()) == items_before + 1
+    assert colour_gear_page.density_check.cget("text") == "Image density: photo.jpg"
+
+    with patch("colour_gear.threading.Thread"):
+        colour_gear_page.resize_wheel(400)
+    assert set(colour_gear_page.density_overlays) == {300, 400}
+    assert colour_gear_page.canvas.coords(colour_gear_page.density_item) == [200.0, 200.0]
+
+    colour_gear_page.show_density_overlay.set(False)
+    colour_gear_page.update_density_overlay()
+    assert colour_gear_page.density_item is None
@@ -3,8 +3,10 @@ from unittest import mock
 import tkinter as tk
 from PIL import Image
 import numpy as np
-from colour_grab import ColourGrabPage
-from sklearn.cluster import KMeans
+import cv2
+from colour_grab import ColourGrabPage, CAPTURE_WIDTH, CAPTURE_HEIGHT, CAPTURE_FPS, ANALYSIS_SCALE
+from cvd_simulation import simulate_cvd
+from palette_index import PaletteIndex
 
 @pytest.fixture(scope="session")
 def tkinter_root():
@@ -81,6 +83,8 @@ def test_image_submit_valid(setup_colour_grab_page, mocker):
     mocker.patch("PIL.ImageTk.PhotoImage")
 
     page.imageSubmit()
+    page.palette_thread.join(timeout=10)  # The palette is extracted in the background
+    page.poll_palette_queue()
 
     # Ensure that the image is processed and the palette is displayed
     mock_open.assert_called_once_with("test_image.png")
@@ -170,39 +174,38 @@ def test_webcam_submit_failed_frame(setup_colour_grab_page, mocker):
     assert page.error_label.cget("text") == "Failed to capture image from webcam."
 
 def test_colour_extraction(setup_colour_grab_page, mocker):
-    """Test the colour extraction logic."""
+    """Test that a palette job clusters into the selected number of colours and displays them."""
     page = setup_colour_grab_page
-
-    # Create a mock image with random pixels (it doesn't affect the result)
+    mocker.patch.object(page, "after")
+    mock_display = mocker.patch.object(page, "display_colour_palette")
     mock_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
+    palette = np.random.randint(0, 255, (page.num_colours.get(), 3))
+    labels = np.random.randint(0, len(palette), 100 * 100)
+    mock_extract = mocker.patch("colour_grab.extract_palette_progressive", return_value=(palette, labels))
 
-    # Mock the KMeans instance with cluster_centers_ set to return 5 colors
-    mock_kmeans_instance = mocker.Mock()
-    # Set 5 random colors to simulate the KMeans result
-    mock_kmeans_instance.cluster_centers_ = np.random.randint(0, 255, (page.num_colours.get(), 3), dtype=np.uint8)
-
-    # Patch the KMeans class as it's imported in colour_grab.py
-    mock_kmeans = mocker.patch("colour_grab.KMeans", return_value=mock_kmeans_instance)
-
-    # Call the extract_colour_palette method to test it
-    colours = page.extract_colour_palette(mock_image)
-
-    # Assert that KMeans fit was called
-    mock_kmeans_instance.fit.assert_called_once()
+    page.start_palette_job(mock_image)
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
 
-    # Assert the correct number of colours were returned (should match page.num_colours.get())
-    assert len(colours) == page.num_colours.get()
+    mock_extract.assert_called_once()
+    assert mock_extract.call_args[0][1] == page.num_colours.get()
+    assert len(mock_display.call_args[0][0]) == page.num_colours.get()
+    assert mock_display.call_args[0][1].tolist() == pytest.approx(np.bincount(labels) / len(labels))
 
 def test_colour_extraction_failure(setup_colour_grab_page, mocker):
     """Test KMeans failure during colour extraction."""
     page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    mock_display = mocker.patch.object(page, "display_colour_palette")
     mock_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
-    mock_kmeans = mocker.patch("sklearn.cluster.KMeans.fit", side_effect=Exception("Clustering error"))
+    mocker.patch("sklearn.cluster.KMeans.fit", side_effect=Exception("Clustering error"))
 
-    colours = page.extract_colour_palette(mock_image)
+    page.start_palette_job(mock_image)
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
 
     assert page.error_label.cget("text") == "Error during colour extraction: Clustering error"
-    assert colours == []  # Ensure no colours are returned in case of error
+    mock_display.assert_not_called()  # No palette is shown in case of error
 
 def test_display_palette(setup_colour_grab_page, mocker):
     """Test that the colour palette is displayed correctly."""
@@ -231,3 +234,327 @@ def test_copy_to_clipboard(setup_colour_grab_page, mocker):
 
     # Assert that the error label reflects the correct copied message
     assert page.error_label.cget("text") == f"Copied {hex_code} to clipboard!"
+
+def test_capture_negotiation(setup_colour_grab_page, mocker):
+    """Test that the webcam is asked for the capture resolution and frame rate."""
+    page = setup_colour_grab_page
+    mock_capture = mocker.patch("cv2.VideoCapture")
+    mock_capture.return_value.isOpened.return_value = True
+    mocker.patch.object(page, 'update_frame')
+
+    page.mode.set("Webcam")
+    page.switch_mode()
+
+    mock_capture.return_value.set.assert_any_call(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_WIDTH)
+    mock_capture.return_value.set.assert_any_call(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_HEIGHT)
+    mock_capture.return_value.set.assert_any_call(cv2.CAP_PROP_FPS, CAPTURE_FPS)
+
+def test_update_frame_reuses_buffers(setup_colour_grab_page, mocker):
+    """Test that preview frames are resized into preallocated buffers that are reused."""
+    page = setup_colour_grab_page
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # Blue in BGR
+    page.cap = mock.Mock()
+    page.cap.read.return_value = (True, frame)
+    page.mode.set("Webcam")
+    mocker.patch.object(page, "after")
+
+    page.update_frame()
+    preview = page.frame_buffers["preview_rgb"]
+    assert preview.shape == (page.canvas_height, page.canvas_width, 3)
+    assert tuple(preview[0, 0]) == (0, 0, 255)
+
+    page.update_frame()
+    assert page.frame_buffers["preview_rgb"] is preview
+    page.cap.read.assert_called_with(frame)  # Later reads fill the same capture buffer
+
+def test_webcam_submit_analyses_last_preview_frame(setup_colour_grab_page, mocker):
+    """Test that the analysis frame is downscaled from the frame already captured for the preview."""
+    page = setup_colour_grab_page
+    page.cap = mock.Mock()
+    page.last_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    mock_job = mocker.patch.object(page, "start_palette_job")
+
+    page.webcamSubmit()
+
+    page.cap.read.assert_not_called()
+    assert mock_job.call_args[0][0].shape == (480 // ANALYSIS_SCALE, 640 // ANALYSIS_SCALE, 3)
+    assert mock_job.call_args[1] == {"adaptive": True}
+
+def test_video_mode_widgets(setup_colour_grab_page):
+    """Test that video mode reuses the path entry and shows the video controls."""
+    page = setup_colour_grab_page
+    page.mode.set("Video")
+    page.switch_mode()
+    page.update_idletasks()
+
+    assert page.image_path_label.cget("text") == "Video Path:"
+    assert page.video_submit_button.winfo_manager() == "grid"
+    assert page.export_json_button.winfo_manager() == "grid"
+    assert not page.image_submit_button.winfo_manager()
+
+    page.mode.set("Image")
+    page.switch_mode()
+    assert page.image_path_label.cget("text") == "Image Path:"
+    assert not page.video_submit_button.winfo_manager()
+
+def test_video_submit_shows_timeline(setup_colour_grab_page, mocker):
+    """Test that a finished video job draws the timeline and clicking a scene shows its palette."""
+    page = setup_colour_grab_page
+    timeline = {"video": "film.mp4", "fps": 25.0, "duration": 10.0, "scenes": [
+        {"start": 0.0, "end": 4.0, "palette": [[255, 0, 0]]},
+        {"start": 4.0, "end": 10.0, "palette": [[0, 0, 255]]},
+    ]}
+    mocker.patch("colour_grab.process_video", return_value=timeline)
+    mocker.patch.object(page, "after")
+    mock_display = mocker.patch.object(page, "display_colour_palette")
+    page.mode.set("Video")
+    page.switch_mode()
+    page.file_path.set("film.mp4")
+
+    page.videoSubmit()
+    page.video_queue.put(page.video_queue.get(timeout=5))  # Wait for the worker thread
+    page.poll_video_queue()
+
+    assert page.timeline is timeline
+    mock_display.assert_called_with([[255, 0, 0]])
+    page.on_timeline_click(mock.Mock(x=page.canvas_width * 3 // 4))
+    mock_display.assert_called_with([[0, 0, 255]])
+
+def test_stale_video_result_ignored(setup_colour_grab_page, mocker):
+    """Test that the result of an abandoned video job is not shown."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    page.video_generation = 2
+    page.video_queue.put((1, {"duration": 1.0, "scenes": []}, None))
+
+    page.poll_video_queue()
+
+    assert page.timeline is None
+
+def test_auto_colour_count(setup_colour_grab_page, mocker):
+    """Test that the Auto option chooses the number of colours and shows it next to the palette."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    page.auto_colours.set(True)
+    image = np.zeros((20, 20, 3), dtype=np.uint8)
+    image[:10] = (255, 0, 0)
+    image[10:, :10] = (0, 0, 255)
+
+    page.start_palette_job(image)
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
+
+    assert len(page.displayed_palette) == 3
+    assert page.auto_result_label.cget("text") == "Auto: 3 colours (silhouette 1.00)"
+    page.auto_colours.set(False)
+
+def test_export_image_channels(setup_colour_grab_page, mocker, tmp_path):
+    """Test that the image's channels are exported in the selected colour space."""
+    page = setup_colour_grab_page
+    Image.new("RGB", (8, 6), (255, 0, 0)).save(tmp_path / "red.png")
+    page.file_path.set(str(tmp_path / "red.png"))
+    page.channel_space.set("CMYK")
+    mocker.patch("colour_grab.filedialog.asksaveasfilename", return_value=str(tmp_path / "out.png"))
+    mocker.patch.object(page, "after")
+
+    page.export_image_channels()
+    page.export_thread.join(timeout=10)
+    page.poll_export_queue()
+
+    assert sorted(path.name for path in tmp_path.glob("out_*.png")) == ["out_C.png", "out_K.png", "out_M.png",
+                                                                         "out_Y.png"]
+    assert Image.open(tmp_path / "out_M.png").getpixel((0, 0)) == 255
+    assert page.error_label.cget("text").startswith("Saved out_")
+    assert str(page.export_channels_button.cget("state")) == tk.NORMAL
+
+def test_palette_job_reports_progress(setup_colour_grab_page, mocker):
+    """Test that a background palette job reports progress and only hands the final palette to Tk."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    mock_display = mocker.patch.object(page, "display_colour_palette")
+    image = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+
+    page.start_palette_job(image)
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
+
+    mock_display.assert_called_once()
+    assert len(mock_display.call_args[0][0]) == page.num_colours.get()
+    assert page.palette_progress.cget("value") == 1.0
+    assert page.palette_cancel is None
+    assert str(page.cancel_palette_button.cget("state")) == tk.DISABLED
+
+def test_adaptive_palette_job_records_latency(setup_colour_grab_page, mocker):
+    """Test that adaptive palette jobs report their latency to the quality controller."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    mocker.patch.object(page, "display_colour_palette")
+    mock_record = mocker.patch.object(page.quality_controller, "record")
+    image = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+
+    page.start_palette_job(image, adaptive=True)
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
+
+    assert mock_record.call_args[0][0] > 0
+    assert page.quality_label.cget("text").startswith("Quality ")
+
+def test_palette_job_sizes_swatches_by_coverage(setup_colour_grab_page, mocker):
+    """Test that image palettes are ordered and sized by coverage, with a colour map of the image."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    image = np.zeros((60, 80, 3), dtype=np.uint8)
+    image[:, :20] = (255, 0, 0)
+    page.num_colours.set(2)
+
+    page.start_palette_job(image)
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
+
+    assert page.displayed_palette.tolist() == [[0, 0, 0], [255, 0, 0]]
+    assert page.displayed_shares.tolist() == pytest.approx([0.75, 0.25])
+    rects = [item for item in page.palette_canvas.find_all() if page.palette_canvas.type(item) == "rectangle"]
+    assert page.palette_canvas.coords(rects[0])[2] == page.canvas_width * 0.75
+    assert page.colour_map.size == (80, 60)
+    assert str(page.colour_map_button.cget("state")) == tk.NORMAL
+
+def test_palette_job_cancel_and_supersede(setup_colour_grab_page, mocker):
+    """Test that cancelled and superseded palette jobs never reach the canvas."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    mock_display = mocker.patch.object(page, "display_colour_palette")
+    image = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+
+    page.start_palette_job(image)
+    first_cancel = page.palette_cancel
+    page.cancel_palette_job()
+    assert first_cancel.is_set()
+    assert page.error_label.cget("text") == "Palette extraction cancelled."
+
+    page.start_palette_job(image)
+    stale_generation = page.palette_generation
+    page.start_palette_job(np.zeros((10, 10, 3), dtype=np.uint8))
+    page.palette_queue.put(("done", stale_generation, (np.ones((5, 3), dtype=int), None, None), None, None))
+    page.palette_thread.join(timeout=10)
+    page.poll_palette_queue()
+
+    mock_display.assert_called_once()
+    assert np.array_equal(mock_display.call_args[0][0], np.zeros((len(mock_display.call_args[0][0]), 3)))
+
+def test_live_palette_toggle(setup_colour_grab_page, mocker):
+    """Test that the live palette hands frames to the worker and shows the palettes it sends back."""
+    page = setup_colour_grab_page
+    mock_live = mocker.patch("colour_grab.LivePalette")
+    mock_live.return_value.shape = (240, 320, 3)
+    report = {"level": 1, "levels": 6, "scale": 1.0, "sample_size": 20000, "max_iter": 100, "latency_ms": 42.0}
+    mock_live.return_value.latest_palette.return_value = (3, np.array([[255, 0, 0], [0, 0, 255]]), report)
+    mock_display = mocker.patch.object(page, "display_colour_palette")
+    page.cap = mock.Mock()
+
+    page.live_analysis.set(True)
+    page.toggle_live_palette()
+    mock_live.return_value.start.assert_called_once()
+    page.update_live_palette(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    assert mock_live.return_value.push.call_args[0][0].shape == (240, 320, 3)
+    assert mock_display.call_args[0][0].tolist() == [[255, 0, 0], [0, 0, 255]]
+    assert page.quality_label.cget("text") == "Quality 2/6: 1/1 size, 20000 px, 100 it (42 ms)"
+    page.live_analysis.set(False)
+    page.toggle_live_palette()
+    mock_live.return_value.stop.assert_called_once()
+    assert page.live_palette is None
+    page.cap = None
+
+def test_palette_vision_simulation(setup_colour_grab_page):
+    """Test that the palette can be previewed with a colour vision deficiency, keeping the real hex codes."""
+    page = setup_colour_grab_page
+    page.display_colour_palette(np.array([[255, 0, 0], [0, 128, 0]]))
+    page.palette_vision.set("Deuteranopia")
+    page.redraw_palette()
+
+    items = page.palette_canvas.find_all()
+    rects = [item for item in items if page.palette_canvas.type(item) == "rectangle"]
+    texts = [item for item in items if page.palette_canvas.type(item) == "text"]
+    simulated = simulate_cvd(np.array([[255, 0, 0]]), "deuteranopia")[0]
+    assert page.palette_canvas.itemcget(rects[0], "fill") == '#{:02x}{:02x}{:02x}'.format(*simulated)
+    assert page.palette_canvas.itemcget(texts[0], "text") == "#ff0000"
+
+def test_preview_vision_simulation(setup_colour_grab_page, mocker):
+    """Test that the image preview is redrawn with the selected colour vision deficiency."""
+    page = setup_colour_grab_page
+    mock_photo = mocker.patch("colour_grab.ImageTk.PhotoImage")
+    page.show_preview(Image.new("RGB", (4, 4), (255, 0, 0)))
+    assert mock_photo.call_args[1]["image"].getpixel((0, 0)) == (255, 0, 0)
+
+    page.palette_vision.set("Deuteranopia")
+    page.redraw_vision()
+    simulated = simulate_cvd(np.array([[255, 0, 0]]), "deuteranopia")[0]
+    assert mock_photo.call_args[1]["image"].getpixel((0, 0)) == tuple(int(value) for value in simulated)
+    assert page.displayed_preview.getpixel((0, 0)) == (255, 0, 0)  # The real image is kept for redraws
+    page.palette_vision.set("Normal")
+
+def test_white_balance_before_clustering(setup_colour_grab_page, mocker):
+    """Test that the selected white balance corrects webcam frames in place and shows the light's temperature."""
+    page = setup_colour_grab_page
+    page.cap = mock.Mock()
+    page.last_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    page.last_frame[:] = (40, 80, 160)  # BGR: warm light on a grey scene
+    mock_job = mocker.patch.object(page, "start_palette_job")
+    page.white_balance.set("Gray world")
+
+    page.webcamSubmit()
+
+    analysed = mock_job.call_args[0][0]
+    assert np.ptp(analysed[0, 0].astype(int)) <= 1  # Neutral after balancing
+    assert page.temperature_label.cget("text").startswith("Light: about ")
+
+def test_show_image_on_wheel(setup_colour_grab_page, tmp_path):
+    """Test that the image's hue/saturation histogram is handed to the Colour Gear page."""
+    page = setup_colour_grab_page
+    path = str(tmp_path / "red.png")
+    Image.new("RGB", (10, 10), (255, 0, 0)).save(path)
+    page.file_path.set(path)
+    page.controller = mock.MagicMock()
+
+    page.show_image_on_wheel()
+
+    page.controller.show_frame.assert_called_once_with("Colour Gear")
+    histogram, name = page.controller.frames["Colour Gear"].show_density.call_args[0]
+    assert histogram.sum() == 100 and name == "red.png"
+
+def test_region_submit_draws_swatches(setup_colour_grab_page, mocker, tmp_path):
+    """Test that regional palettes are extracted in the background and drawn over the image preview."""
+    page = setup_colour_grab_page
+    path = str(tmp_path / "quadrants.png")
+    image = np.zeros((80, 120, 3), dtype=np.uint8)
+    image[:, 60:] = (0, 0, 255)
+    Image.fromarray(image).save(path)
+    mocker.patch.object(page, "after")
+    page.file_path.set(path)
+    page.region_grid.set("2x2")
+
+    page.regionSubmit()
+    page.region_queue.put(page.region_queue.get(timeout=10))  # Wait for the worker thread
+    page.poll_region_queue()
+
+    assert len(page.region_results) == 4
+    assert page.region_results[1].colours[0].tolist() == [0, 0, 255]
+    assert page.webcam_canvas.find_all()
+    assert str(page.region_button.cget("state")) == tk.NORMAL
+
+def test_find_similar_queries_displayed_palette(setup_colour_grab_page, mocker, tmp_path):
+    """Test that Find Similar searches the palette index with the displayed palette and its coverage."""
+    page = setup_colour_grab_page
+    mocker.patch.object(page, "after")
+    page.palette_index = PaletteIndex(str(tmp_path))
+    page.palette_index.add("red.png", [[255, 0, 0], [0, 0, 0]], [0.8, 0.2])
+    page.palette_index.add("blue.png", [[0, 0, 255]], [1.0])
+    page.display_colour_palette(np.array([[0, 0, 0], [250, 0, 0]]), np.array([0.3, 0.7]))
+
+    page.find_similar_images()
+    page.similar_thread.join(timeout=10)
+    page.poll_similar_queue()
+
+    assert page.similar_label.cget("text").splitlines()[0].endswith("red.png")
+    assert str(page.find_similar_button.cget("state")) == tk.NORMAL
@@ -0,0 +1,94 @@
+import pytest
+from colour_parser import NAMED_COLOURS, parse_colour, parse_colours, scan_css, parse_design_tokens
+
+@pytest.mark.parametrize("text, rgb, alpha, syntax", [
+    ("#FF5733", (255, 87, 51), 1.0, "hex"),
+    ("#abc", (170, 187, 204), 1.0, "hex"),
+    ("#11223380", (17, 34, 51), 128 / 255, "hex"),
+    ("RebeccaPurple", (102, 51, 153), 1.0, "named"),
+    ("transparent", (0, 0, 0), 0.0, "named"),
+    ("rgb(255 87 51)", (255, 87, 51), 1.0, "rgb"),
+    ("rgba(255, 0, 0, 0.5)", (255, 0, 0), 0.5, "rgb"),
+    ("rgb(100% 0% 0% / 25%)", (255, 0, 0), 0.25, "rgb"),
+    ("hsl(120deg 100% 50%)", (0, 255, 0), 1.0, "hsl"),
+    ("hsl(0.5turn, 100%, 50%)", (0, 255, 255), 1.0, "hsl"),
+    ("hsla(360, 100%, 50%, 1)", (255, 0, 0), 1.0, "hsl"),
+    ("hsb(240 100% 100%)", (0, 0, 255), 1.0, "hsv"),
+    ("device-cmyk(0 1 1 0)", (255, 0, 0), 1.0, "cmyk"),
+])
+
+def test_syntaxes_are_detected(text, rgb, alpha, syntax):
+    colour = parse_colour(text)
+    assert colour.rgb == rgb
+    assert colour.alpha == pytest.approx(alpha)
+    assert colour.syntax == syntax
+
+def test_bare_lists_follow_the_hint():
+    assert parse_colour("255, 87, 51").rgb == (255, 87, 51)
+    assert parse_colour("FF5733", "HEX").rgb == (255, 87, 51)
+    assert parse_colour("0.0, 0.66, 0.8, 0.0", "CMYK").rgb == (255, 87, 51)
+    assert parse_colour("360, 100, 50", "HSL").rgb == (255, 0, 0)
+    # Explicit syntaxes win over the hint
+    assert parse_colour("#FF5733", "HSV").rgb == (255, 87, 51)
+
+@pytest.mark.parametrize("text, hint, message", [
+    ("255, 87", "RGB", "RGB input must have 3 values"),
+    ("300, 0, 0", "RGB", "Invalid RGB value"),
+    ("#12", None, "Invalid hex color"),
+    ("rgb(1, 2)", None, r"rgb\(\) takes 3 values"),
+    ("foo(1, 2, 3)", None, "Unknown colour function"),
+    ("rgb(1 2 3 / 2)", None, "Invalid alpha value"),
+    ("1, 2, 3", "XYZ", "Invalid input format"),
+    ("rgb(1e999, 0, 0)", None, "Invalid number"),
+])
+
+def test_invalid_colours_raise(text, hint, message):
+    with pytest.raises(ValueError, match=message):
+        parse_colour(text, hint)
+
+def test_named_colours_are_complete():
+    assert len(NAMED_COLOURS) == 148
+    assert parse_colour("grey").rgb == parse_colour("gray").rgb == (128, 128, 128)
+
+def test_parse_colours_reports_each_failure():
+    colours, errors = parse_colours(["#FF0000", "nope", "hsl(120 100% 50%)", "#1234567"])
+    assert [colour and colour.rgb for colour in colours] == [(255, 0, 0), None, (0, 255, 0), None]
+    assert [index for index, _ in errors] == [1, 3]
+
+def test_scan_css_reports_positions():
+    css = ("a { color: #FF0000; background: linear-gradient(rgb(0 0 255), white); }\n"
+           ".red-box {\n  border: 1px solid #12;\n  fill: hsl(400 50% 50%);\n}\n")
+    colours, errors = scan_css(css)
+    assert [(line, column, token) for line, column, token, _ in colours] == [
+        (1, 12, "#FF0000"), (1, 49, "rgb(0 0 255)"), (1, 63, "white"), (4, 9, "hsl(400 50% 50%)")]
+    assert colours[-1][3].rgb == parse_colour("hsl(40 50% 50%)").rgb  # Hue wraps
+    assert [(line, column, token) for line, column, token, _ in errors] == [(3, 21, "#12")]
+
+def test_scan_css_skips_selectors():
+    css = ("a:hover > .btn, #bad { color: blue }\n"
+           "nav:hover #main { color: red; }\n"
+           "@media (min-width: 600px) { .card { border: 1px solid #ABC; &:focus #fed { fill: teal } } }\n")
+    colours, errors = scan_css(css)
+    assert [(line, token) for line, _, token, _ in colours] == [(1, "blue"), (2, "red"), (3, "#ABC"), (3, "teal")]
+    assert errors == []
+
+def test_overflowing_numbers_are_reported_per_item():
+    colours, errors = parse_colours(["rgb(1e999, 0, 0)", "#00FF00", "hsl(1e999 50% 50%)"])
+    assert [colour and colour.rgb for colour in colours] == [None, (0, 255, 0), None]
+    assert [index for index, _ in errors] == [0, 2]
+    colours, errors = scan_css("a { color: rgb(1e999 0 0); fill: red; }")
+    assert [token for _, _, token, _ in colours] == ["red"]
+    assert [token for _, _, token, _ in errors] == ["rgb(1e999 0 0)"]
+
+def test_design_tokens_are_strict_only_for_colour_types():
+    tokens = {
+        "color": {"$type": "color", "primary": {"$value": "#FF5733"}, "broken": {"$value": "#12"}},
+        "font": {"family": {"$value": "Arial"}, "accent": "teal"},
+        "spacing": {"sm": "4, 8, 12", "gap": "#gap"},
+        "raw": {"$type": "color", "$value": "255, 87, 51"},
+    }
+    colours, errors = parse_design_tokens(tokens)
+    assert [(path, colour.rgb) for path, colour in colours] == [("color.primary.$value", (255, 87, 51)),
+                                                                 ("font.accent", (0, 128, 128)),
+                                                                 ("raw.$value", (255, 87, 51))]
+    assert [path for path, _ in errors] == ["color.broken.$value"]
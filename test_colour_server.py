@@ -0,0 +1,88 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from colour_server import ColourServer
+from load_generator import run_load, send_request, percentile
+
+def run_with_server(scenario, window=0.01):
+    """Start a server on a free port, run the scenario coroutine against it and shut it down."""
+    async def runner():
+        server = ColourServer(port=0, window=window, executor=ThreadPoolExecutor(max_workers=1))
+        port = await server.start()
+        try:
+            return await scenario(server, port)
+        finally:
+            await server.close()
+            server.executor.shutdown()
+    return asyncio.run(runner())
+
+async def post(port, path, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        return await send_request(reader, writer, "127.0.0.1", path, payload)
+    finally:
+        writer.close()
+
+def test_concurrent_conversions_are_coalesced():
+    async def scenario(server, port):
+        values = [[255, 0, 0], [0, 255, 0], [0, 0, 255], [128, 0, 128]]
+        responses = await asyncio.gather(*(post(port, "/convert/rgb_to_hsl", {"value": v}) for v in values))
+        return server.coalescers["rgb_to_hsl"].batches_run, responses
+
+    batches, responses = run_with_server(scenario)
+    assert batches == 1
+    assert [response["result"] for _, response in responses] == [[0, 100, 50], [120, 100, 50], [240, 100, 50],
+                                                                  [300, 100, 25]]
+
+def test_invalid_value_only_fails_its_own_request():
+    async def scenario(server, port):
+        return await asyncio.gather(post(port, "/convert/rgb_to_hex", {"value": [255, 87, 51]}),
+                                    post(port, "/convert/rgb_to_hex", {"value": [256, 0, 0]}))
+
+    (ok_status, ok), (bad_status, bad) = run_with_server(scenario)
+    assert ok_status == 200 and ok["result"] == "#FF5733"
+    assert bad_status == 400 and "error" in bad
+
+def test_nan_values_are_rejected():
+    async def scenario(server, port):
+        return await asyncio.gather(post(port, "/convert/hsl_to_rgb", {"value": [float("nan"), 50, 50]}),
+                                    post(port, "/convert/cmyk_to_rgb", {"value": [0, 0, float("nan"), 0]}))
+
+    for status, response in run_with_server(scenario):
+        assert status == 400 and "error" in response
+
+def test_harmony_and_palette_endpoints():
+    async def scenario(server, port):
+        harmony = await post(port, "/harmony", {"rgb": [255, 0, 0], "harmony": "Triadic"})
+        pixels = [[255, 0, 0]] * 50 + [[0, 0, 255]] * 50
+        palette = await post(port, "/palette", {"pixels": pixels, "n_colours": 2})
+        missing = await post(port, "/unknown", {})
+        return harmony, palette, missing
+
+    harmony, palette, missing = run_with_server(scenario)
+    assert harmony == (200, {"colours": [[0, 255, 0], [0, 0, 255]]})
+    assert palette[0] == 200 and sorted(palette[1]["palette"]) == [[0, 0, 255], [255, 0, 0]]
+    assert missing[0] == 404
+
+def test_load_generator_reports_latency():
+    async def scenario(server, port):
+        return await run_load(port=port, concurrency=8, total=200)
+
+    stats = run_with_server(scenario, window=0.001)
+    assert stats["requests"] == 200
+    assert stats["errors"] == 0
+    assert stats["throughput"] > 0
+    assert stats["p99_ms"] >= stats["p50_ms"] > 0
+
+def test_percentile():
+    assert percentile(list(range(1, 101)), 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+def test_parse_endpoint_reports_errors_per_item():
+    async def scenario(server, port):
+        return await post(port, "/parse", {"values": ["rgb(255 0 0 / 50%)", "nope", "FF5733"], "hint": "HEX"})
+
+    status, response = run_with_server(scenario)
+    assert status == 200
+    assert response["results"][0] == {"rgb": [255, 0, 0], "alpha": 0.5, "syntax": "rgb"}
+    assert response["results"][1] is None and response["results"][2]["rgb"] == [255, 87, 51]
+    assert [error["index"] for error in response["errors"]] == [1]
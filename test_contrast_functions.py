@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from contrast_functions import (relative_luminance, contrast_ratio, contrast_matrix, accessible_pairs,
+                                compliance_levels, text_colour, text_colours)
+
+def test_relative_luminance_extremes():
+    assert relative_luminance([[0, 0, 0], [255, 255, 255]]).tolist() == pytest.approx([0.0, 1.0])
+    assert relative_luminance((255, 0, 0)) == pytest.approx(0.2126)
+
+def test_known_contrast_ratios():
+    assert contrast_ratio((0, 0, 0), (255, 255, 255)) == pytest.approx(21.0)
+    assert contrast_ratio((255, 255, 255), (0, 0, 0)) == pytest.approx(21.0)
+    # #767676 is the lightest grey that meets AA on white
+    assert contrast_ratio((118, 118, 118), (255, 255, 255)) == pytest.approx(4.54, abs=0.01)
+    assert contrast_ratio((119, 119, 119), (255, 255, 255)) < 4.5
+
+def test_contrast_matrix_matches_pairwise():
+    rgb = np.random.default_rng(0).integers(0, 256, (300, 3))
+    matrix = contrast_matrix(rgb)
+    assert matrix.shape == (300, 300)
+    assert np.allclose(matrix, matrix.T)
+    assert np.allclose(np.diag(matrix), 1)
+    assert matrix[3, 7] == pytest.approx(contrast_ratio(rgb[3], rgb[7]))
+
+def test_accessible_pairs():
+    palette = [(0, 0, 0), (255, 255, 255), (118, 118, 118), (255, 0, 0)]
+    pairs, ratios = accessible_pairs(palette, "AA")
+    assert pairs.tolist() == [[0, 1], [0, 3], [0, 2], [1, 2]]
+    assert ratios[0] == pytest.approx(21.0) and np.all(np.diff(ratios) <= 0)
+    assert compliance_levels(ratios).tolist() == ["AAA", "AA", "AA", "AA"]
+    assert accessible_pairs(palette, "AAA")[0].tolist() == [[0, 1]]
+    assert accessible_pairs(palette, "AA", large_text=True)[0].tolist() == [[0, 1], [0, 3], [0, 2], [1, 2], [1, 3]]
+    with pytest.raises(ValueError, match="Invalid WCAG level"):
+        accessible_pairs(palette, "A")
+
+def test_text_colour_maximises_contrast():
+    rgb = np.random.default_rng(1).integers(0, 256, (500, 3))
+    on_black = contrast_ratio(rgb, np.zeros(3))
+    on_white = contrast_ratio(rgb, np.full(3, 255))
+    assert text_colours(rgb) == np.where(on_black > on_white, "black", "white").tolist()
+    assert text_colour((10, 10, 10)) == "white" and text_colour((240, 240, 240)) == "black"
+    assert text_colour((255, 0, 0)) == "black"  # Brightness thresholds picked white for pure red
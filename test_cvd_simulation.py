@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from PIL import Image
+from cvd_simulation import CVD_MATRICES, cvd_matrix, simulate_cvd, simulate_image
+from colour_spaces import srgb_to_linear, linear_to_srgb, to_rgb8
+
+def test_zero_severity_is_identity():
+    rgb = np.random.default_rng(0).integers(0, 256, (1000, 3), dtype=np.uint8)
+    for deficiency in CVD_MATRICES:
+        np.testing.assert_array_equal(simulate_cvd(rgb, deficiency, 0), rgb)
+
+@pytest.mark.parametrize("deficiency", list(CVD_MATRICES))
+def test_matches_exact_pipeline(deficiency):
+    rgb = np.random.default_rng(1).integers(0, 256, (5000, 3), dtype=np.uint8)
+    linear = srgb_to_linear(rgb) @ cvd_matrix(deficiency, 0.7).astype(np.float64).T
+    expected = to_rgb8(linear_to_srgb(np.clip(linear, 0, 1)))
+    assert np.abs(simulate_cvd(rgb, deficiency, 0.7).astype(int) - expected).max() <= 1
+
+def test_greys_are_preserved():
+    greys = np.repeat(np.arange(0, 256, 15, dtype=np.uint8)[:, None], 3, axis=1)
+    for deficiency in CVD_MATRICES:
+        assert np.abs(simulate_cvd(greys, deficiency).astype(int) - greys).max() <= 1
+
+def test_red_green_confusion():
+    red, green = simulate_cvd(np.array([[200, 40, 40], [40, 150, 40]]), "deuteranopia")
+    assert abs(int(red[0]) - int(red[1])) < 60 and abs(int(green[0]) - int(green[1])) < 60
+
+def test_shapes_chunks_and_images():
+    image = np.random.default_rng(2).integers(0, 256, (37, 53, 3), dtype=np.uint8)
+    whole = simulate_cvd(image, "tritanopia")
+    assert whole.shape == image.shape and whole.dtype == np.uint8
+    np.testing.assert_array_equal(simulate_cvd(image, "tritanopia", chunk_pixels=100), whole)
+    np.testing.assert_array_equal(np.asarray(simulate_image(Image.fromarray(image), "tritanopia")), whole)
+    assert simulate_cvd([[255, 0, 0]], "protanopia").shape == (1, 3)
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="Invalid deficiency"):
+        cvd_matrix("achromatopsia")
+    with pytest.raises(ValueError, match="Invalid severity"):
+        cvd_matrix("protanopia", 1.5)
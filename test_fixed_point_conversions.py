@@ -0,0 +1,40 @@
+import pytest
+import numpy as np
+from conversion_functions import rgb_to_cmyk, rgb_to_hsl, rgb_to_hsv
+from batch_conversions import iter_rgb_cube, rgb_to_cmyk_batch, rgb_to_hsl_batch, rgb_to_hsv_batch
+from fixed_point_conversions import (rgb_to_hsl_fixed, rgb_to_hsv_fixed, rgb_to_cmyk_fixed, rgb_to_hsl_fixed_batch,
+                                     rgb_to_hsv_fixed_batch, rgb_to_cmyk_fixed_batch)
+
+@pytest.fixture
+def rgb_sample():
+    """Every 61st colour of the RGB cube plus inputs whose exact results are x.5 ties."""
+    ties = np.array([[200, 199, 0], [200, 0, 199], [121, 1, 0], [0, 255, 135], [255, 255, 0], [0, 0, 0]])
+    return np.concatenate([ties, np.concatenate(list(iter_rgb_cube(1 << 22)))[::61]])
+
+@pytest.mark.parametrize("scalar, fixed, fixed_batch, float_batch", [
+    (rgb_to_hsl, rgb_to_hsl_fixed, rgb_to_hsl_fixed_batch, rgb_to_hsl_batch),
+    (rgb_to_hsv, rgb_to_hsv_fixed, rgb_to_hsv_fixed_batch, rgb_to_hsv_batch),
+    (rgb_to_cmyk, rgb_to_cmyk_fixed, rgb_to_cmyk_fixed_batch, rgb_to_cmyk_batch),
+])
+
+def test_fixed_point_matches_float(rgb_sample, scalar, fixed, fixed_batch, float_batch):
+    np.testing.assert_array_equal(fixed_batch(rgb_sample), float_batch(rgb_sample))
+    batch = fixed_batch(rgb_sample).tolist()
+    for rgb, batch_result in zip(rgb_sample[::50].tolist(), batch[::50]):
+        expected = scalar(*rgb)
+        assert fixed(*rgb) == expected
+        assert tuple(batch_result) == expected
+
+def test_fixed_point_compact_dtypes():
+    rgb = np.array([[255, 0, 0], [183, 137, 102]], dtype=np.uint8)
+    assert rgb_to_hsl_fixed_batch(rgb).dtype == np.uint16
+    assert rgb_to_hsv_fixed_batch(rgb).dtype == np.uint16
+    percent = rgb_to_cmyk_fixed_batch(rgb, as_percent=True)
+    assert percent.dtype == np.uint8
+    assert percent.tolist() == [[0, 100, 100, 0], [0, 25, 44, 28]]
+
+def test_fixed_point_invalid_rgb():
+    with pytest.raises(ValueError):
+        rgb_to_hsl_fixed(256, 0, 0)
+    with pytest.raises(ValueError):
+        rgb_to_hsv_fixed_batch([[0, -1, 0]])
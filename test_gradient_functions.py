@@ -0,0 +1,55 @@
+import pytest
+import numpy as np
+from gradient_functions import GRADIENT_SPACES, make_gradient, gradient_to_hex, gradient_to_image
+from colour_spaces import rgb_to_lab, lab_to_rgb, rgb_to_oklab, oklab_to_rgb, rgb_to_hsl_float, rgb_to_hsv_float
+from conversion_functions import rgb_to_hsl, rgb_to_hsv
+
+@pytest.mark.parametrize("space", list(GRADIENT_SPACES))
+
+def test_gradient_hits_every_stop(space):
+    ramp = make_gradient(["#FF0000", "#00FF00", "#0000FF"], 101, space)
+    assert ramp.shape == (101, 3)
+    assert ramp.dtype == np.uint8
+    assert gradient_to_hex(ramp[[0, 50, 100]]) == ["#FF0000", "#00FF00", "#0000FF"]
+
+def test_rgb_gradient_midpoint():
+    assert gradient_to_hex(make_gradient([(0, 0, 0), (255, 255, 255)], 3, "RGB")) == ["#000000", "#808080", "#FFFFFF"]
+
+def test_hue_gradient_takes_shortest_path():
+    # Red (0) to magenta (300) goes backwards through 330, not forwards through green
+    ramp = make_gradient(["#FF0000", "#FF00FF"], 3, "HSV")
+    assert gradient_to_hex(ramp) == ["#FF0000", "#FF0080", "#FF00FF"]
+
+def test_hue_gradient_from_grey_keeps_hue():
+    assert gradient_to_hex(make_gradient(["#808080", "#FF0000"], 3, "HSL"))[1] == "#BF4040"
+
+def test_gradient_stop_positions():
+    ramp = make_gradient(["#000000", "#FFFFFF", "#FFFFFF"], 5, "RGB", positions=[0, 0.25, 1])
+    assert gradient_to_hex(ramp)[1:] == ["#FFFFFF"] * 4
+
+def test_invalid_gradients():
+    with pytest.raises(ValueError):
+        make_gradient(["#FF0000"], 10)
+    with pytest.raises(ValueError):
+        make_gradient(["#FF0000", "#0000FF"], 10, "CMYK")
+    with pytest.raises(ValueError):
+        make_gradient(["#FF0000", "#0000FF"], 10, positions=[1, 0])
+
+def test_gradient_to_image():
+    image = gradient_to_image(make_gradient(["#000000", "#FFFFFF"], 1000), width=250, height=10)
+    assert image.size == (250, 10)
+    assert image.getpixel((0, 5)) == (0, 0, 0)
+    assert image.getpixel((249, 0)) == (255, 255, 255)
+
+def test_colour_space_round_trips():
+    rgb = np.random.default_rng(1).integers(0, 256, (1000, 3))
+    np.testing.assert_allclose(lab_to_rgb(rgb_to_lab(rgb)), rgb, atol=1e-6)
+    np.testing.assert_allclose(oklab_to_rgb(rgb_to_oklab(rgb)), rgb, atol=1e-6)
+    np.testing.assert_allclose(rgb_to_lab([255, 255, 255]), [100, 0, 0], atol=1e-3)
+    for colour in rgb[:50].tolist():
+        for to_float, to_int in ((rgb_to_hsl_float, rgb_to_hsl), (rgb_to_hsv_float, rgb_to_hsv)):
+            hue, *rest = np.rint(to_float(colour)).astype(int)
+            expected_hue, *expected_rest = to_int(*colour)
+            difference = abs(hue - expected_hue) % 360
+            assert min(difference, 360 - difference) == 0  # Hue 360 and 0 are the same angle
+            assert rest == list(expected_rest)
@@ -0,0 +1,130 @@
+import struct
+import numpy as np
+import pytest
+from PIL import Image
+import icc_conversions
+from icc_conversions import (get_transform, set_cmyk_profile, rgb_to_cmyk_icc, cmyk_to_rgb_icc, rgb_to_cmyk_icc_batch,
+                             cmyk_to_rgb_icc_batch, image_to_cmyk, image_from_cmyk)
+from conversion_functions import rgb_to_cmyk
+from colour_spaces import rgb_to_lab, lab_to_rgb
+from batch_conversions import rgb_to_cmyk_batch
+
+def _lut16(inputs, outputs, grid, table):
+    """Encode an ICC lut16Type tag with identity curves around a CLUT."""
+    header = b"mft2" + bytes(4) + struct.pack(">BBBB", inputs, outputs, grid, 0)
+    matrix = struct.pack(">9i", 65536, 0, 0, 0, 65536, 0, 0, 0, 65536)
+    curves = struct.pack(">HH", 2, 2)
+    return (header + matrix + curves + struct.pack(">HH", 0, 65535) * inputs
+            + np.clip(np.rint(table), 0, 65535).astype(">u2").tobytes() + struct.pack(">HH", 0, 65535) * outputs)
+
+def _grid(points, channels):
+    """Every grid point of a CLUT as values 0-1, first channel varying slowest."""
+    axes = np.meshgrid(*[np.linspace(0, 1, points)] * channels, indexing="ij")
+    return np.stack(axes, axis=-1).reshape(-1, channels)
+
+def write_cmyk_profile(path):
+    """Write a small CMYK printer profile built from the naive formulas, with a Lab connection space."""
+    cmyk = _grid(9, 4)
+    rgb = 255 * (1 - cmyk[:, :3]) * (1 - cmyk[:, 3:])
+    lab = rgb_to_lab(rgb)
+    a2b = np.column_stack([lab[:, 0] * 652.8, (lab[:, 1] + 128) * 256, (lab[:, 2] + 128) * 256])
+    encoded = _grid(17, 3) * 65535
+    lab = np.column_stack([encoded[:, 0] / 652.8, encoded[:, 1] / 256 - 128, encoded[:, 2] / 256 - 128])
+    b2a = rgb_to_cmyk_batch(np.rint(np.clip(lab_to_rgb(lab), 0, 255)).astype(int)) * 65535
+    text = b"Test CMYK\0"
+    tags = {
+        b"desc": b"desc" + bytes(4) + struct.pack(">I", len(text)) + text + bytes(4 + 4 + 2 + 1 + 67),
+        b"wtpt": b"XYZ " + bytes(4) + struct.pack(">3i", 63190, 65536, 54061),
+        b"cprt": b"text" + bytes(4) + b"No copyright\0",
+        b"A2B0": _lut16(4, 3, 9, a2b),
+        b"B2A0": _lut16(3, 4, 17, b2a),
+    }
+    offset = 128 + 4 + 12 * len(tags)
+    table, data = struct.pack(">I", len(tags)), b""
+    for signature, tag in tags.items():
+        tag += bytes(-len(tag) % 4)
+        table += signature + struct.pack(">II", offset + len(data), len(tag))
+        data += tag
+    header = bytearray(128)
+    header[8:24] = struct.pack(">I", 0x02100000) + b"prtrCMYKLab "
+    header[36:40] = b"acsp"
+    header[68:80] = struct.pack(">3i", 63190, 65536, 54061)
+    body = table + data
+    header[0:4] = struct.pack(">I", 128 + len(body))
+    path.write_bytes(bytes(header) + body)
+    return str(path)
+
+@pytest.fixture(scope="module")
+def profile(tmp_path_factory):
+    return write_cmyk_profile(tmp_path_factory.mktemp("icc") / "test_cmyk.icc")
+
+@pytest.fixture(autouse=True)
+def naive_by_default():
+    set_cmyk_profile(None)
+    yield
+    set_cmyk_profile(None)
+
+def test_naive_formula_without_profile():
+    assert rgb_to_cmyk_icc(255, 87, 51) == rgb_to_cmyk(255, 87, 51)
+    assert cmyk_to_rgb_icc(0.0, 0.66, 0.8, 0.0) == (255, 87, 51)
+    image = Image.new("RGB", (2, 2), (255, 87, 51))
+    assert image_from_cmyk(image_to_cmyk(image)).getpixel((0, 0)) == (255, 87, 51)
+
+def test_profile_conversions(profile):
+    c, m, y, k = rgb_to_cmyk_icc(255, 0, 0, profile)
+    assert m > 0.8 and y > 0.8 and c < 0.1
+    assert rgb_to_cmyk_icc(255, 255, 255, profile) == (0, 0, 0, 0)
+    assert cmyk_to_rgb_icc(0, 0, 0, 1, profile) == (0, 0, 0)
+    rgb = np.random.default_rng(0).integers(0, 256, (500, 3))
+    round_trip = cmyk_to_rgb_icc_batch(rgb_to_cmyk_icc_batch(rgb, profile), profile)
+    assert round_trip.shape == (500, 3)
+    assert np.abs(round_trip - rgb).mean() < 8
+
+def test_configured_profile_and_cached_transforms(profile):
+    set_cmyk_profile(profile, "perceptual")
+    get_transform.cache_clear()
+    first = rgb_to_cmyk_icc(0, 128, 255)
+    for _ in range(5):
+        assert rgb_to_cmyk_icc(0, 128, 255) == first
+    assert get_transform.cache_info().misses == 1
+    rgb_to_cmyk_icc(0, 128, 255, intent="relative")
+    cmyk_to_rgb_icc(*first)
+    assert get_transform.cache_info().misses == 3
+
+def test_image_round_trip_embeds_profile(profile):
+    image = Image.fromarray(np.random.default_rng(1).integers(0, 256, (16, 16, 3), dtype=np.uint8))
+    cmyk = image_to_cmyk(image, profile)
+    assert cmyk.mode == "CMYK" and cmyk.info["icc_profile"]
+    # The embedded profile is used on the way back, without configuring one
+    back = image_from_cmyk(cmyk)
+    assert np.abs(np.asarray(back, dtype=int) - np.asarray(image, dtype=int)).mean() < 8
+
+def test_corrupt_embedded_profile_falls_back(profile):
+    image = Image.new("CMYK", (2, 2), (0, 168, 204, 0))
+    image.info["icc_profile"] = b"not a profile"
+    assert image_from_cmyk(image).getpixel((0, 0)) == (255, 87, 51)  # Naive formula
+    expected = image_from_cmyk(Image.new("CMYK", (2, 2), (0, 168, 204, 0)), profile).getpixel((0, 0))
+    assert image_from_cmyk(image, profile).getpixel((0, 0)) == expected
+    set_cmyk_profile(profile)
+    assert image_from_cmyk(image).getpixel((0, 0)) == expected
+
+def test_invalid_profiles_and_intents(profile, tmp_path):
+    with pytest.raises(ValueError, match="Invalid rendering intent"):
+        set_cmyk_profile(profile, "vivid")
+    with pytest.raises(ValueError, match="Cannot read ICC profile"):
+        set_cmyk_profile(str(tmp_path / "missing.icc"))
+    srgb = tmp_path / "srgb.icc"
+    srgb.write_bytes(icc_conversions.load_profile(None, "RGB").tobytes())
+    with pytest.raises(ValueError, match="expected a CMYK profile"):
+        set_cmyk_profile(str(srgb))
+    assert icc_conversions.get_cmyk_profile() is None
+
+def test_parser_and_converter_follow_the_profile(profile):
+    from colour_parser import parse_colour
+    from colour_converter import format_representations
+    naive = dict(format_representations((255, 0, 0)))["cmyk"]
+    set_cmyk_profile(profile)
+    assert parse_colour("cmyk(0 0 0 1)").rgb == (0, 0, 0)
+    assert parse_colour("cmyk(0 0.93 0.96 0.01)").rgb == cmyk_to_rgb_icc(0, 0.93, 0.96, 0.01)
+    profiled = dict(format_representations((255, 0, 0), profile, "relative"))["cmyk"]
+    assert profiled == ", ".join(str(value) for value in rgb_to_cmyk_icc(255, 0, 0)) != naive
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from PIL import Image
+from image_transform import (IMAGE_SPACES, transform_image, inverse_transform, channels_to_images, images_to_channels,
+                             export_channels, import_channels)
+from colour_spaces import rgb_to_hsl_float, rgb_to_lab
+
+@pytest.fixture(scope="module")
+def image():
+    return np.random.default_rng(0).integers(0, 256, (37, 53, 3), dtype=np.uint8)
+
+@pytest.mark.parametrize("space", list(IMAGE_SPACES))
+
+def test_round_trip_is_exact(image, space):
+    # Small chunks, so rows are converted in several uneven bands
+    channels = transform_image(image, space, chunk_pixels=500)
+    assert channels.shape == image.shape[:2] + (len(IMAGE_SPACES[space]["channels"]),)
+    assert np.array_equal(np.asarray(inverse_transform(channels, space, chunk_pixels=700)), image)
+
+def test_channels_match_the_colour_space_functions(image):
+    assert np.allclose(transform_image(image, "HSL"), rgb_to_hsl_float(image), atol=1e-3)
+    assert np.allclose(transform_image(Image.fromarray(image), "Lab"), rgb_to_lab(image), atol=1e-3)
+    cmyk = transform_image(np.array([[[255, 0, 0], [0, 0, 0]]], dtype=np.uint8), "CMYK")
+    assert np.array_equal(cmyk, [[[0, 1, 1, 0], [0, 0, 0, 1]]])
+
+@pytest.mark.parametrize("space", list(IMAGE_SPACES))
+
+def test_grayscale_planes_round_trip_closely(image, space):
+    planes = channels_to_images(transform_image(image, space), space)
+    assert [name for name, _ in planes] == list(IMAGE_SPACES[space]["channels"])
+    assert all(plane.mode == "L" and plane.size == (53, 37) for _, plane in planes)
+    rebuilt = inverse_transform(images_to_channels([plane for _, plane in planes], space), space)
+    assert np.abs(np.asarray(rebuilt, dtype=int) - image).mean() < 2
+
+def test_export_and_import(image, tmp_path):
+    npy = export_channels(image, "Lab", str(tmp_path / "photo.npy"), chunk_pixels=400)
+    assert np.allclose(np.load(npy[0]), rgb_to_lab(image), atol=1e-3)
+    assert np.array_equal(np.asarray(import_channels(npy, "Lab")), image)
+
+    pngs = export_channels(Image.fromarray(image), "HSV", str(tmp_path / "photo.png"), chunk_pixels=400)
+    assert [path.rsplit("_", 1)[1] for path in pngs] == ["H.png", "S.png", "V.png"]
+    assert np.abs(np.asarray(import_channels(pngs, "HSV"), dtype=int) - image).mean() < 2
+
+def test_invalid_input(image):
+    with pytest.raises(ValueError, match="Invalid colour space"):
+        transform_image(image, "YUV")
+    with pytest.raises(ValueError, match="needs 4 channels"):
+        inverse_transform(transform_image(image, "HSL"), "CMYK")
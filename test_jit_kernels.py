@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+import batch_conversions
+from batch_conversions import (set_backend, get_backend, rgb_to_hsl_batch, rgb_to_hsv_batch, rgb_to_cmyk_batch,
+                               cmyk_to_rgb_batch, hsl_to_rgb_float_batch, hsv_to_rgb_float_batch)
+from colour_gear import wheel_base, apply_wheel_value, _wheel_bases
+from palette_functions import nearest_centroid
+from benchmark_kernels import run_benchmarks
+
+pytest.importorskip("numba")
+
+@pytest.fixture
+def restore_backend():
+    previous = get_backend()
+    yield
+    set_backend(previous)
+
+def both_backends(function, *args):
+    """Run a function on the NumPy and then the Numba backend."""
+    set_backend("numpy")
+    expected = function(*args)
+    set_backend("numba")
+    return expected, function(*args)
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(7)
+    rgb = np.concatenate([np.array([[0, 0, 0], [255, 255, 255], [128, 128, 128], [255, 0, 0], [0, 0, 255]]),
+                          rng.integers(0, 256, (20000, 3))])
+    hue = np.concatenate([np.column_stack([rng.integers(0, 360, 5000), rng.integers(0, 101, (5000, 2))]),
+                          np.column_stack([rng.uniform(0, 360, 5000), rng.uniform(0, 100, (5000, 2))])])
+    cmyk = np.concatenate([rng.integers(0, 101, (5000, 4)) / 100, rng.uniform(0, 1, (5000, 4))])
+    return {"rgb": rgb, "rgb_uint8": rgb.astype(np.uint8), "hue": hue, "cmyk": cmyk}
+
+# The Numba kernels must match the NumPy backend exactly
+@pytest.mark.parametrize("function, key", [
+    (rgb_to_hsl_batch, "rgb"),
+    (rgb_to_hsv_batch, "rgb"),
+    (rgb_to_cmyk_batch, "rgb"),
+    (rgb_to_hsl_batch, "rgb_uint8"),
+    (cmyk_to_rgb_batch, "cmyk"),
+    (hsl_to_rgb_float_batch, "hue"),
+    (hsv_to_rgb_float_batch, "hue"),
+])
+def test_kernels_match_numpy(restore_backend, samples, function, key):
+    expected, actual = both_backends(function, samples[key])
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
+
+def test_kernels_keep_leading_shape(restore_backend, samples):
+    rgb = samples["rgb"][:1000].reshape(10, 100, 3)
+    expected, actual = both_backends(rgb_to_hsl_batch, rgb)
+    assert actual.shape == (10, 100, 3)
+    np.testing.assert_array_equal(actual, expected)
+
+def test_numba_validation_unchanged(restore_backend):
+    set_backend("numba")
+    with pytest.raises(ValueError):
+        rgb_to_hsl_batch([[256, 0, 0]])
+    with pytest.raises(ValueError):
+        hsv_to_rgb_float_batch([[360, 0, 0]])
+
+@pytest.mark.parametrize("size", [101, 300])
+def test_wheel_matches_numpy(restore_backend, size):
+    def render():
+        _wheel_bases.pop(size, None)
+        wheel = wheel_base(size)
+        return wheel.full_value, wheel.base, apply_wheel_value(wheel, 37)
+    expected, actual = both_backends(render)
+    for a, b in zip(actual, expected):
+        np.testing.assert_array_equal(a, b)
+
+def test_nearest_centroid_matches_numpy(restore_backend, samples):
+    centres = np.array([[0, 0, 0], [255, 255, 255], [200, 30, 30], [30, 30, 200]])
+    (expected_labels, expected_distances), (labels, distances) = both_backends(nearest_centroid, samples["rgb"],
+                                                                               centres)
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_array_equal(distances, expected_distances)
+
+def test_set_backend_rejects_unknown(restore_backend):
+    with pytest.raises(ValueError):
+        set_backend("cuda")
+
+def test_set_backend_requires_numba(restore_backend, monkeypatch):
+    monkeypatch.setattr(batch_conversions, "NUMBA_AVAILABLE", False)
+    with pytest.raises(ValueError):
+        set_backend("numba")
+
+def test_benchmarks_compare_backends(restore_backend):
+    report = run_benchmarks(n=1000, repeat=1, names=["rgb_to_hsl", "nearest_centroid"])
+    assert set(report) == {"rgb_to_hsl", "nearest_centroid"}
+    for timings in report.values():
+        assert set(timings) == {"numba", "numpy"}
@@ -0,0 +1,58 @@
+import time
+import numpy as np
+import pytest
+from live_palette import FrameRing, LivePalette
+
+SHAPE = (24, 32, 3)
+
+def frame(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+def test_ring_size_follows_memory_budget():
+    ring = FrameRing(SHAPE, memory_budget=10 * (SHAPE[0] * SHAPE[1] * 3 + 8))
+    try:
+        assert ring.slots == 10
+        assert ring.memory.size >= 10 * ring.frame_bytes
+    finally:
+        ring.close()
+    with pytest.raises(ValueError, match="Invalid memory budget"):
+        FrameRing(SHAPE, memory_budget=SHAPE[0] * SHAPE[1] * 3)
+
+def test_reader_sees_only_the_newest_complete_frame():
+    ring = FrameRing(SHAPE, memory_budget=3 * (SHAPE[0] * SHAPE[1] * 3 + 8))
+    reader = FrameRing(SHAPE, memory_budget=3 * (SHAPE[0] * SHAPE[1] * 3 + 8), name=ring.name)
+    try:
+        assert reader.read_newest() is None
+        for value in range(5):  # Wraps around the three slots
+            ring.push(frame(value))
+        sequence, newest = reader.read_newest()
+        assert sequence == 4 and (newest == 4).all()
+        assert reader.read_newest(after=4) is None
+
+        ring.sequences[ring.written % ring.slots] = -1  # A frame being written is never the newest
+        assert reader.read_newest(after=3)[0] == 4
+    finally:
+        reader.close()
+        ring.close()
+
+def test_live_palette_worker_returns_centroids():
+    image = frame(0)
+    image[:12] = (255, 0, 0)
+    image[12:] = (0, 0, 255)
+    live = LivePalette(SHAPE, n_colours=2)
+    live.start()
+    try:
+        latest = None
+        deadline = time.monotonic() + 30  # The worker is a fresh interpreter and imports scikit-learn
+        while latest is None and time.monotonic() < deadline:
+            live.push(image)
+            latest = live.latest_palette()
+            time.sleep(0.02)
+        assert latest is not None
+        sequence, palette, report = latest
+        assert 0 <= sequence < live.ring.written
+        assert sorted(palette.tolist()) == [[0, 0, 255], [255, 0, 0]]
+        assert report["level"] == 0 and report["latency_ms"] > 0
+    finally:
+        live.stop()
+    assert not live.running and live.ring is None
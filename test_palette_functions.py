@@ -0,0 +1,111 @@
+import threading
+import pytest
+import numpy as np
+from palette_functions import (extract_palette, auto_palette, extract_weighted_palette, extract_palette_progressive,
+                               ExtractionCancelled, MAX_ITERATIONS, EXPECTED_ITERATIONS, palette_coverage, label_shares, order_by_coverage, label_map,
+                               label_map_image)
+
+@pytest.fixture
+def four_colour_image():
+    """A noisy image made of four well-separated colours."""
+    rng = np.random.default_rng(0)
+    colours = np.array([[255, 0, 0], [0, 255, 0], [0, 0, 255], [250, 250, 250]])
+    noise = rng.normal(0, 8, (120, 160, 3))
+    return (colours[rng.integers(0, 4, (120, 160))] + noise).clip(0, 255).astype(np.uint8)
+
+def test_extract_palette_size(four_colour_image):
+    assert extract_palette(four_colour_image, 3).shape == (3, 3)
+
+def test_auto_palette_finds_clusters(four_colour_image):
+    palette, k, score = auto_palette(four_colour_image)
+    assert k == 4
+    assert palette.shape == (4, 3)
+    assert score > 0.9
+    for colour in ([255, 0, 0], [0, 255, 0], [0, 0, 255], [250, 250, 250]):
+        assert np.abs(palette - colour).max(axis=1).min() <= 10
+
+def test_auto_palette_single_colour():
+    palette, k, score = auto_palette(np.full((10, 10, 3), 40, dtype=np.uint8))
+    assert k == 1 and score is None
+    assert palette.tolist() == [[40, 40, 40]]
+
+def test_auto_palette_respects_k_max(four_colour_image):
+    _, k, _ = auto_palette(four_colour_image, k_max=3)
+    assert k <= 3
+
+def test_auto_palette_zero_budget_still_scores_two_colours(four_colour_image):
+    palette, k, score = auto_palette(four_colour_image, time_budget=0)
+    assert k == 2 and len(palette) == 2 and score is not None
+
+def test_extract_weighted_palette_orders_by_share():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    image[:7] = (255, 0, 0)
+    colours, weights = extract_weighted_palette(image, 5)  # Only two distinct colours
+    assert colours.tolist() == [[255, 0, 0], [0, 0, 0]]
+    assert weights.tolist() == pytest.approx([0.7, 0.3])
+
+def test_progressive_palette_matches_and_reports(four_colour_image):
+    reports = []
+    palette = extract_palette_progressive(four_colour_image, 4, progress=lambda done, total: reports.append(done))
+    expected = extract_palette(four_colour_image, 4)
+    assert np.abs(np.sort(palette, axis=0) - np.sort(expected, axis=0)).max() <= 1
+    assert reports and reports[-1] == MAX_ITERATIONS
+
+def test_progressive_palette_reports_against_an_estimate():
+    image = np.random.default_rng(0).integers(0, 256, (100, 100, 3), dtype=np.uint8)
+    reports = []
+    extract_palette_progressive(image, 8, progress=lambda done, total: reports.append((done, total)))
+    assert len(reports) > 2
+    assert reports[0] == (5, EXPECTED_ITERATIONS)  # Not 5 of 300, so the bar moves visibly
+    assert all(done < total for done, total in reports[:-1])
+    assert reports[-1] == (MAX_ITERATIONS, MAX_ITERATIONS)
+
+def test_progressive_palette_can_be_cancelled(four_colour_image):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(ExtractionCancelled):
+        extract_palette_progressive(four_colour_image, 4, cancel=cancel)
+    with pytest.raises(ExtractionCancelled):
+        auto_palette(four_colour_image, cancel=cancel)
+
+def test_progressive_palette_iteration_cap(four_colour_image):
+    calls = []
+    extract_palette_progressive(four_colour_image, 4, progress=lambda done, total: calls.append(total), max_iter=3)
+    assert calls[-1] == 3
+
+def test_palette_coverage_counts_every_pixel():
+    image = np.zeros((300, 300, 3), dtype=np.uint8)
+    image[:90] = (250, 10, 10)
+    centres = np.array([[0, 0, 0], [255, 0, 0], [0, 0, 255]])
+    assert palette_coverage(image, centres).tolist() == pytest.approx([0.7, 0.3, 0.0])
+    assert palette_coverage(image, centres, step=3).tolist() == pytest.approx([0.7, 0.3, 0.0])
+    assert palette_coverage(image.reshape(-1, 3), centres).tolist() == pytest.approx([0.7, 0.3, 0.0])
+
+def test_order_by_coverage_is_stable():
+    colours, shares = order_by_coverage([[1, 1, 1], [2, 2, 2], [3, 3, 3]], [0.25, 0.5, 0.25])
+    assert colours.tolist() == [[2, 2, 2], [1, 1, 1], [3, 3, 3]]
+    assert shares.tolist() == [0.5, 0.25, 0.25]
+
+def test_label_map_is_downsampled_to_palette_indices():
+    image = np.zeros((400, 800, 3), dtype=np.uint8)
+    image[:, 400:] = (0, 0, 250)
+    centres = np.array([[0, 0, 255], [0, 0, 0]])
+    labels = label_map(image, centres, max_size=100)
+    assert labels.shape == (50, 100)
+    assert set(labels[:, :50].ravel()) == {1} and set(labels[:, 50:].ravel()) == {0}
+    assert label_map_image(labels, centres).getpixel((99, 0)) == (0, 0, 255)
+
+def test_fit_labels_give_coverage_without_reassigning(four_colour_image):
+    palette, labels = extract_palette_progressive(four_colour_image, 4, return_labels=True)
+    assert labels.shape == (four_colour_image.shape[0] * four_colour_image.shape[1],)
+    shares = label_shares(labels, len(palette))
+    assert shares.sum() == pytest.approx(1)
+    np.testing.assert_allclose(shares, palette_coverage(four_colour_image, palette), atol=1e-3)
+    np.testing.assert_array_equal(label_map(four_colour_image, palette, 40, labels),
+                                  label_map(four_colour_image, palette, 40))
+
+def test_auto_palette_labels_cover_the_clustered_pixels(four_colour_image):
+    palette, k, _, labels = auto_palette(four_colour_image[:40, :50], return_labels=True)
+    assert len(labels) == 40 * 50 and labels.max() == k - 1
+    _, k, score, labels = auto_palette(np.zeros((10, 10, 3), dtype=np.uint8), return_labels=True)
+    assert (k, score) == (1, None) and not labels.any()
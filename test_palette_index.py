@@ -0,0 +1,88 @@
+import pytest
+import cv2
+import numpy as np
+from PIL import Image
+from colour_spaces import rgb_to_lab
+from palette_index import PaletteIndex, projection_bounds, _signature, DATA_FILE
+
+def save_image(path, colours, shares):
+    """Save a 100x100 image made of horizontal bands of the given colours."""
+    rows = np.repeat(np.arange(len(colours)), np.round(np.array(shares) * 100).astype(int))
+    Image.fromarray(np.array(colours, dtype=np.uint8)[rows][:, None].repeat(100, axis=1)).save(path)
+    return str(path)
+
+@pytest.fixture
+def random_index(tmp_path):
+    rng = np.random.default_rng(3)
+    index = PaletteIndex(str(tmp_path / "index"))
+    for i in range(2000):
+        k = rng.integers(1, 6)
+        index.add(f"image{i}.png", rng.integers(0, 256, (k, 3)), rng.dirichlet(np.ones(k)))
+    return index
+
+def brute_force(index, colours, weights, top_n):
+    query = _signature(rgb_to_lab(np.array(colours, dtype=float)), np.asarray(weights) / np.sum(weights))
+    index._load_pending()
+    distances = [cv2.EMD(query, _signature(index._lab[i], index._weights[i]), cv2.DIST_L2)[0]
+                 for i in range(len(index))]
+    return [index.paths[i] for i in np.argsort(distances, kind="stable")[:top_n]]
+
+def test_query_matches_brute_force_and_prunes(random_index):
+    rng = np.random.default_rng(4)
+    for _ in range(5):
+        colours, weights = rng.integers(0, 256, (5, 3)), rng.dirichlet(np.ones(5))
+        results = random_index.query(colours, weights, top_n=10)
+        assert [path for path, _ in results] == brute_force(random_index, colours, weights, 10)
+        assert random_index.last_evaluated < len(random_index) // 2
+        distances = [distance for _, distance in results]
+        assert distances == sorted(distances)
+
+def test_projection_bounds_never_exceed_emd():
+    rng = np.random.default_rng(5)
+    query_lab = rgb_to_lab(rng.integers(0, 256, (4, 3)))
+    query_weights = rng.dirichlet(np.ones(4))
+    lab = rgb_to_lab(rng.integers(0, 256, (500, 5, 3)))
+    weights = rng.dirichlet(np.ones(5), 500)
+    bounds = projection_bounds(query_lab, query_weights, lab, weights)
+    query = _signature(query_lab, query_weights)
+    for bound, candidate_lab, candidate_weights in zip(bounds, lab, weights):
+        assert bound <= cv2.EMD(query, _signature(candidate_lab, candidate_weights), cv2.DIST_L2)[0] + 1e-3
+
+def test_index_persists_and_appends(tmp_path):
+    directory = str(tmp_path / "index")
+    index = PaletteIndex(directory)
+    index.add("red.png", [[255, 0, 0]], [1])
+    index.add("blue.png", [[0, 0, 255], [255, 255, 255]], [0.7, 0.3])
+
+    reopened = PaletteIndex(directory)
+    assert len(reopened) == 2 and "blue.png" in reopened
+    reopened.add("green.png", [[0, 255, 0]], [1])
+    assert [path for path, _ in PaletteIndex(directory).query([[0, 200, 0]], top_n=3)][0] == "green.png"
+    assert (tmp_path / "index" / DATA_FILE).stat().st_size == 12 + 3 * 25
+
+def test_add_and_query_images(tmp_path):
+    red = save_image(tmp_path / "red.png", [(220, 20, 20), (255, 255, 255)], [0.8, 0.2])
+    blue = save_image(tmp_path / "blue.png", [(20, 20, 220), (255, 255, 255)], [0.8, 0.2])
+    orange = save_image(tmp_path / "orange.png", [(240, 120, 20)], [1.0])
+    query = save_image(tmp_path / "query.png", [(230, 30, 30), (250, 250, 250)], [0.7, 0.3])
+
+    index = PaletteIndex(str(tmp_path / "index"))
+    assert index.add_images([red, blue, orange], workers=0) == 3
+    assert index.add_images([red], workers=0) == 0  # Already indexed
+    results = index.query_image(query, top_n=2)
+    assert [path for path, _ in results] == [red, orange]
+
+def test_invalid_palettes(tmp_path):
+    index = PaletteIndex(str(tmp_path / "index"))
+    with pytest.raises(ValueError):
+        index.add("bad.png", [[256, 0, 0]], [1])
+    with pytest.raises(ValueError):
+        index.add("bad.png", [[0, 0, 0]] * 6, [1] * 6)
+    with pytest.raises(ValueError):
+        index.query([[0, 0, 0]], [0])
+    assert index.query([[0, 0, 0]]) == []
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / DATA_FILE).write_bytes(b"not an index")
+    with pytest.raises(ValueError):
+        PaletteIndex(str(tmp_path))
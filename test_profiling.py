@@ -0,0 +1,75 @@
+import json
+import pytest
+from profiling import Profiler, format_status
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.span("wheel.render"):
+        pass
+    profiler.count("frames.captured")
+    assert profiler.span("a") is profiler.span("b")  # One shared no-op context
+    assert profiler.summary() == {}
+    assert profiler.counts() == {}
+
+def test_spans_and_counters():
+    profiler = Profiler(enabled=True)
+    with profiler.span("wheel.render"):
+        pass
+    for duration in range(1, 101):
+        profiler.record("palette.kmeans", duration / 1000)
+    profiler.count("frames.captured", 3)
+    profiler.count("frames.dropped")
+
+    summary = profiler.summary()
+    assert list(summary) == ["palette.kmeans", "wheel.render"]
+    assert summary["palette.kmeans"]["calls"] == 100
+    assert summary["palette.kmeans"]["p50_ms"] == pytest.approx(50.5)
+    assert summary["palette.kmeans"]["p95_ms"] == pytest.approx(95.05)
+    assert summary["palette.kmeans"]["max_ms"] == pytest.approx(100)
+    assert summary["wheel.render"]["calls"] == 1
+    assert profiler.counts() == {"frames.captured": 3, "frames.dropped": 1}
+
+def test_window_keeps_latest_timings_but_counts_every_call():
+    profiler = Profiler(enabled=True, window=2)
+    for duration in (1.0, 0.002, 0.004):
+        profiler.record("tk.palette_redraw", duration)
+    figures = profiler.summary()["tk.palette_redraw"]
+    assert figures["calls"] == 3
+    assert figures["max_ms"] == pytest.approx(4)
+    assert figures["total_ms"] == pytest.approx(1006)
+
+def test_timed_decorator_follows_the_enabled_flag():
+    profiler = Profiler()
+
+    @profiler.timed("wheel.selection")
+    def select(x):
+        return x * 2
+
+    assert select(2) == 4
+    assert profiler.summary() == {}
+    profiler.enabled = True
+    assert select(3) == 6
+    assert profiler.summary()["wheel.selection"]["calls"] == 1
+
+def test_dump_and_reset(tmp_path):
+    profiler = Profiler(enabled=True)
+    profiler.record("image.decode", 0.01)
+    profiler.count("frames.rendered")
+    path = tmp_path / "profile.json"
+    profiler.dump(path)
+
+    data = json.loads(path.read_text())
+    assert data["samples_ms"] == {"image.decode": [10.0]}
+    assert data["counters"] == {"frames.rendered": 1}
+    assert data["summary"]["image.decode"]["calls"] == 1
+    profiler.reset()
+    assert profiler.summary() == {} and profiler.counts() == {}
+
+def test_invalid_window():
+    with pytest.raises(ValueError, match="Invalid window"):
+        Profiler(window=0)
+
+def test_format_status_shows_slowest_spans_first():
+    summary = {"fast": {"p50_ms": 1.0, "p95_ms": 2.0}, "slow": {"p50_ms": 10.0, "p95_ms": 30.0}}
+    assert format_status(summary, {"frames.captured": 5}, limit=1) == "slow 10.0/30.0 ms | frames.captured 5"
+    assert format_status({}, {}) == "Profiling: no data yet"
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from quality_controller import (QUALITY_LEVELS, RAISE_AFTER, QualityController, QualitySettings, describe_quality,
+                                prepare_pixels, fit_palette)
+
+def test_slow_updates_lower_quality():
+    controller = QualityController(target_latency=0.05)
+    assert controller.record(0.2) == 1
+    assert controller.record(0.2) == 2
+    assert controller.settings == QUALITY_LEVELS[2]
+    for _ in range(20):
+        controller.record(1.0)
+    assert controller.level == len(QUALITY_LEVELS) - 1  # Never beyond the fastest level
+
+def test_quality_rises_only_after_a_fast_streak():
+    controller = QualityController(target_latency=0.05, level=3)
+    for _ in range(RAISE_AFTER - 1):
+        controller.record(0.01)
+    controller.record(0.07)  # Keeps the average under the target but not fast enough, so the streak restarts
+    for _ in range(RAISE_AFTER - 1):
+        assert controller.record(0.01) == 3
+    assert controller.record(0.01) == 2
+    controller = QualityController(target_latency=0.05)
+    for _ in range(RAISE_AFTER * 2):
+        controller.record(0.001)
+    assert controller.level == 0
+
+def test_invalid_controller_settings():
+    with pytest.raises(ValueError, match="Invalid target latency"):
+        QualityController(target_latency=0)
+    with pytest.raises(ValueError, match="Invalid quality level"):
+        QualityController(level=len(QUALITY_LEVELS))
+
+def test_report_and_description():
+    controller = QualityController(target_latency=0.05, level=2)
+    report = controller.report()
+    assert report == {"level": 2, "levels": len(QUALITY_LEVELS), "scale": 0.5, "sample_size": 10000,
+                      "max_iter": 50, "latency_ms": None}
+    assert describe_quality(report) == "Quality 3/6: 1/2 size, 10000 px, 50 it"
+    controller.record(0.012)
+    assert controller.report()["latency_ms"] == 12.0
+    assert describe_quality(QualityController().report()) == "Quality 1/6: 1/1 size, all px, 300 it"
+
+def test_prepare_pixels_scales_and_samples():
+    frame = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    assert prepare_pixels(frame, QualitySettings(1.0, None, 300), rng).shape == (240 * 320, 3)
+    assert prepare_pixels(frame, QualitySettings(0.5, None, 300), rng).shape == (120 * 160, 3)
+    sample = prepare_pixels(frame, QualitySettings(0.25, 1000, 10), rng)
+    assert sample.shape == (1000, 3) and sample.dtype == np.uint8
+
+def test_fit_palette_warm_start():
+    pixels = np.array([[250, 0, 0]] * 50 + [[0, 0, 250]] * 50, dtype=np.uint8)
+    settings = QualitySettings(1.0, None, 10)
+    centres = fit_palette(pixels, 2, settings)
+    assert sorted(np.rint(centres).astype(int).tolist()) == [[0, 0, 250], [250, 0, 0]]
+    warm = fit_palette(pixels, 2, settings, init=centres)
+    assert np.allclose(warm, centres)
+    assert fit_palette(pixels[:1], 5, settings).shape == (1, 3)  # Never more clusters than pixels
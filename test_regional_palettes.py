@@ -0,0 +1,68 @@
+import json
+import numpy as np
+import pytest
+from PIL import Image
+from regional_palettes import (grid_regions, parse_grid, region_palette, regional_palettes, render_region_swatches,
+                               regions_to_json)
+
+@pytest.fixture
+def quadrant_image():
+    """A 40x60 image with a different solid colour in each quadrant."""
+    image = np.zeros((40, 60, 3), dtype=np.uint8)
+    image[:20, :30] = (255, 0, 0)
+    image[:20, 30:] = (0, 255, 0)
+    image[20:, :30] = (0, 0, 255)
+    image[20:, 30:] = (250, 250, 250)
+    return image
+
+def test_even_and_custom_grids():
+    assert grid_regions(40, 60, 2, 2) == [(0, 0, 20, 30), (0, 30, 20, 60), (20, 0, 40, 30), (20, 30, 40, 60)]
+    assert len(grid_regions(100, 100, 4, 4)) == 16
+    assert grid_regions(100, 200, row_lines=["0.25"], col_lines=[0.5]) == [
+        (0, 0, 25, 100), (0, 100, 25, 200), (25, 0, 100, 100), (25, 100, 100, 200)]
+    assert len(grid_regions(3, 3, 6, 6)) == 9  # Empty regions are left out
+    with pytest.raises(ValueError, match="Invalid grid lines"):
+        grid_regions(100, 100, row_lines=[1.5])
+    with pytest.raises(ValueError, match="Invalid grid"):
+        grid_regions(100, 100, 0, 4)
+
+def test_parse_grid():
+    assert parse_grid("4x3") == (4, 3)
+    assert parse_grid("2X2") == (2, 2)
+    for text in ("4", "ax4", "0x2"):
+        with pytest.raises(ValueError, match="Invalid grid"):
+            parse_grid(text)
+
+def test_each_region_gets_its_own_palette(quadrant_image):
+    results = regional_palettes(quadrant_image, grid_regions(40, 60, 2, 2), n_colours=3, workers=2)
+    assert [result.colours[0].tolist() for result in results] == [
+        [255, 0, 0], [0, 255, 0], [0, 0, 255], [250, 250, 250]]
+    assert all(result.weights.tolist() == [1.0] for result in results)  # One distinct colour per region
+
+def test_parallel_results_match_serial():
+    image = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    regions = grid_regions(120, 160, 3, 3)
+    parallel = regional_palettes(image, regions, n_colours=4, workers=4, sample_size=500)
+    serial = regional_palettes(Image.fromarray(image), regions, n_colours=4, workers=0, sample_size=500)
+    for a, b in zip(parallel, serial):
+        assert a.box == b.box
+        np.testing.assert_array_equal(a.colours, b.colours)
+
+def test_regions_must_lie_within_image(quadrant_image):
+    with pytest.raises(ValueError, match="Invalid region"):
+        regional_palettes(quadrant_image, [(0, 0, 50, 10)])
+
+def test_region_sampling_reads_a_view(quadrant_image):
+    quadrant_image.flags.writeable = False  # Regions are read in place, never modified
+    result = region_palette(quadrant_image, (0, 0, 40, 60), n_colours=4, sample_size=100)
+    assert len(result.colours) == 4 and result.weights.sum() == pytest.approx(1)
+
+def test_render_swatches_and_json(quadrant_image):
+    results = regional_palettes(quadrant_image, grid_regions(40, 60, 2, 2), n_colours=1, workers=0)
+    rendered = np.asarray(render_region_swatches(quadrant_image, results))
+    assert rendered.shape == quadrant_image.shape
+    assert tuple(rendered[18, 10]) == (255, 0, 0)  # Swatch strip at the bottom of the region
+    assert tuple(rendered[0, 10]) == (255, 255, 255)  # Region outline
+    assert quadrant_image[0, 10].tolist() == [255, 0, 0]  # The source image is left untouched
+    data = json.loads(json.dumps(regions_to_json(results)))
+    assert data[3] == {"box": [20, 30, 40, 60], "palette": [[250, 250, 250]], "weights": [1.0]}
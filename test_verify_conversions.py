@@ -0,0 +1,32 @@
+import pytest
+from conversion_functions import rgb_to_cmyk, cmyk_to_rgb, rgb_to_hsl, hsl_to_rgb
+from verify_conversions import verify_round_trips
+
+@pytest.fixture(scope="module")
+def sampled_report():
+    """Round-trip report over every 997th colour of the RGB cube, run in-process."""
+    return verify_round_trips(stride=997, workers=0, limit=5)
+
+def test_hex_round_trip_is_exact(sampled_report):
+    assert sampled_report["RGB->HEX->RGB"] == {"max_error": 0, "mismatches": 0, "offending": []}
+
+# Integer percentages lose precision, so these round trips are only exact to within a few steps
+@pytest.mark.parametrize("round_trip, max_error", [
+    ("RGB->HSL->RGB", 5),
+    ("RGB->HSV->RGB", 3),
+    ("RGB->CMYK->RGB", 2),
+])
+
+def test_lossy_round_trips_are_bounded(sampled_report, round_trip, max_error):
+    result = sampled_report[round_trip]
+    assert 0 < result["max_error"] <= max_error
+    assert 0 < len(result["offending"]) <= 5
+
+def test_offending_inputs_reproduce_with_scalar_functions(sampled_report):
+    for rgb in sampled_report["RGB->CMYK->RGB"]["offending"]:
+        back = cmyk_to_rgb(*rgb_to_cmyk(*rgb))
+        assert max(abs(a - b) for a, b in zip(back, rgb)) == sampled_report["RGB->CMYK->RGB"]["max_error"]
+    for rgb in sampled_report["RGB->HSL->RGB"]["offending"]:
+        h, s, l = rgb_to_hsl(*rgb)
+        back = hsl_to_rgb(h % 360, s, l)
+        assert max(abs(a - b) for a, b in zip(back, rgb)) == sampled_report["RGB->HSL->RGB"]["max_error"]
@@ -0,0 +1,73 @@
+import json
+import pytest
+import cv2
+import numpy as np
+from video_palette import (process_video, scan_segment, merge_segments, frame_histogram, is_scene_change,
+                           timeline_to_json, timeline_to_image)
+
+SCENE_COLOURS = [(200, 30, 30), (30, 200, 30), (30, 30, 200)]  # RGB, four seconds each
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    """Write a 12 second, 10 fps video with three solid-colour scenes."""
+    path = str(tmp_path_factory.mktemp("video") / "scenes.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for r, g, b in SCENE_COLOURS:
+        frame = np.empty((48, 64, 3), dtype=np.uint8)
+        frame[:] = (b, g, r)
+        for _ in range(40):
+            writer.write(frame)
+    writer.release()
+    return path
+
+def assert_scenes(timeline):
+    assert timeline["fps"] == 10
+    assert timeline["duration"] == pytest.approx(12)
+    assert [(scene["start"], scene["end"]) for scene in timeline["scenes"]] == [(0, 4), (4, 8), (8, 12)]
+    for scene, colour in zip(timeline["scenes"], SCENE_COLOURS):
+        assert len(scene["palette"]) == 1
+        for palette_colour in scene["palette"]:
+            assert np.abs(np.array(palette_colour) - colour).max() <= 8
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_process_video_finds_scenes(video_path, workers):
+    assert_scenes(process_video(video_path, sample_interval=1.0, n_colours=1, workers=workers))
+
+def test_scan_segment_samples_every_step(video_path):
+    scenes = scan_segment(video_path, 0, 120, 10)
+    assert [(scene["start_frame"], scene["end_frame"]) for scene in scenes] == [(0, 30), (40, 70), (80, 110)]
+
+def test_merge_segments_joins_continuing_scene(video_path):
+    # The split at frame 20 falls inside the first scene, so its two halves merge back together
+    segments = [scan_segment(video_path, 0, 20, 10), scan_segment(video_path, 20, 120, 10)]
+    n_samples = len(segments[0][0]["samples"]) + len(segments[1][0]["samples"])
+    scenes = merge_segments(segments)
+    assert [(scene["start_frame"], scene["end_frame"]) for scene in scenes] == [(0, 30), (40, 70), (80, 110)]
+    assert len(scenes[0]["samples"]) == n_samples
+
+def test_scene_change_detection():
+    red = np.zeros((8, 8, 3), dtype=np.uint8)
+    red[..., 2] = 255
+    noisy = red.copy()
+    noisy[0, 0] = 0
+    assert not is_scene_change(frame_histogram(red), frame_histogram(noisy))
+    assert is_scene_change(frame_histogram(red), frame_histogram(np.zeros_like(red)))
+
+def test_missing_video():
+    with pytest.raises(FileNotFoundError):
+        process_video("no_such_video.mp4", workers=0)
+
+def test_timeline_exports(tmp_path):
+    timeline = {"video": "film.mp4", "fps": 25.0, "duration": 10.0, "scenes": [
+        {"start": 0.0, "end": 5.0, "palette": [[255, 0, 0], [0, 255, 0]]},
+        {"start": 5.0, "end": 10.0, "palette": [[0, 0, 255]]},
+    ]}
+    timeline_to_json(timeline, tmp_path / "timeline.json")
+    exported = json.loads((tmp_path / "timeline.json").read_text())
+    assert [scene["palette"] for scene in exported["scenes"]] == [["#FF0000", "#00FF00"], ["#0000FF"]]
+
+    strip = np.array(timeline_to_image(timeline, width=100, height=10))
+    assert strip.shape == (10, 100, 3)
+    assert tuple(strip[0, 0]) == (255, 0, 0)
+    assert tuple(strip[9, 0]) == (0, 255, 0)
+    assert tuple(strip[5, 99]) == (0, 0, 255)
@@ -0,0 +1,104 @@
+import argparse
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from batch_conversions import (iter_rgb_cube, rgb_to_hex_batch, hex_to_rgb_batch, cmyk_to_rgb_batch, hsl_to_rgb_batch,
+                               hsv_to_rgb_batch)
+from fixed_point_conversions import rgb_to_hsl_fixed_batch, rgb_to_hsv_fixed_batch, rgb_to_cmyk_fixed_batch
+
+CUBE_SIZE = 1 << 24
+
+def _hue_round_trip(forward, inverse):
+    """
+    Build a round trip through a hue-based space. rgb_to_hsl/rgb_to_hsv can round a hue just
+    below 360 up to 360, which the inverse conversions reject, so the hue is wrapped to 0.
+    """
+    def round_trip(rgb):
+        values = forward(rgb).astype(np.float64)
+        values[:, 0] %= 360
+        return inverse(values)
+    return round_trip
+
+# Round trips checked by the harness, each mapping an (n, 3) uint8 RGB chunk back to RGB
+ROUND_TRIPS = {
+    "RGB->HSL->RGB": _hue_round_trip(rgb_to_hsl_fixed_batch, hsl_to_rgb_batch),
+    "RGB->HSV->RGB": _hue_round_trip(rgb_to_hsv_fixed_batch, hsv_to_rgb_batch),
+    "RGB->CMYK->RGB": lambda rgb: cmyk_to_rgb_batch(rgb_to_cmyk_fixed_batch(rgb)),
+    "RGB->HEX->RGB": lambda rgb: hex_to_rgb_batch(rgb_to_hex_batch(rgb)),
+}
+
+def _check_range(start, stop, stride, limit):
+    """
+    Run every round trip over one range of packed colours.
+
+    Returns:
+    dict: For each round trip, the maximum error, the number of inputs with a non-zero error and
+    up to limit inputs that reach the maximum error.
+    """
+    results = {}
+    rgb = next(iter_rgb_cube(stop - start, start, stop))[(-start) % stride::stride]
+    for name, round_trip in ROUND_TRIPS.items():
+        error = np.abs(round_trip(rgb) - rgb.astype(np.int64)).max(axis=-1)
+        max_error = int(error.max()) if error.size else 0
+        worst = rgb[error == max_error][:limit] if max_error else rgb[:0]
+        results[name] = {
+            "max_error": max_error,
+            "mismatches": int(np.count_nonzero(error)),
+            "offending": [tuple(int(v) for v in colour) for colour in worst],
+        }
+    return results
+
+def _merge(total, part, limit):
+    """Merge the results of one range into the running totals."""
+    for name, result in part.items():
+        if name not in total:
+            total[name] = result
+            continue
+        current = total[name]
+        current["mismatches"] += result["mismatches"]
+        if result["max_error"] > current["max_error"]:
+            current["max_error"] = result["max_error"]
+            current["offending"] = result["offending"]
+        elif result["max_error"] == current["max_error"] and result["max_error"]:
+            current["offending"] = (current["offending"] + result["offending"])[:limit]
+    return total
+
+def verify_round_trips(stride=1, chunk_size=1 << 20, workers=None, limit=10):
+    """
+    Sweep the RGB cube through every round trip in chunks and report the worst errors.
+
+    Parameters:
+    stride (int): Check every stride-th colour; 1 checks all 16.7M colours.
+    chunk_size (int): Number of packed colours per chunk.
+    workers (int): Worker processes; 0 runs in this process, None uses every core.
+    limit (int): Maximum number of offending inputs reported per round trip.
+
+    Returns:
+    dict: Per round trip, the maximum absolute channel error, the number of inputs that did not
+    round-trip exactly and up to limit RGB inputs that reach the maximum error.
+    """
+    ranges = [(start, min(start + chunk_size, CUBE_SIZE)) for start in range(0, CUBE_SIZE, chunk_size)]
+    total = {}
+    if workers == 0:
+        for start, stop in ranges:
+            _merge(total, _check_range(start, stop, stride, limit), limit)
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_check_range, start, stop, stride, limit) for start, stop in ranges]
+        for future in futures:
+            _merge(total, future.result(), limit)
+    return total
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Verify colour conversion round trips over the RGB cube.")
+    parser.add_argument("--stride", type=int, default=1, help="Check every Nth colour (1 = exhaustive)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = run in-process)")
+    parser.add_argument("--limit", type=int, default=10, help="Offending inputs to report per round trip")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    report = verify_round_trips(args.stride, workers=args.workers, limit=args.limit)
+    for name, result in report.items():
+        print(f"{name}: max error {result['max_error']}, {result['mismatches']} inexact inputs")
+        for colour in result["offending"]:
+            print(f"    {colour}")
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
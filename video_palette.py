@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from palette_functions import extract_palette
+
+SCENE_THRESHOLD = 0.35  # Bhattacharyya distance between sampled frames that starts a new scene
+HISTOGRAM_BINS = 8  # Bins per channel of the scene-change histogram
+ANALYSIS_WIDTH = 160  # Sampled frames are downscaled to this width before any analysis
+SAMPLES_PER_FRAME = 400  # Pixels kept from each sampled frame for the scene palette
+SEEK_MIN_FRAMES = 90  # Skip gaps at least this long by seeking instead of grabbing frame by frame
+
+def frame_histogram(frame):
+    """
+    Compute the normalised 3D colour histogram used for scene-change detection.
+
+    Parameters:
+    frame (numpy.ndarray): Small BGR frame.
+
+    Returns:
+    numpy.ndarray: Flattened float32 histogram.
+    """
+    hist = cv2.calcHist([frame], [0, 1, 2], None, [HISTOGRAM_BINS] * 3, [0, 256] * 3)
+    return cv2.normalize(hist, hist).flatten()
+
+def is_scene_change(previous, current, threshold=SCENE_THRESHOLD):
+    """Return True when two frame histograms differ by more than the threshold."""
+    return cv2.compareHist(previous, current, cv2.HISTCMP_BHATTACHARYYA) > threshold
+
+def scan_segment(path, start_frame, stop_frame, step, threshold=SCENE_THRESHOLD, seed=0):
+    """
+    Sample every step-th frame of one range of a video and split it into scenes. Runs in a worker.
+
+    Parameters:
+    path (str): Path to the video file.
+    start_frame, stop_frame (int): Range of frames to scan.
+    step (int): Distance in frames between sampled frames.
+    threshold (float): Histogram distance that starts a new scene.
+    seed (int): Seed for the pixel sampling.
+
+    Returns:
+    list: Scenes as dicts with start_frame, end_frame, first_hist, last_hist and samples (RGB pixels).
+    """
+    rng = np.random.default_rng(seed)
+    cap = cv2.VideoCapture(path)
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    scenes = []
+    previous = None
+    index = start_frame
+    small = None
+    while index < stop_frame:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        height, width = frame.shape[:2]
+        size = (min(width, ANALYSIS_WIDTH), max(1, height * min(width, ANALYSIS_WIDTH) // width))
+        small = cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+        hist = frame_histogram(small)
+        if previous is None or is_scene_change(previous, hist, threshold):
+            scenes.append({"start_frame": index, "first_hist": hist, "samples": []})
+        scene = scenes[-1]
+        scene["end_frame"] = index
+        scene["last_hist"] = hist
+        pixels = cv2.cvtColor(small, cv2.COLOR_BGR2RGB).reshape(-1, 3)
+        scene["samples"].append(pixels[rng.integers(0, len(pixels), min(SAMPLES_PER_FRAME, len(pixels)))])
+        previous = hist
+
+        # Skip to the next sampled frame without converting the frames in between
+        skip = min(step, stop_frame - index) - 1
+        if skip >= SEEK_MIN_FRAMES:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index + step)
+        else:
+            for _ in range(skip):
+                if not cap.grab():
+                    break
+        index += step
+    cap.release()
+    for scene in scenes:
+        scene["samples"] = np.concatenate(scene["samples"])
+    return scenes
+
+def merge_segments(segments, threshold=SCENE_THRESHOLD):
+    """
+    Join the scene lists of consecutive segments, merging scenes that continue across a boundary.
+
+    Parameters:
+    segments (list): Scene lists returned by scan_segment, in order.
+    threshold (float): Histogram distance that starts a new scene.
+
+    Returns:
+    list: The combined scenes.
+    """
+    scenes = []
+    for segment in segments:
+        for scene in segment:
+            if scenes and scene is segment[0] and not is_scene_change(scenes[-1]["last_hist"], scene["first_hist"],
+                                                                        threshold):
+                previous = scenes[-1]
+                previous["end_frame"] = scene["end_frame"]
+                previous["last_hist"] = scene["last_hist"]
+                previous["samples"] = np.concatenate([previous["samples"], scene["samples"]])
+            else:
+                scenes.append(scene)
+    return scenes
+
+def process_video(path, sample_interval=1.0, n_colours=5, workers=None, threshold=SCENE_THRESHOLD):
+    """
+    Build a per-scene palette timeline for a video file.
+
+    The video is split into one frame range per worker process. Each worker decodes only every
+    sample_interval seconds, skipping frames in between, and detects scene changes with a colour
+    histogram difference. Palettes are then extracted per scene on the same pool.
+
+    Parameters:
+    path (str): Path to the video file.
+    sample_interval (float): Seconds between sampled frames.
+    n_colours (int): Number of colours per scene palette.
+    workers (int): Worker processes; 0 runs in this process, None uses every core.
+    threshold (float): Histogram distance that starts a new scene.
+
+    Returns:
+    dict: Timeline with the video path, fps, duration and a list of scenes, each holding its start
+    and end time in seconds and its palette as [r, g, b] lists.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Video not found or cannot be opened: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    step = max(1, int(round(fps * sample_interval)))
+
+    if frame_count <= 0:
+        ranges = [(0, float("inf"))]  # Unknown length, scan sequentially
+    else:
+        n_ranges = 1 if workers == 0 else max(1, min(workers or os.cpu_count() or 1, frame_count // step))
+        # Align range boundaries to the sampling step so every range samples the same frames
+        bounds = [((frame_count * i // n_ranges) // step) * step for i in range(n_ranges)] + [frame_count]
+        ranges = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+    if workers == 0:
+        segments = [scan_segment(path, start, stop, step, threshold, i) for i, (start, stop) in enumerate(ranges)]
+        scenes = merge_segments(segments, threshold)
+        palettes = [extract_palette(scene["samples"], n_colours) for scene in scenes]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(scan_segment, path, start, stop, step, threshold, i)
+                       for i, (start, stop) in enumerate(ranges)]
+            scenes = merge_segments([future.result() for future in futures], threshold)
+            palettes = list(executor.map(extract_palette, [scene["samples"] for scene in scenes],
+                                         [n_colours] * len(scenes)))
+
+    last_frame = frame_count if frame_count > 0 else (scenes[-1]["end_frame"] + 1 if scenes else 0)
+    return {
+        "video": path,
+        "fps": fps,
+        "duration": last_frame / fps,
+        "scenes": [{
+            "start": scene["start_frame"] / fps,
+            "end": min(scene["end_frame"] + step, last_frame) / fps,
+            "palette": np.clip(palette, 0, 255).tolist(),
+        } for scene, palette in zip(scenes, palettes)],
+    }
+
+def timeline_to_json(timeline, file_path):
+    """Write a palette timeline to a JSON file, with palettes as hex strings."""
+    exported = dict(timeline, scenes=[
+        dict(scene, palette=['#{:02X}{:02X}{:02X}'.format(*colour) for colour in scene["palette"]])
+        for scene in timeline["scenes"]
+    ])
+    with open(file_path, "w") as f:
+        json.dump(exported, f, indent=2)
+
+def timeline_to_image(timeline, width=1000, height=100):
+    """
+    Render a palette timeline as an image strip. Each scene is a column whose width is proportional
+    to its duration, with its palette colours stacked top to bottom.
+
+    Parameters:
+    timeline (dict): Timeline returned by process_video.
+    width, height (int): Size of the image in pixels.
+
+    Returns:
+    PIL.Image.Image: The rendered timeline.
+    """
+    strip = np.zeros((height, width, 3), dtype=np.uint8)
+    duration = timeline["duration"] or 1
+    for scene in timeline["scenes"]:
+        left = int(round(scene["start"] / duration * width))
+        right = max(left + 1, int(round(scene["end"] / duration * width)))
+        palette = np.asarray(scene["palette"], dtype=np.uint8)
+        rows = np.minimum(np.arange(height) * len(palette) // height, len(palette) - 1)
+        strip[:, left:right] = palette[rows][:, None]
+    return Image.fromarray(strip)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Extract a per-scene palette timeline from a video.")
+    parser.add_argument("video")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between sampled frames")
+    parser.add_argument("--colours", type=int, default=5, help="Colours per scene palette")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = run in-process)")
+    parser.add_argument("--json", help="Write the timeline to this JSON file")
+    parser.add_argument("--image", help="Write the timeline as an image strip to this file")
+    args = parser.parse_args()
+    result = process_video(args.video, args.interval, args.colours, args.workers)
+    if args.json:
+        timeline_to_json(result, args.json)
+    if args.image:
+        timeline_to_image(result).save(args.image)
+    print(f"{len(result['scenes'])} scenes in {result['duration']:.1f}s of video")